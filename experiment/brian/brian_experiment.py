@@ -1,14 +1,47 @@
 """
 Definition for an experiment using brian
 """
+import multiprocessing
+import warnings
 from abc import ABC
-from typing import List, Optional
+from functools import partial
+from multiprocessing.pool import Pool
+from typing import Dict, List, Optional, Tuple, Type, Union
+
+import numpy as np
+from brian2 import ms
 
 from experiment.experiment import Experiment
 from network.decoder.brian.decoder import BrianDecoder
 from network.encoder.brian.encoder import BrianEncoder
 from network.network import Network
 from simulator.brian import BrianSimulator
+from simulator.numpy_simulator import NumpySimulator
+from utility.timing import timings, with_timings
+
+simulator_mapping: Dict[str, Type[Union[BrianSimulator, NumpySimulator]]] = {
+    "brian": BrianSimulator,
+    "numpy": NumpySimulator,
+}
+
+
+def simulate_chunk(
+    arguments: Tuple[Type[Union[BrianSimulator, NumpySimulator]], Dict]
+):
+    """
+    Simulate a chunk of networks, e.g. in a worker process
+
+    :param arguments: simulator class and its keyword arguments
+    :return: decoded values, output spike counts and simulated time in ms
+    """
+    simulator_type, simulator_arguments = arguments
+    simulator = simulator_type(**simulator_arguments)
+    outputs = simulator.simulate()
+    return (
+        outputs,
+        simulator.get_output_counts(),
+        float(simulator.simulated_time / ms),
+    )
 
 
 # This class is still abstract
@@ -22,51 +55,264 @@ class BrianExperiment(Experiment, ABC):
 
     _simulation_result = {}
     _seed: Optional[int] = None
+    simulator_type: Type[
+        Union[BrianSimulator, NumpySimulator]
+    ] = BrianSimulator
+    early_stop_interval: Optional[float] = None  # in ms
+    early_stop_max_rate: Optional[float] = None
+    simulated_time: Optional[float] = None  # of last simulation, in ms
+    simulation_memory: Optional[float] = None  # in MB
+    simulation_workers: int = 1
+    standalone_directory: Optional[str] = None
 
-    def _get_simulator(
-        self, networks_for_simulation: List[Network], inputs: List[tuple]
+    def set_simulator(self, simulator: str):
+        """
+        Select the simulator for the experiment
+
+        :param simulator: key of the simulator mapping, e.g. brian or numpy
+        :return:
+        """
+        if simulator not in simulator_mapping:
+            raise RuntimeError(
+                f"The specified simulator '{simulator}' is not defined,"
+                f" use any of: {list(simulator_mapping.keys())}"
+            )
+        self.simulator_type = simulator_mapping[simulator]
+
+    def set_early_stop(
+        self, interval: Optional[float], max_rate: Optional[float] = None
     ):
         """
-        Start the simulator on multiple networks with each given input pattern
+        Stop simulations, when the decoded values can't change anymore
+
+        :param interval: time in ms between checks, None to disable
+        :param max_rate: assumed maximum rate of output neurons in Hz,
+            None for a guaranteed result without assumption
+        :return:
+        """
+        self.early_stop_interval = interval
+        self.early_stop_max_rate = max_rate
+
+    def set_simulation_chunks(self, memory: Optional[float], workers: int = 1):
+        """
+        Split simulations into chunks, that fit into a memory budget
+
+        :param memory: approximate memory of a chunk in MB, None for no limit
+        :param workers: amount of processes to simulate chunks in parallel
+        :return:
+        """
+        self.simulation_memory = memory
+        self.simulation_workers = workers
+
+    def set_standalone(self, directory: Optional[str]):
+        """
+        Simulate with compiled c++ projects of brian, which are reused
+        for new networks of similar size, only for the brian simulator
+
+        :param directory: directory of the compiled projects, None to disable
+        :return:
+        """
+        if directory is not None and self.simulator_type != BrianSimulator:
+            raise RuntimeError(
+                "A standalone simulation is only possible with brian"
+            )
+        self.standalone_directory = directory
+
+    def _get_simulator_arguments(
+        self,
+        networks_for_simulation: List[Network],
+        inputs: List[tuple],
+        persistent: bool = False,
+        brian_seed: Optional[int] = None,
+    ) -> Dict:
+        """
+        Keyword arguments of the simulator for the given networks
 
         :param networks_for_simulation:
         :param inputs:
+        :param persistent: whether the simulator is reused for new inputs
+        :param brian_seed:
         :return:
         """
-        return BrianSimulator(
+        early_stop_interval = None
+        if self.early_stop_interval is not None:
+            early_stop_interval = self.early_stop_interval * ms
+        arguments = dict(
             networks=networks_for_simulation,
             inputs=inputs,
             encoder=self.encoder,
             decoder=self.decoder,
-            brian_seed=self._seed,
+            brian_seed=brian_seed,
+            persistent=persistent,
+            # spike times are only needed, if not decoded from counts
+            monitor_spikes=not self.decoder.decodes_counts,
+            early_stop_interval=early_stop_interval,
+            early_stop_max_rate=self.early_stop_max_rate,
+        )
+        if self.standalone_directory is not None:
+            arguments["standalone_directory"] = self.standalone_directory
+        return arguments
+
+    def _get_simulator(
+        self,
+        networks_for_simulation: List[Network],
+        inputs: List[tuple],
+        persistent: bool = False,
+    ):
+        """
+        Start the simulator on multiple networks with each given input pattern
+
+        :param networks_for_simulation:
+        :param inputs:
+        :param persistent: whether the simulator is reused for new inputs
+        :return:
+        """
+        return self.simulator_type(
+            **self._get_simulator_arguments(
+                networks_for_simulation, inputs, persistent, self._seed
+            )
+        )
+
+    def _get_chunks(
+        self, networks_for_simulation: List[Network]
+    ) -> List[Tuple[int, int]]:
+        """
+        Split the networks into contiguous chunks within the memory budget
+        A single network larger than the budget gets its own chunk
+
+        :param networks_for_simulation:
+        :return: start and end index of each chunk
+        """
+        amount = len(networks_for_simulation)
+        if self.simulation_memory is None:
+            return [(0, amount)]
+
+        budget = self.simulation_memory * 1024**2
+        memory = self.simulator_type.estimate_memory(
+            networks_for_simulation, self.encoder
         )
+        chunks = []
+        start = 0
+        used = 0
+        for i, size in enumerate(memory.tolist()):
+            if i > start and used + size > budget:
+                chunks.append((start, i))
+                start = i
+                used = 0
+            used += size
+        chunks.append((start, amount))
+        return chunks
+
+    def _simulate_chunks(
+        self, networks_for_simulation: List[Network], inputs: List[tuple]
+    ):
+        """
+        Simulate the networks in chunks, sequentially or in parallel,
+        and combine the results in the same order
+
+        :param networks_for_simulation:
+        :param inputs: one input for each network
+        :return: decoded values and output spike counts for each network
+        """
+        chunk_arguments = []
+        for i, (start, end) in enumerate(
+            self._get_chunks(networks_for_simulation)
+        ):
+            # chunks with the same seed would get the same random spikes
+            seed = None if self._seed is None else self._seed + i
+            chunk_arguments.append(
+                (
+                    self.simulator_type,
+                    self._get_simulator_arguments(
+                        networks_for_simulation[start:end],
+                        inputs[start:end],
+                        brian_seed=seed,
+                    ),
+                )
+            )
+
+        workers = min(self.simulation_workers, len(chunk_arguments))
+        if workers > 1 and multiprocessing.current_process().daemon:
+            # e.g. in a parallel evaluation, processes can't have children
+            warnings.warn(
+                "Parallel simulation is not possible in a daemon process, "
+                "simulate in a single process instead"
+            )
+            workers = 1
+
+        if workers > 1:
+            with Pool(processes=workers) as pool:
+                timed_results = pool.map(
+                    partial(with_timings, simulate_chunk), chunk_arguments
+                )
+            results = []
+            for result, durations in timed_results:
+                timings.add_all(durations)
+                results.append(result)
+        else:
+            results = [simulate_chunk(a) for a in chunk_arguments]
+
+        self.simulated_time = max(time for _, _, time in results)
+        outputs = [value for values, _, _ in results for value in values]
+        counts = np.concatenate([c for _, c, _ in results])
+        return outputs, counts
 
     def _simulate_on_multiple_inputs(
-        self, networks: List[Network], input_patterns: List[tuple]
+        self,
+        networks: List[Network],
+        input_patterns: List[tuple],
+        counts: bool = False,
     ):
         """
         Simulate each network on each input pattern
 
         :param networks:
         :param input_patterns:
+        :param counts: return the spike counts of the output neurons,
+            instead of the decoded values
         :return: list with networks on first level
-            and outputs for each input on second level
+            and outputs for each input on second level,
+            or spike counts with shape (networks, inputs, output neurons)
         """
+        amount_patterns = len(input_patterns)
+        self.simulated_time = 0.0
+        # networks without a path from input to output never spike
+        silent = self.decoder.get_silent_values(amount_patterns)
+        network_outputs = [list(silent) for _ in networks]
+        output_counts = np.zeros(
+            (len(networks), amount_patterns, self.decoder.number_of_neurons),
+            dtype=int,
+        )
+
+        simulated_index = [
+            i for i, n in enumerate(networks) if n.can_reach_output()
+        ]
+        if len(simulated_index) == 0 or amount_patterns == 0:
+            return output_counts if counts else network_outputs
+
+        # neurons without influence on the outputs are not simulated
+        simulated_networks = [networks[i].stripped() for i in simulated_index]
+
         # repeat each input pattern for each network
-        inputs = input_patterns * len(networks)
+        inputs = input_patterns * len(simulated_networks)
 
         # repeat each network for each pattern
-        networks_for_simulation = [n for n in networks for _ in input_patterns]
+        networks_for_simulation = [
+            n for n in simulated_networks for _ in input_patterns
+        ]
 
-        simulator = self._get_simulator(networks_for_simulation, inputs)
-        outputs = simulator.simulate()
+        outputs, simulated_counts = self._simulate_chunks(
+            networks_for_simulation, inputs
+        )
+        if counts:
+            output_counts[simulated_index] = simulated_counts.reshape(
+                len(simulated_networks), amount_patterns, -1
+            )
+            return output_counts
 
-        network_outputs = []
-        for i, _ in enumerate(networks):
-            network_output = []
-            for j, _ in enumerate(input_patterns):
-                network_output.append(outputs[i * len(input_patterns) + j])
-            network_outputs.append(network_output)
+        for position, i in enumerate(simulated_index):
+            start = position * amount_patterns
+            network_outputs[i] = outputs[start : start + amount_patterns]
         return network_outputs
 
     def simulate(self, networks: List[Network]):
@@ -115,8 +361,13 @@ class BrianExperiment(Experiment, ABC):
         :param pattern:
         :return:
         """
-        simulator = self._get_simulator(
-            networks_for_simulation=[network], inputs=[pattern]
+        # state monitors are only available in brian
+        simulator = BrianSimulator(
+            networks=[network],
+            inputs=[pattern],
+            encoder=self.encoder,
+            decoder=self.decoder,
+            brian_seed=self._seed,
         )
         state_monitor = simulator.add_neuron_state_monitor()
         simulator.simulate()
@@ -131,6 +382,14 @@ class BrianExperiment(Experiment, ABC):
         """
         self._seed = seed
 
+    def is_deterministic(self) -> bool:
+        """
+        Deterministic, if the encoder produces the same spikes each time
+
+        :return:
+        """
+        return self.encoder.is_deterministic()
+
     @staticmethod
     def get_simulator_class():
         """
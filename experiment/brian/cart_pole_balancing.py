@@ -2,13 +2,13 @@ import random
 from typing import List, Optional
 
 import gym
+import numpy as np
 from gym.envs.classic_control import CartPoleEnv
 
 from experiment.brian.brian_experiment import BrianExperiment
 from network.decoder.brian.classification import ClassificationBrianDecoder
 from network.encoder.brian.float import FloatBrianEncoder
 from network.network import Network
-from utility.list_operation import remove_multiple_indices
 from utility.visualisation import render_frames_as_animation
 
 
@@ -20,8 +20,11 @@ class CartPoleBalancing(BrianExperiment):
 
     random_generator: random.Random
 
-    def __init__(self, samples_per_network=10, poisson=True):
+    def __init__(
+        self, samples_per_network=10, poisson=True, simulator="brian"
+    ):
         self.samples_per_network = samples_per_network
+        self.set_simulator(simulator)
         self.encoder = FloatBrianEncoder(number_of_neurons=4, poisson=poisson)
         self.decoder = ClassificationBrianDecoder(classes=2)
 
@@ -49,12 +52,14 @@ class CartPoleBalancing(BrianExperiment):
             inputs.append(values)
         return envs, inputs
 
-    def _apply_output(self, envs, outputs):
+    def _apply_output(self, envs, outputs, active=None):
         """
         Apply the given outputs to the envs
 
         :param envs:
         :param outputs:
+        :param active: mask of environments to apply the output to,
+            other environments keep their state
         :return: returns the next inputs and the finished simulations
         """
         inputs = []
@@ -62,6 +67,10 @@ class CartPoleBalancing(BrianExperiment):
 
         # apply next action
         for index, env in enumerate(envs):
+            if active is not None and not active[index]:
+                inputs.append(self.convert_state_to_norm(env.state))
+                continue
+
             action, _ = outputs[index]
             # for now: when no action can be chosen, chose random
             if action == -1:
@@ -79,6 +88,7 @@ class CartPoleBalancing(BrianExperiment):
         """
         Simulate the cart pole balancing for a set of lists
         Prints out the status of each time step simulation
+        The brian network is built once and reused for all time steps
         :param networks:
         :return:
         """
@@ -91,31 +101,31 @@ class CartPoleBalancing(BrianExperiment):
             self.set_output_by_network(network, [])
         envs, inputs = self._init_envs(simulation_networks)
 
+        simulator = self._get_simulator(
+            simulation_networks, inputs, persistent=True
+        )
+        # finished simulations are masked, instead of removed
+        active = np.ones(len(simulation_networks), dtype=bool)
+
         line = ""
         for t in range(500):
-            to_simulate = len(simulation_networks)
+            to_simulate = int(active.sum())
             if to_simulate == 0:
                 break
             print(" " * len(line), end="\r")  # clear line before new line
             line = "Time step: {} - networks left: {}".format(t, to_simulate)
             print(line, end="\r")
             # simulate
-            simulator = self._get_simulator(simulation_networks, inputs)
+            simulator.set_inputs(inputs, active)
             outputs = simulator.simulate()
 
-            inputs, done = self._apply_output(envs, outputs)
+            inputs, done = self._apply_output(envs, outputs, active)
             for index in done:
                 network = simulation_networks[index]
                 rewards = self.get_output_by_network(network)
                 rewards.append(t)
                 self.set_output_by_network(network, rewards)
-
-            # remove networks from simulation, that are already done
-            simulation_networks = remove_multiple_indices(
-                simulation_networks, done
-            )
-            inputs = remove_multiple_indices(inputs, done)
-            envs = remove_multiple_indices(envs, done)
+                active[index] = False
 
     def convert_state_to_norm(self, state):
         """
@@ -193,6 +203,14 @@ class CartPoleBalancing(BrianExperiment):
 
         return render_frames_as_animation(frames)
 
+    def is_deterministic(self) -> bool:
+        """
+        The start states of the environments are random
+
+        :return:
+        """
+        return False
+
     def set_seed(self, seed: Optional[int] = None):
         super().set_seed(seed)
         self.random_generator.seed(seed)
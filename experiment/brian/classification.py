@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import List
 
+import numpy as np
 from sklearn import datasets
 from sklearn.metrics import confusion_matrix
 from sklearn.model_selection import train_test_split
@@ -76,11 +77,26 @@ class Classification(BrianExperiment):
         split_seed=1,
         poisson=True,
         penalize_network_size=False,
+        simulator="brian",
+        early_stop_interval=None,
+        early_stop_max_rate=None,
+        simulation_memory=None,
+        simulation_workers=1,
+        standalone_directory=None,
     ):
         """
         :param task: classification task
         :param train_size: can be int or float from 0 to 1
         :param rounds: train multiple times on each training sample
+        :param simulator: brian or numpy
+        :param early_stop_interval: check every this many ms,
+            whether the classifications are decided, None to disable
+        :param early_stop_max_rate: assumed maximum rate of output neurons
+        :param simulation_memory: approximate memory in MB of a simulation,
+            larger populations are simulated in chunks, None for no limit
+        :param simulation_workers: processes to simulate chunks in parallel
+        :param standalone_directory: directory for compiled brian projects,
+            reused for each generation, None to simulate in python
         """
         # if string is given, should convert to ClassificationTask
         if isinstance(task, str):
@@ -107,15 +123,21 @@ class Classification(BrianExperiment):
             number_of_neurons=input_neurons, poisson=poisson
         )
         self.decoder = ClassificationBrianDecoder(classes=classes)
+        # simulators use the distinct patterns in order of appearance
+        self.encoder.precompute(list(dict.fromkeys(self.X_train)))
 
         self.rounds = rounds
         self.task = task
         self.penalize_network_size = penalize_network_size
+        self.set_simulator(simulator)
+        self.set_early_stop(early_stop_interval, early_stop_max_rate)
+        self.set_simulation_chunks(simulation_memory, simulation_workers)
+        self.set_standalone(standalone_directory)
 
     def simulate(self, networks: List[Network]):
         input_patterns = self.X_train * self.rounds
         calculated = self._simulate_on_multiple_inputs(
-            networks, input_patterns
+            networks, input_patterns, counts=True
         )
 
         for i, network in enumerate(networks):
@@ -128,11 +150,12 @@ class Classification(BrianExperiment):
         :param network:
         :return:
         """
-        calculated = self.get_output_by_network(network)
-        classifications = [v[0] for v in calculated]
-        expected = self.y_train * self.rounds
-        correct_classifications = self.get_correct_classifications(
-            classifications, expected
+        # spike counts with one row for each pattern
+        counts = self.get_output_by_network(network)
+        classifications = self.decoder.decode_batch(counts).values
+        expected = np.array(self.y_train * self.rounds)
+        correct_classifications = np.count_nonzero(
+            classifications == expected
         ) / len(expected)
         if self.penalize_network_size:
             correct_classifications = correct_classifications - (
@@ -140,6 +163,14 @@ class Classification(BrianExperiment):
             )
         return correct_classifications
 
+    def fitness_depends_on_structure(self) -> bool:
+        """
+        The size penalty also counts neurons and synapses without influence
+
+        :return:
+        """
+        return self.penalize_network_size
+
     @staticmethod
     def get_correct_classifications(values, target):
         """
@@ -3,6 +3,8 @@ Provides an XOR experiment using the brian simulator
 """
 from typing import List, Literal, Union
 
+import numpy as np
+
 from experiment.brian.brian_experiment import BrianExperiment
 from network.decoder.brian.binary import BinaryBrianDecoder
 from network.decoder.brian.classification import ClassificationBrianDecoder
@@ -33,8 +35,18 @@ class XOR(BrianExperiment):
         poisson: bool = False,
         rounds: int = 1,
         binary_boundary=None,
+        simulator="brian",
+        early_stop_interval=None,
+        early_stop_max_rate=None,
+        simulation_memory=None,
+        simulation_workers=1,
+        standalone_directory=None,
     ):
         self.rounds = rounds
+        self.set_simulator(simulator)
+        self.set_early_stop(early_stop_interval, early_stop_max_rate)
+        self.set_simulation_chunks(simulation_memory, simulation_workers)
+        self.set_standalone(standalone_directory)
 
         if not poisson:
             self.encoder = BinaryBrianEncoder(number_of_neurons=2)
@@ -51,6 +63,8 @@ class XOR(BrianExperiment):
         else:
             raise RuntimeError("Given type is not supported")
 
+        self.encoder.precompute(self.get_data())
+
     def simulate(self, networks: List[Network]):
         """
         Start simulation of all networks on given patterns
@@ -62,7 +76,9 @@ class XOR(BrianExperiment):
 
         values = values * self.rounds
 
-        calculated = self._simulate_on_multiple_inputs(networks, values)
+        calculated = self._simulate_on_multiple_inputs(
+            networks, values, counts=True
+        )
         for i, network in enumerate(networks):
             self.set_output_by_network(network, calculated[i])
 
@@ -98,20 +114,14 @@ class XOR(BrianExperiment):
         if simulate:
             self.simulate([network])
 
-        calculated = self.get_output_by_network(network)
-
-        correct_classifications = 0
-        for index, expected in enumerate(self.Y * self.rounds):
-            classification = calculated[index][0]
-
-            # change calculation mode depending on decoder type
-            if self.decoder_type == "binary":
-                if classification == expected:
-                    correct_classifications += 1
-            elif self.decoder_type == "classification":
-                if (classification == 0 and not expected) or (
-                    classification == 1 and expected
-                ):
-                    correct_classifications += 1
+        # spike counts with one row for each pattern
+        counts = self.get_output_by_network(network)
+        classifications = self.decoder.decode_batch(counts).values
+        expected = np.array(self.Y * self.rounds)
+
+        # class 1 is true and class 0 false, -1 is never correct
+        if self.decoder_type == "classification":
+            expected = expected.astype(int)
+        correct_classifications = np.count_nonzero(classifications == expected)
 
         return correct_classifications / self.rounds
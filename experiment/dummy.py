@@ -22,5 +22,8 @@ class Dummy(Experiment):
         value = len(network.hidden_neurons) + len(network.synapses)
         return value
 
+    def fitness_depends_on_structure(self) -> bool:
+        return True
+
     def set_seed(self, seed: Optional[int] = None):
         pass
@@ -47,6 +47,23 @@ class Experiment:
 
         raise NotImplementedError("Please Implement this method")
 
+    def is_deterministic(self) -> bool:
+        """
+        Whether a network always gets the same fitness score
+
+        :return:
+        """
+        return False
+
+    def fitness_depends_on_structure(self) -> bool:
+        """
+        Whether the fitness score also depends on neurons and synapses, which
+        have no influence on the output, e.g. with a penalty on the size
+
+        :return:
+        """
+        return False
+
     @staticmethod
     def get_simulator_class():
         """
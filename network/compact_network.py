@@ -0,0 +1,365 @@
+"""
+Provide a compact, array based representation of a network
+"""
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from network.dynamic_parameter import DynamicParameter
+from network.network import Network, NeuronType
+from network.neuron import Neuron
+from network.synapse import Synapse
+
+# neuron types are stored as index into this list
+NEURON_TYPES = [NeuronType.Input, NeuronType.Output, NeuronType.Hidden]
+
+
+def _parameters_to_arrays(
+    elements: List[DynamicParameter],
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Convert the parameters of neurons or synapses to one array per parameter
+    Uses a numeric/bool dtype, if all values share the same type,
+    otherwise the values are stored as objects
+
+    :param elements:
+    :return: values and masks, whether an element defines the parameter
+    """
+    keys = sorted(set(k for e in elements for k in e.get_defined_parameters()))
+
+    values = {}
+    defined = {}
+    for key in keys:
+        mask = np.array([key in e.parameters for e in elements], dtype=bool)
+        types = set(
+            type(e.parameters[key]) for e in elements if key in e.parameters
+        )
+
+        if len(types) == 1 and types.issubset({bool, int, float}):
+            value_type = types.pop()
+            placeholder = value_type()
+        else:
+            value_type = object
+            placeholder = None
+
+        column = [e.parameters.get(key, placeholder) for e in elements]
+        values[key] = np.array(column, dtype=value_type)
+        defined[key] = mask
+
+    return values, defined
+
+
+def _update_digest(digest, array: np.ndarray):
+    """
+    Add an array with its type and shape to a digest
+
+    :param digest: hashlib object
+    :param array:
+    :return:
+    """
+    digest.update(f"{array.dtype}{array.shape}".encode())
+    if array.dtype == object:
+        # bytes of an object array are pointers, use the values instead
+        digest.update(repr(array.tolist()).encode())
+    else:
+        digest.update(np.ascontiguousarray(array).tobytes())
+
+
+def _arrays_to_parameters(
+    values: Dict[str, np.ndarray], defined: Dict[str, np.ndarray], size: int
+) -> List[Dict[str, Any]]:
+    """
+    Inverse of _parameters_to_arrays, returns parameters for each element
+
+    :param values:
+    :param defined:
+    :param size: amount of elements
+    :return:
+    """
+    parameters = [{} for _ in range(size)]
+    for key, column in values.items():
+        # tolist converts to python types, e.g. np.int64 -> int
+        for parameter, value, is_defined in zip(
+            parameters, column.tolist(), defined[key].tolist()
+        ):
+            if is_defined:
+                parameter[key] = value
+
+    return parameters
+
+
+class CompactNetwork:
+    """
+    Structure of arrays representation of a network
+    Neurons are sorted by uid and synapses by (connect_from, connect_to),
+    in the same order as Network.get_all_neurons/get_all_synapses
+    """
+
+    neuron_uid: np.ndarray
+    neuron_type: np.ndarray  # index in NEURON_TYPES
+    neuron_parameters: Dict[str, np.ndarray]
+    neuron_defined: Dict[str, np.ndarray]
+
+    synapse_from: np.ndarray  # uid of pre-synaptic neuron
+    synapse_to: np.ndarray  # uid of post-synaptic neuron
+    synapse_parameters: Dict[str, np.ndarray]
+    synapse_defined: Dict[str, np.ndarray]
+
+    def __init__(
+        self,
+        neuron_uid: np.ndarray,
+        neuron_type: np.ndarray,
+        neuron_parameters: Dict[str, np.ndarray],
+        neuron_defined: Dict[str, np.ndarray],
+        synapse_from: np.ndarray,
+        synapse_to: np.ndarray,
+        synapse_parameters: Dict[str, np.ndarray],
+        synapse_defined: Dict[str, np.ndarray],
+    ):
+        self.neuron_uid = neuron_uid
+        self.neuron_type = neuron_type
+        self.neuron_parameters = neuron_parameters
+        self.neuron_defined = neuron_defined
+
+        self.synapse_from = synapse_from
+        self.synapse_to = synapse_to
+        self.synapse_parameters = synapse_parameters
+        self.synapse_defined = synapse_defined
+
+    @classmethod
+    def from_network(cls, network: Network) -> "CompactNetwork":
+        """
+        Create the compact representation of a network
+
+        :param network:
+        :return:
+        """
+        neurons = network.get_all_neurons()
+        synapses = network.get_all_synapses()
+
+        neuron_uid = np.array([n.uid for n in neurons], dtype=np.int64)
+        neuron_type = np.array(
+            [
+                NEURON_TYPES.index(network.get_neuron_type(neuron=n))
+                for n in neurons
+            ],
+            dtype=np.int8,
+        )
+        neuron_parameters, neuron_defined = _parameters_to_arrays(neurons)
+
+        synapse_from = np.array(
+            [s.connect_from for s in synapses], dtype=np.int64
+        )
+        synapse_to = np.array([s.connect_to for s in synapses], dtype=np.int64)
+        synapse_parameters, synapse_defined = _parameters_to_arrays(synapses)
+
+        return cls(
+            neuron_uid=neuron_uid,
+            neuron_type=neuron_type,
+            neuron_parameters=neuron_parameters,
+            neuron_defined=neuron_defined,
+            synapse_from=synapse_from,
+            synapse_to=synapse_to,
+            synapse_parameters=synapse_parameters,
+            synapse_defined=synapse_defined,
+        )
+
+    def to_network(self) -> Network:
+        """
+        Create the object representation of the network
+
+        :return:
+        """
+        neuron_parameters = _arrays_to_parameters(
+            self.neuron_parameters,
+            self.neuron_defined,
+            self.get_number_of_neurons(),
+        )
+
+        neurons = {neuron_type: [] for neuron_type in NEURON_TYPES}
+        for uid, type_index, parameters in zip(
+            self.neuron_uid.tolist(),
+            self.neuron_type.tolist(),
+            neuron_parameters,
+        ):
+            neuron = Neuron(uid=uid, **parameters)
+            neurons[NEURON_TYPES[type_index]].append(neuron)
+
+        network = Network(
+            input_neurons=neurons[NeuronType.Input],
+            output_neurons=neurons[NeuronType.Output],
+            hidden_neurons=neurons[NeuronType.Hidden],
+        )
+
+        synapse_parameters = _arrays_to_parameters(
+            self.synapse_parameters,
+            self.synapse_defined,
+            self.get_number_of_synapses(),
+        )
+
+        for connect_from, connect_to, parameters in zip(
+            self.synapse_from.tolist(),
+            self.synapse_to.tolist(),
+            synapse_parameters,
+        ):
+            network.add_synapse(
+                Synapse(connect_from, connect_to, **parameters)
+            )
+
+        return network
+
+    def get_number_of_neurons(self) -> int:
+        """
+        Amount of neurons in the network
+
+        :return:
+        """
+        return len(self.neuron_uid)
+
+    def get_number_of_synapses(self) -> int:
+        """
+        Amount of synapses in the network
+
+        :return:
+        """
+        return len(self.synapse_from)
+
+    def get_input_index(self) -> np.ndarray:
+        """
+        Positions of the input neurons (sorted by uid)
+
+        :return:
+        """
+        input_type = NEURON_TYPES.index(NeuronType.Input)
+        return np.flatnonzero(self.neuron_type == input_type)
+
+    def get_output_index(self) -> np.ndarray:
+        """
+        Positions of the output neurons (sorted by uid)
+
+        :return:
+        """
+        output_type = NEURON_TYPES.index(NeuronType.Output)
+        return np.flatnonzero(self.neuron_type == output_type)
+
+    def get_synapse_from_index(self) -> np.ndarray:
+        """
+        Positions of the pre-synaptic neurons for all synapses
+
+        :return:
+        """
+        return np.searchsorted(self.neuron_uid, self.synapse_from)
+
+    def get_synapse_to_index(self) -> np.ndarray:
+        """
+        Positions of the post-synaptic neurons for all synapses
+
+        :return:
+        """
+        return np.searchsorted(self.neuron_uid, self.synapse_to)
+
+    def get_neuron_parameter(self, name: str, default: Optional[Any] = None):
+        """
+        Get the values of a parameter for all neurons
+        Raises an exception, if a neuron has no value and no default is given
+
+        :param name: parameter name, e.g. threshold or leak
+        :param default: value for neurons without the parameter
+        :return:
+        """
+        return self._get_parameter(
+            self.neuron_parameters,
+            self.neuron_defined,
+            self.get_number_of_neurons(),
+            name,
+            default,
+        )
+
+    def get_synapse_parameter(self, name: str, default: Optional[Any] = None):
+        """
+        Get the values of a parameter for all synapses
+        Raises an exception, if a synapse has no value and no default is given
+
+        :param name: parameter name, e.g. weight, delay or exciting
+        :param default: value for synapses without the parameter
+        :return:
+        """
+        return self._get_parameter(
+            self.synapse_parameters,
+            self.synapse_defined,
+            self.get_number_of_synapses(),
+            name,
+            default,
+        )
+
+    def fingerprint(self, with_uid: bool = False) -> str:
+        """
+        Digest of the structure and the parameters of the network
+        Neurons are identified by their position instead of their uid,
+        networks with the same fingerprint behave the same in a simulation
+
+        :param with_uid: also include the uids, e.g. to identify copies
+        :return: hex digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        if with_uid:
+            _update_digest(digest, self.neuron_uid)
+        _update_digest(digest, self.neuron_type)
+        _update_digest(digest, self.get_synapse_from_index())
+        _update_digest(digest, self.get_synapse_to_index())
+
+        for parameters, defined in [
+            (self.neuron_parameters, self.neuron_defined),
+            (self.synapse_parameters, self.synapse_defined),
+        ]:
+            digest.update(f"{len(parameters)}".encode())
+            for key in sorted(parameters.keys()):
+                digest.update(f"{key}".encode())
+                _update_digest(digest, defined[key])
+                _update_digest(digest, parameters[key])
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _get_parameter(values, defined, size, name, default):
+        """
+        Get a parameter column and fill in the default for missing values
+
+        :return:
+        """
+        if name not in values:
+            if size == 0:
+                # numeric type, to not change the type when concatenating
+                return np.zeros(0, dtype=int)
+            if default is None:
+                raise RuntimeError(f"The parameter '{name}' is not defined")
+            return np.full(size, default)
+
+        column = values[name]
+        mask = defined[name]
+        if mask.all():
+            return column
+        if default is None:
+            raise RuntimeError(f"The parameter '{name}' is not defined")
+        return np.where(mask, column, default)
+
+
+def get_fingerprint(
+    network: Network, exact: bool = False, strip: bool = True
+) -> str:
+    """
+    Fingerprint of a network, without the neurons, that would be stripped
+    Does not modify the given network
+
+    :param network:
+    :param exact: keep all neurons and their uids, only copies of a network
+    share the same fingerprint
+    :param strip: leave out the neurons and synapses, that would be stripped
+    :return:
+    """
+    if exact:
+        return CompactNetwork.from_network(network).fingerprint(with_uid=True)
+    if strip:
+        network = network.stripped()
+    return CompactNetwork.from_network(network).fingerprint()
@@ -1,10 +1,13 @@
 """
 Implementation of a binary decoder in brian
 """
-from typing import Tuple
+from typing import List, Tuple
+
+import numpy as np
 
 from network.decoder.binary import BinaryDecoder
 from network.decoder.brian.decoder import BrianDecoder
+from network.decoder.decoder import DecodedBatch
 
 
 class BinaryBrianDecoder(BinaryDecoder, BrianDecoder):
@@ -12,6 +15,8 @@ class BinaryBrianDecoder(BinaryDecoder, BrianDecoder):
     Actual implementation of a binary decoder in brian
     """
 
+    decodes_counts = True
+
     boundary: float
     ideal_distance: int
     simulated_seconds: float
@@ -45,6 +50,50 @@ class BinaryBrianDecoder(BinaryDecoder, BrianDecoder):
 
         return (rate > self.boundary), rate
 
+    def get_values(self, counts: np.ndarray) -> List[Tuple[bool, float]]:
+        """
+        Decode multiple outputs at once, from the first output neuron
+
+        :param counts: one row for each output
+        :return:
+        """
+        counts = np.asarray(counts)
+        if len(counts) == 0:
+            return []
+
+        batch = self.decode_batch(counts)
+        return list(zip(batch.values.tolist(), batch.rates[:, 0].tolist()))
+
+    def decode_batch(self, counts: np.ndarray) -> DecodedBatch:
+        """
+        Decode the first output neuron of multiple outputs,
+        a rate exactly on the boundary is a tie
+
+        :param counts: spike counts, one row for each output
+        :return:
+        """
+        rates = np.asarray(counts) / self.simulated_seconds
+        return DecodedBatch(
+            values=rates[:, 0] > self.boundary,
+            ties=rates[:, 0] == self.boundary,
+            rates=rates,
+        )
+
+    def get_decided(
+        self, counts: np.ndarray, max_additional: int
+    ) -> np.ndarray:
+        """
+        True is decided above the boundary, since rates only increase,
+        false is decided, if further spikes can't exceed the boundary
+
+        :param counts: spike counts, one row for each output
+        :param max_additional: maximum amount of further spikes per neuron
+        :return:
+        """
+        counts = np.asarray(counts)[:, 0]
+        limit = self.boundary * self.simulated_seconds
+        return (counts > limit) | (counts + max_additional <= limit)
+
     def get_absolute_distance(self, rate: float, expected: bool):
         """
         Return the absolute distance, to the expected value
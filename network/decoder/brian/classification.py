@@ -1,5 +1,7 @@
 from typing import List, Tuple
 
+import numpy as np
+
 from network.decoder.brian.decoder import BrianDecoder
 from network.decoder.classification import ClassificationDecoder
 
@@ -9,6 +11,8 @@ class ClassificationBrianDecoder(ClassificationDecoder, BrianDecoder):
     Implementation of a classification decoder in brian
     """
 
+    decodes_counts = True
+
     def get_value(self) -> Tuple[int, List[int]]:
         """
         Get the assumed classification for an output spike pattern
@@ -29,3 +33,17 @@ class ClassificationBrianDecoder(ClassificationDecoder, BrianDecoder):
         self.spikes = None  # reset after value read
 
         return classification, spikes_per_class
+
+    def get_values(self, counts: np.ndarray) -> List[Tuple[int, List[int]]]:
+        """
+        Classifications for multiple outputs at once
+
+        :param counts: one row for each output, one column for each class
+        :return:
+        """
+        counts = np.asarray(counts)
+        if len(counts) == 0:
+            return []
+
+        classifications = self.decode_batch(counts).values
+        return list(zip(classifications.tolist(), counts.tolist()))
@@ -2,9 +2,10 @@
 Interface for a brian decoder
 """
 from abc import ABC
-from typing import Optional
+from typing import List, Optional
 
-from brian2 import Quantity
+import numpy as np
+from brian2 import Quantity, second
 
 from network.decoder.decoder import Decoder
 
@@ -15,6 +16,8 @@ class BrianDecoder(Decoder, ABC):
     """
 
     spikes: Optional[Quantity] = None
+    # whether get_values is implemented, to decode without spike times
+    decodes_counts: bool = False
 
     def set_spikes(self, spikes):
         """
@@ -24,3 +27,34 @@ class BrianDecoder(Decoder, ABC):
         :return:
         """
         self.spikes = spikes
+
+    def get_values(self, counts: np.ndarray) -> List[tuple]:
+        """
+        Decode multiple outputs at once from their spike counts,
+        returns the same values as get_value for each output
+
+        :param counts: one row for each output, one column for each neuron
+        :return:
+        """
+        raise NotImplementedError("Please Implement this method")
+
+    def get_silent_values(self, amount: int) -> List[tuple]:
+        """
+        Decoded values of outputs without any spikes,
+        e.g. for networks, which can't reach an output neuron
+
+        :param amount: amount of outputs
+        :return:
+        """
+        if self.decodes_counts:
+            return self.get_values(
+                np.zeros((amount, self.number_of_neurons), dtype=int)
+            )
+
+        values = []
+        for _ in range(amount):
+            self.set_spikes(
+                [np.zeros(0) * second for _ in range(self.number_of_neurons)]
+            )
+            values.append(self.get_value())
+        return values
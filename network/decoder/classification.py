@@ -2,7 +2,7 @@ from typing import List, Tuple
 
 import numpy as np
 
-from network.decoder.decoder import Decoder
+from network.decoder.decoder import DecodedBatch, Decoder
 
 
 class ClassificationDecoder(Decoder):
@@ -10,8 +10,12 @@ class ClassificationDecoder(Decoder):
     Interface for a classification decoder
     """
 
-    def __init__(self, classes: int):
+    simulated_seconds: float
+
+    def __init__(self, classes: int, simulated_seconds=1):
         super().__init__(number_of_neurons=classes)
+        # simulated time, to get rates from spike counts
+        self.simulated_seconds = simulated_seconds
 
     def get_value(self) -> Tuple[int, ...]:
         """
@@ -44,3 +48,54 @@ class ClassificationDecoder(Decoder):
             # no class, if max class is not unique
             return -1
         return classification
+
+    @staticmethod
+    def get_best_classes(spikes_per_class: np.ndarray) -> np.ndarray:
+        """
+        Same as get_best_class for multiple outputs at once
+
+        :param spikes_per_class: spike counts, one row for each output
+        :return: class for each row, -1 if not unique or no spikes
+        """
+        spikes_per_class = np.asarray(spikes_per_class)
+        max_spikes = spikes_per_class.max(axis=1)
+        is_unique = (spikes_per_class == max_spikes[:, None]).sum(axis=1) == 1
+        return np.where(
+            (max_spikes > 0) & is_unique, spikes_per_class.argmax(axis=1), -1
+        )
+
+    def decode_batch(self, counts: np.ndarray) -> DecodedBatch:
+        """
+        Classes for multiple outputs, a tie is a not unique maximum
+
+        :param counts: spike counts, one row for each output
+        :return:
+        """
+        counts = np.asarray(counts)
+        max_spikes = counts.max(axis=1, initial=0)
+        amount_max = (counts == max_spikes[:, None]).sum(axis=1)
+        return DecodedBatch(
+            values=self.get_best_classes(counts),
+            ties=(max_spikes > 0) & (amount_max > 1),
+            rates=counts / self.simulated_seconds,
+        )
+
+    def get_decided(
+        self, counts: np.ndarray, max_additional: int
+    ) -> np.ndarray:
+        """
+        A class is decided, if no other class can reach its spikes
+        Without a unique class, any further spike can change the class
+
+        :param counts: spike counts, one row for each output
+        :param max_additional: maximum amount of further spikes per neuron
+        :return:
+        """
+        counts = np.asarray(counts)
+        if max_additional == 0:
+            return np.ones(len(counts), dtype=bool)
+        if counts.shape[1] == 1:
+            return counts[:, 0] > 0
+
+        highest = np.sort(counts, axis=1)[:, -2:]
+        return highest[:, 1] - highest[:, 0] > max_additional
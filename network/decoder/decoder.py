@@ -1,6 +1,19 @@
 """
 Decoder class to convert values into spikes
 """
+from typing import NamedTuple
+
+import numpy as np
+
+
+class DecodedBatch(NamedTuple):
+    """
+    Decoded values of multiple outputs, one entry for each output
+    """
+
+    values: np.ndarray  # decoded value, e.g. class or boolean
+    ties: np.ndarray  # whether the value could not be decided clearly
+    rates: np.ndarray  # rate of each output neuron in Hz
 
 
 class Decoder:
@@ -19,3 +32,25 @@ class Decoder:
         :return:
         """
         raise NotImplementedError("Please Implement this method")
+
+    def decode_batch(self, counts: np.ndarray) -> DecodedBatch:
+        """
+        Abstract function, to decode multiple outputs at once
+
+        :param counts: spike counts, one row for each output,
+            one column for each output neuron
+        :return:
+        """
+        raise NotImplementedError("Please Implement this method")
+
+    def get_decided(
+        self, counts: np.ndarray, max_additional: int
+    ) -> np.ndarray:
+        """
+        Abstract function, whether decoded values can't change anymore
+
+        :param counts: spike counts, one row for each output
+        :param max_additional: maximum amount of further spikes per neuron
+        :return: boolean for each output
+        """
+        raise NotImplementedError("Please Implement this method")
@@ -3,10 +3,13 @@ Implementation of a binary encoder using brian
 """
 from typing import List, Tuple
 
-from brian2 import SpikeGeneratorGroup, array, ms, np, second
+from brian2 import SpikeGeneratorGroup, ms, np, second
 
 from network.encoder.binary import BinaryEncoder
-from network.encoder.brian.encoder import BrianEncoder
+from network.encoder.brian.encoder import (
+    BrianEncoder,
+    get_regular_spike_times,
+)
 
 
 class BinaryBrianEncoder(BinaryEncoder, BrianEncoder):
@@ -34,54 +37,58 @@ class BinaryBrianEncoder(BinaryEncoder, BrianEncoder):
         :param spike_data:
         :return:
         """
-        input_patterns = len(spike_data)
-        spike_indices = []
-        times = []
-
-        for i, data in enumerate(spike_data):
-            sd_spike_indices, sd_times = self._get_spikes(spike_data=data)
-
-            # add offset, because of multiple inputs
-            sd_spike_indices += i * self.number_of_neurons
-
-            spike_indices.extend(sd_spike_indices)
-            times.extend(sd_times)
-
-        amount_spike_generators = self.number_of_neurons * input_patterns
-        times = times * second
+        spike_indices, times = self._get_all_spikes(spike_data)
+        amount_spike_generators = self.number_of_neurons * len(spike_data)
         return SpikeGeneratorGroup(
             N=amount_spike_generators, indices=spike_indices, times=times
         )
 
-    def _get_spikes(self, spike_data: Tuple[bool]):
+    def set_spike_data(self, spike_generator, spike_data: List[Tuple[bool]]):
         """
-        Get spike times and indices for the single given value
+        Set the spikes for new input data to a spike generator group
+
+        :param spike_generator:
         :param spike_data:
         :return:
         """
-        spike_indices = []
-        times = []
-        for index, neuron_data in enumerate(spike_data):
-            neuron_spike_times = self._value_to_spikes(neuron_data)
-            neuron_indices = np.full(len(neuron_spike_times), index)
+        spike_indices, times = self._get_all_spikes(spike_data)
+        spike_generator.set_spikes(spike_indices, times)
 
-            spike_indices.extend(neuron_indices)
-            times.extend(neuron_spike_times)
+    def get_spike_times(self, spike_data: List[Tuple[bool]], duration=1):
+        """
+        Spike indices and times (without unit) for the given data
+        The duration is given by the simulation time of the encoder
 
-        return array(spike_indices), array(times)
+        :param spike_data:
+        :param duration:
+        :return:
+        """
+        return self.get_cached_spike_times(spike_data)
 
-    def _value_to_spikes(self, value: bool):
+    def _get_all_spikes(self, spike_data: List[Tuple[bool]]):
         """
-        Convert a single value to a spike (time) pattern
-        :param value:
+        Get spike indices and times (with unit) for all of the given data
+        Each pattern has its own spike generators
+
+        :param spike_data:
         :return:
         """
-        target_rate = self.true_rate if value else self.false_rate
-        time_until_spike = (1 * second) / target_rate
-        number_of_spikes = int(
-            self.simulation_time / time_until_spike
-        )  # floor to next lower int
-        spike_times = np.array(
-            [time_until_spike * i for i in range(number_of_spikes)]
-        )
-        return spike_times
+        spike_indices, times = self.get_cached_spike_times(spike_data)
+        return spike_indices, times * second
+
+    def _calculate_spike_times(self, spike_data: List[Tuple[bool]]):
+        """
+        Spike indices and times (without unit) for all of the given data
+
+        :param spike_data:
+        :return:
+        """
+        values = np.asarray(spike_data, dtype=bool).reshape(-1)
+        target_rate = np.where(values, self.true_rate, self.false_rate)
+        time_until_spike = 1 / target_rate
+        # floor to next lower int
+        number_of_spikes = (
+            float(self.simulation_time / second) / time_until_spike
+        ).astype(int)
+
+        return get_regular_spike_times(time_until_spike, number_of_spikes)
@@ -1,16 +1,54 @@
 """
 Interface for brian encoders
 """
-from brian2 import SpikeGeneratorGroup
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+from brian2 import SpikeGeneratorGroup, second
 
 from network.encoder.encoder import Encoder
 
+# amount of distinct patterns, whose spikes are kept by an encoder
+PATTERN_CACHE_SIZE = 10000
+# amount of concatenated data sets, kept by an encoder
+LAYOUT_CACHE_SIZE = 4
+
+
+def get_regular_spike_times(
+    intervals: np.ndarray, counts: np.ndarray, first: int = 0
+):
+    """
+    Spike indices and times of regular spike trains for multiple neurons
+    Neuron i spikes counts[i] times, at multiples of intervals[i],
+    beginning with the given multiple
+
+    :param intervals: time between spikes for each neuron (without unit)
+    :param counts: amount of spikes for each neuron
+    :param first: multiple of the interval of the first spike
+    :return: indices and times (without unit), ordered by neuron
+    """
+    counts = np.maximum(counts, 0)
+    spike_indices = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    multiples = np.arange(counts.sum()) - np.repeat(starts, counts) + first
+    return spike_indices, np.repeat(intervals, counts) * multiples
+
 
 class BrianEncoder(Encoder):
     """
     Abstract class for brian encoders
+    Spikes of deterministic encoders are cached for each input pattern
     """
 
+    _pattern_spikes: Dict[tuple, Tuple[np.ndarray, np.ndarray]]
+    _layouts: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]"
+
+    def __init__(self, number_of_neurons: int):
+        super().__init__(number_of_neurons=number_of_neurons)
+        self._pattern_spikes = {}
+        self._layouts = OrderedDict()
+
     def get_spike_generator(self, spike_data) -> SpikeGeneratorGroup:
         """
         Should return a spike generator for the given data
@@ -20,9 +58,139 @@ class BrianEncoder(Encoder):
         """
         raise NotImplementedError("Please Implement this method")
 
+    def set_spike_data(self, spike_generator: SpikeGeneratorGroup, spike_data):
+        """
+        Replace the data of a spike generator from get_spike_generator,
+        so the same brian network can be simulated with new data
+
+        :param spike_generator: created with the same amount of data
+        :param spike_data:
+        :return:
+        """
+        raise NotImplementedError("Please Implement this method")
+
+    def get_padded_spike_generator(
+        self, spike_data, size: int, name: str
+    ) -> SpikeGeneratorGroup:
+        """
+        Spike generator for the given data with a fixed amount of generators
+        and a fixed name, e.g. to reuse compiled code for new data
+        Generators after the ones of the data don't spike
+
+        :param spike_data:
+        :param size: amount of generators, at least the amount of the data
+        :param name: brian name of the generator
+        :return:
+        """
+        spike_indices, times = self.get_cached_spike_times(spike_data)
+        return SpikeGeneratorGroup(
+            N=size, indices=spike_indices, times=times * second, name=name
+        )
+
+    def get_spike_times(self, spike_data, duration: float = 1):
+        """
+        Spike indices and times of the spikes, the spike generator would
+        produce, for simulators without brian
+
+        :param spike_data:
+        :param duration: simulated time in seconds
+        :return: indices and times in seconds (without unit)
+        """
+        raise NotImplementedError("Please Implement this method")
+
     def is_deterministic(self):
         """
         whether the spikes produced are deterministic, and can be reused
         :return:
         """
         return True
+
+    def _calculate_spike_times(self, spike_data):
+        """
+        Calculate spike indices and times (without unit) for the given data,
+        each pattern has its own spike generators
+
+        :param spike_data:
+        :return:
+        """
+        raise NotImplementedError("Please Implement this method")
+
+    def get_cached_spike_times(self, spike_data: List[tuple]):
+        """
+        Spike indices and times (without unit) for the given data
+        For a deterministic encoder, the spikes of each pattern are
+        calculated once and a data set is a concatenation of them
+
+        :param spike_data:
+        :return: read only arrays, ordered by spike generator
+        """
+        if not self.is_deterministic():
+            return self._calculate_spike_times(spike_data)
+
+        key = tuple(spike_data)
+        if key in self._layouts:
+            self._layouts.move_to_end(key)
+            return self._layouts[key]
+
+        pattern_spikes = self._get_pattern_spikes(key)
+        parts = [pattern_spikes[pattern] for pattern in key]
+        counts = np.array([len(indices) for indices, _ in parts], dtype=int)
+        # shift indices to the spike generators of the pattern position
+        offsets = np.arange(len(key)) * self.number_of_neurons
+        spike_indices = np.concatenate(
+            [indices for indices, _ in parts] + [np.zeros(0, dtype=int)]
+        ) + np.repeat(offsets, counts)
+        times = np.concatenate([times for _, times in parts] + [np.zeros(0)])
+        spike_indices.setflags(write=False)
+        times.setflags(write=False)
+
+        self._layouts[key] = (spike_indices, times)
+        if len(self._layouts) > LAYOUT_CACHE_SIZE:
+            self._layouts.popitem(last=False)
+        return spike_indices, times
+
+    def _get_pattern_spikes(self, spike_data: Tuple[tuple, ...]):
+        """
+        Spikes of each distinct pattern, all uncached patterns are
+        calculated at once
+
+        :param spike_data:
+        :return: pattern -> indices (of the pattern's generators) and times
+        """
+        distinct = list(dict.fromkeys(spike_data))
+        missing = [p for p in distinct if p not in self._pattern_spikes]
+        if len(missing) > 0:
+            spike_indices, times = self._calculate_spike_times(missing)
+            spike_indices = np.asarray(spike_indices, dtype=int)
+            times = np.asarray(times, dtype=float)
+            # spikes are ordered by spike generator, so also by pattern
+            bounds = np.searchsorted(
+                spike_indices,
+                np.arange(len(missing) + 1) * self.number_of_neurons,
+            )
+            for i, pattern in enumerate(missing):
+                start, end = bounds[i], bounds[i + 1]
+                self._pattern_spikes[pattern] = (
+                    spike_indices[start:end] - i * self.number_of_neurons,
+                    times[start:end],
+                )
+
+        pattern_spikes = {p: self._pattern_spikes[p] for p in distinct}
+
+        # forget the oldest patterns, e.g. for continuously changing inputs
+        excess = len(self._pattern_spikes) - PATTERN_CACHE_SIZE
+        if excess > 0:
+            for pattern in list(self._pattern_spikes)[:excess]:
+                del self._pattern_spikes[pattern]
+        return pattern_spikes
+
+    def precompute(self, spike_data: List[tuple]):
+        """
+        Calculate the spikes of a fixed data set in advance,
+        so spike generators for it are built from a concatenation only
+
+        :param spike_data: e.g. the distinct training patterns
+        :return:
+        """
+        if self.is_deterministic():
+            self.get_cached_spike_times(spike_data)
@@ -1,9 +1,12 @@
 from typing import List, Tuple
 
 import numpy as np
-from brian2 import Hz, PoissonGroup, SpikeGeneratorGroup, array, second
+from brian2 import Hz, PoissonGroup, SpikeGeneratorGroup, second
 
-from network.encoder.brian.encoder import BrianEncoder
+from network.encoder.brian.encoder import (
+    BrianEncoder,
+    get_regular_spike_times,
+)
 from network.encoder.float import FloatEncoder
 
 
@@ -35,50 +38,90 @@ class FloatBrianEncoder(FloatEncoder, BrianEncoder):
         :param spike_data:
         :return:
         """
-        rates = self.get_spike_rates(spike_data)
-        spike_indices, times = self._convert_rate_to_brian(rates)
-        times = times * second
+        spike_indices, times = self.get_cached_spike_times(spike_data)
 
         return SpikeGeneratorGroup(
-            N=len(rates), indices=spike_indices, times=times
+            N=len(spike_data) * self.number_of_neurons,
+            indices=spike_indices,
+            times=times * second,
         )
 
-    def _convert_rate_to_brian(self, rates: List[int]):
+    def set_spike_data(self, spike_generator, spike_data: List[Tuple[float]]):
         """
-        Convert a rate to brian spike indices and spike times (without unit)
+        Set new rates to a spike generator
 
-        :param rates:
+        :param spike_generator:
+        :param spike_data:
         :return:
         """
-        times = []
-        spike_indices = []
+        if self.poisson:
+            spike_generator.rates = self.get_spike_rates(spike_data) * Hz
+        else:
+            spike_indices, times = self.get_cached_spike_times(spike_data)
+            spike_generator.set_spikes(spike_indices, times * second)
 
-        for index, rate in enumerate(rates):
-            neuron_spike_times = self._value_to_spikes(rate)
-            neuron_indices = np.full(len(neuron_spike_times), index)
+    def get_padded_spike_generator(
+        self, spike_data: List[Tuple[float]], size: int, name: str
+    ):
+        """
+        Spike generator with a fixed size and name,
+        additional poisson generators have a rate of zero
 
-            spike_indices.extend(neuron_indices)
-            times.extend(neuron_spike_times)
+        :param spike_data:
+        :param size:
+        :param name:
+        :return:
+        """
+        if not self.poisson:
+            return super().get_padded_spike_generator(spike_data, size, name)
 
-        return array(spike_indices), array(times)
+        rates = np.zeros(size)
+        spike_rates = self.get_spike_rates(spike_data)
+        rates[: len(spike_rates)] = spike_rates
+        return PoissonGroup(size, rates * Hz, name=name)
 
-    @staticmethod
-    def _value_to_spikes(target_rate):
+    def get_spike_times(self, spike_data: List[Tuple[float]], duration=1):
         """
-        Convert a single value to a spike (time) pattern
-        :param value:
+        Spike indices and times (without unit) for the given data
+        Poisson spikes are drawn with numpy's random generator
+
+        :param spike_data:
+        :param duration: simulated time in seconds
+        :return:
+        """
+        if not self.poisson:
+            return self.get_cached_spike_times(spike_data)
+
+        # poisson process: random amount of spikes at uniform times
+        rates = self.get_spike_rates(spike_data)
+        counts = np.random.poisson(np.array(rates) * duration)
+        spike_indices = np.repeat(np.arange(len(rates)), counts)
+        times = np.random.uniform(0, duration, size=spike_indices.size)
+        return spike_indices, times
+
+    def _calculate_spike_times(self, spike_data: List[Tuple[float]]):
+        """
+        Exact spike indices and times (without unit) for the given data
+
+        :param spike_data:
         :return:
         """
-        time_until_spike = (1 * second) / (
-            target_rate + 1
-        )  # off by one, to center spikes
-        number_of_spikes = int(
-            (1 * second) / time_until_spike
-        )  # floor to next lower int
-        spike_times = np.array(
-            [time_until_spike * i for i in range(1, number_of_spikes)]
+        return self._convert_rate_to_brian(self.get_spike_rates(spike_data))
+
+    def _convert_rate_to_brian(self, rates: List[int]):
+        """
+        Convert rates to brian spike indices and spike times (without unit)
+        Spikes are spread evenly, off by one to center them
+
+        :param rates:
+        :return:
+        """
+        time_until_spike = 1 / (np.asarray(rates, dtype=float) + 1)
+        # floor to next lower int, the last spike would be at 1 second
+        number_of_spikes = (1 / time_until_spike).astype(int)
+        return get_regular_spike_times(
+            time_until_spike, number_of_spikes - 1, first=1
         )
-        return spike_times
 
     def _get_poisson_spike_generator(self, spike_data: List[Tuple[float]]):
         """
@@ -98,12 +141,9 @@ class FloatBrianEncoder(FloatEncoder, BrianEncoder):
         :param spike_data:
         :return:
         """
-        rates = []
-        for data_set in spike_data:
-            for value in data_set:
-                rates.append(self.get_rate(value))
-
-        return rates
+        values = np.asarray(spike_data, dtype=float).reshape(-1)
+        # same as get_rate for all values at once
+        return ((values * 100).astype(int) + 10).tolist()
 
     @staticmethod
     def get_rate(value):
@@ -0,0 +1,102 @@
+"""
+Provide an append-only log file, with one json line for each epoch
+"""
+import json
+import os
+import re
+from typing import Iterator, List, Union
+
+# characters to read to tell a log from a json file
+HEADER_SIZE = 256
+LOG_HEADER = re.compile(r'\s*\{\s*"took"\s*:')
+
+
+def is_epoch_log(filename: Union[str, os.PathLike]) -> bool:
+    """
+    Whether a file is an epoch log instead of a json file of the stats
+    Only the beginning is read, a json file can be a single large line
+    An empty file is an empty log
+
+    :param filename:
+    :return:
+    """
+    with open(os.fspath(filename), "r") as f:
+        prefix = f.read(HEADER_SIZE)
+    if prefix.strip() == "":
+        return True
+    # each line of the log starts with the time of the epoch
+    return LOG_HEADER.match(prefix) is not None
+
+
+class EpochLog:
+    """
+    Log of the epochs of a stats, only new epochs are written to the file
+    Each line is the json object of an epoch, a line without line break
+    (e.g. of an aborted write) is removed when opening the log
+    """
+
+    filename: str
+    _offsets: List[int]  # position of each epoch in the file
+
+    def __init__(self, filename: str):
+        """
+        :param filename: created, if not existing
+        """
+        self.filename = filename
+        self._offsets = []
+
+        position = 0
+        with open(filename, "a+b") as f:
+            f.seek(0)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    f.truncate(position)
+                    break
+                self._offsets.append(position)
+                position += len(line)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def append(self, records: List[dict]):
+        """
+        Write epochs at the end of the log
+
+        :param records: json objects of the epochs
+        :return:
+        """
+        if len(records) == 0:
+            return
+
+        lines = [json.dumps(record) + "\n" for record in records]
+        with open(self.filename, "ab") as f:
+            position = f.tell()
+            # a single write, to not leave partial epochs behind
+            f.write("".join(lines).encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+        for line in lines:
+            self._offsets.append(position)
+            position += len(line.encode())
+
+    def read(self, epoch: int) -> dict:
+        """
+        Read a single epoch from the file
+
+        :param epoch: index of the epoch
+        :return: json object of the epoch
+        """
+        with open(self.filename, "rb") as f:
+            f.seek(self._offsets[epoch])
+            return json.loads(f.readline())
+
+    def read_all(self) -> Iterator[dict]:
+        """
+        Read all epochs from the file
+
+        :return: json objects of the epochs in order
+        """
+        with open(self.filename, "rb") as f:
+            for _ in range(len(self)):
+                yield json.loads(f.readline())
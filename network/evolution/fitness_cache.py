@@ -0,0 +1,116 @@
+"""
+Provide a bounded in-memory cache for fitness scores
+"""
+import sys
+from collections import OrderedDict
+from typing import Iterable, Optional, Set
+
+# approximate memory of an entry in the ordered dict, without key and value
+ENTRY_OVERHEAD = 100
+
+
+class FitnessCache:
+    """
+    Least recently used cache from network fingerprint to fitness score
+    Pinned fingerprints (e.g. elites) are never evicted
+    """
+
+    max_entries: Optional[int]
+    max_bytes: Optional[int]
+
+    _scores: "OrderedDict[str, float]"
+    _pinned: Set[str]
+    _memory_size: int
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+        :param max_entries: maximum amount of fitness scores, None for no limit
+        :param max_bytes: maximum memory of the cache, None for no limit
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._scores = OrderedDict()
+        self._pinned = set()
+        self._memory_size = 0
+
+    @staticmethod
+    def _get_entry_size(fingerprint: str, fitness: float) -> int:
+        """
+        Approximate memory of a single entry
+
+        :return: size in bytes
+        """
+        return (
+            sys.getsizeof(fingerprint)
+            + sys.getsizeof(fitness)
+            + ENTRY_OVERHEAD
+        )
+
+    def __contains__(self, fingerprint: str):
+        return fingerprint in self._scores
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __getitem__(self, fingerprint: str) -> float:
+        fitness = self._scores[fingerprint]
+        self._scores.move_to_end(fingerprint)
+        return fitness
+
+    def __setitem__(self, fingerprint: str, fitness: float):
+        if fingerprint in self._scores:
+            self._memory_size -= self._get_entry_size(
+                fingerprint, self._scores[fingerprint]
+            )
+        self._scores[fingerprint] = fitness
+        self._scores.move_to_end(fingerprint)
+        self._memory_size += self._get_entry_size(fingerprint, fitness)
+
+        self._evict()
+
+    def _is_full(self) -> bool:
+        if self.max_entries is not None and len(self) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self._memory_size > self.max_bytes:
+            return True
+        return False
+
+    def _evict(self):
+        """
+        Remove least recently used, not pinned scores until within limits
+
+        :return:
+        """
+        # each entry is visited at most once, in case all are pinned
+        for _ in range(len(self._scores)):
+            if not self._is_full():
+                break
+            fingerprint = next(iter(self._scores))
+            if fingerprint in self._pinned:
+                self._scores.move_to_end(fingerprint)
+                continue
+            fitness = self._scores.pop(fingerprint)
+            self._memory_size -= self._get_entry_size(fingerprint, fitness)
+
+    def pin(self, fingerprints: Iterable[str]):
+        """
+        Keep the given fingerprints, replaces previously pinned ones
+
+        :param fingerprints:
+        :return:
+        """
+        self._pinned = set(fingerprints)
+        self._evict()
+
+    def get_memory_size(self) -> int:
+        """
+        Approximate memory used by the cached scores
+
+        :return: size in bytes
+        """
+        return self._memory_size
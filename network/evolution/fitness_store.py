@@ -0,0 +1,150 @@
+"""
+Provide a persistent storage for fitness scores, shared between runs
+"""
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+
+class FitnessStore:
+    """
+    Store fitness scores of network fingerprints in a SQLite file
+    Scores are grouped by a namespace, which identifies the experiment settings
+    Multiple processes can read and write the same file at once
+    """
+
+    path: str
+    namespace: str
+    max_entries: Optional[int]
+
+    _connection: Optional[sqlite3.Connection] = None
+    _connection_pid: Optional[int] = None
+
+    def __init__(
+        self, path: str, namespace: str, max_entries: Optional[int] = None
+    ):
+        """
+        :param path: file of the SQLite database, created if not existing
+        :param namespace: scores of different namespaces are separated
+        :param max_entries: remove least recently used scores above this amount
+        """
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+
+        with self._get_connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS fitness ("
+                "namespace TEXT NOT NULL, "
+                "fingerprint TEXT NOT NULL, "
+                "fitness REAL NOT NULL, "
+                "used REAL NOT NULL, "
+                "PRIMARY KEY (namespace, fingerprint))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS fitness_used ON fitness (used)"
+            )
+
+    def __getstate__(self):
+        # connections can't be shared with other processes
+        state = self.__dict__.copy()
+        state.pop("_connection", None)
+        state.pop("_connection_pid", None)
+        return state
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """
+        Get the connection for the current process
+        A new connection is created after a fork
+
+        :return:
+        """
+        if self._connection is None or self._connection_pid != os.getpid():
+            # wait for other processes, instead of failing with locked file
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            # write ahead log allows reading, while another process writes
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def get(self, fingerprints: List[str]) -> Dict[str, float]:
+        """
+        Get stored fitness scores, unknown fingerprints are left out
+
+        :param fingerprints:
+        :return: fingerprint -> fitness
+        """
+        unique = list(set(fingerprints))
+        if len(unique) == 0:
+            return {}
+
+        found = {}
+        with self._get_connection() as connection:
+            # limit amount of sql variables per query
+            for i in range(0, len(unique), 500):
+                part = unique[i : i + 500]
+                placeholders = ",".join("?" for _ in part)
+                rows = connection.execute(
+                    "SELECT fingerprint, fitness FROM fitness "
+                    f"WHERE namespace = ? AND fingerprint IN ({placeholders})",
+                    [self.namespace] + part,
+                )
+                found.update(rows)
+
+            # mark as recently used, to keep them on eviction
+            used = time.time()
+            connection.executemany(
+                "UPDATE fitness SET used = ? "
+                "WHERE namespace = ? AND fingerprint = ?",
+                [(used, self.namespace, f) for f in found.keys()],
+            )
+        return found
+
+    def put(self, fitness_scores: Dict[str, float]):
+        """
+        Store fitness scores and evict old scores above the maximum amount
+
+        :param fitness_scores: fingerprint -> fitness
+        :return:
+        """
+        if len(fitness_scores) == 0:
+            return
+
+        used = time.time()
+        with self._get_connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO fitness "
+                "(namespace, fingerprint, fitness, used) VALUES (?, ?, ?, ?)",
+                [
+                    (self.namespace, fingerprint, fitness, used)
+                    for fingerprint, fitness in fitness_scores.items()
+                ],
+            )
+
+            if self.max_entries is not None:
+                connection.execute(
+                    "DELETE FROM fitness WHERE rowid IN ("
+                    "SELECT rowid FROM fitness ORDER BY used DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def __len__(self):
+        with self._get_connection() as connection:
+            (amount,) = connection.execute(
+                "SELECT COUNT(*) FROM fitness WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        return amount
+
+    def close(self):
+        """
+        Close the connection of the current process
+
+        :return:
+        """
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+        self._connection_pid = None
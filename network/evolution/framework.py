@@ -1,11 +1,20 @@
 """
 Provide the framework class, for general access to the evolutionary algorithms
 """
+import json
+import multiprocessing
+import os
 import random
 import tempfile
+import warnings
+from functools import partial
+from multiprocessing.pool import Pool
 from typing import Dict, List, Optional, Tuple
 
 from experiment.experiment import Experiment
+from network.compact_network import get_fingerprint
+from network.evolution.fitness_cache import FitnessCache
+from network.evolution.fitness_store import FitnessStore
 from network.evolution.generator import Generator
 from network.evolution.origin import Origin, ReproductionType
 from network.evolution.reproduction.reproduction import Reproduction
@@ -14,6 +23,8 @@ from network.evolution.stats import Stats
 from network.network import Network
 from utility.configurable import Configurable
 from utility.configuration import Configuration
+from utility.list_operation import flat_list, split_list
+from utility.timing import span, timings, with_timings
 from utility.validation import (
     greater_than_zero,
     is_bool,
@@ -23,6 +34,33 @@ from utility.validation import (
     is_positive,
 )
 
+# experiment of a worker process for parallel evaluation
+worker_experiment: Optional[Experiment] = None
+
+
+def init_worker(experiment: Experiment):
+    """
+    Initialize a worker process with its own copy of the experiment
+
+    :param experiment:
+    :return:
+    """
+    global worker_experiment
+    worker_experiment = experiment
+
+
+def evaluate_chunk(chunk: Tuple[List[Network], Optional[int]]):
+    """
+    Calculate the fitness scores of a chunk of networks in a worker
+
+    :param chunk: networks and seed for the evaluation
+    :return: fitness scores in order of the networks
+    """
+    networks, seed = chunk
+    if seed is not None:
+        worker_experiment.set_seed(seed)
+    return worker_experiment.fitness(networks)
+
 
 class Framework(Configurable):
     """
@@ -34,7 +72,13 @@ class Framework(Configurable):
     reproduction: Reproduction
 
     temporary_file: Optional[str] = None
-    fitness_cache: Dict[Network, float] = {}
+    fitness_cache: FitnessCache
+    fitness_store: Optional[FitnessStore] = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    _chunk_random: random.Random
+    _pool: Optional[Pool] = None
 
     # configurable attributes
     random_factor: float = 0.1
@@ -43,9 +87,19 @@ class Framework(Configurable):
     num_generations: int = 50
     fitness_target: float = None
     print_status: bool = True
+    print_timings: bool = False
     save_stat_regularly: bool = False
+    stats_keep_last: Optional[int] = None
+    stats_keep_every: Optional[int] = None
     cache_evolution: bool = True
     cache_evolution_warm_up: bool = True
+    cache_evolution_size: Optional[int] = 100000
+    cache_evolution_memory: Optional[float] = None
+    evaluation_workers: int = 1
+    evaluation_chunk_size: int = 25
+    fitness_store_file: Optional[str] = None
+    fitness_store_stochastic: bool = False
+    fitness_store_size: int = 1000000
     seed: Optional[int] = None
 
     def __init__(
@@ -67,8 +121,21 @@ class Framework(Configurable):
             experiment=experiment, configuration=configuration
         )
         self.reproduction = Reproduction(configuration=configuration)
-
-        if self.save_stat_regularly:
+        # separate generator, to not change the evolution by parallelization
+        self._chunk_random = random.Random(self.seed)
+        self.fitness_cache = FitnessCache(
+            max_entries=self.cache_evolution_size,
+            max_bytes=self.get_cache_evolution_bytes(),
+        )
+        if self.use_fitness_store():
+            self.fitness_store = FitnessStore(
+                self.fitness_store_file,
+                namespace=self.get_fitness_store_namespace(),
+                max_entries=self.fitness_store_size,
+            )
+
+        # evicted populations of the stats are kept in the file
+        if self.save_stat_regularly or self.stats_keep_last is not None:
             tmp_file = tempfile.NamedTemporaryFile(delete=False)
             self.temporary_file = tmp_file.name
 
@@ -102,11 +169,27 @@ class Framework(Configurable):
         self.add_configurable_attribute(
             "print_status", "Print progress of the evolution", validate=is_bool
         )
+        self.add_configurable_attribute(
+            "print_timings",
+            "Print the time of each phase of an epoch in the status line",
+            validate=is_bool,
+        )
         self.add_configurable_attribute(
             "save_stat_regularly",
             "Save the stats after each epoch",
             validate=is_bool,
         )
+        self.add_configurable_attribute(
+            "stats_keep_last",
+            "Keep the populations of this amount of latest epochs in memory, "
+            "older ones are only saved in the file of the stats",
+            validate=[is_int, greater_than_zero],
+        )
+        self.add_configurable_attribute(
+            "stats_keep_every",
+            "Also keep the population of every k-th epoch in memory",
+            validate=[is_int, greater_than_zero],
+        )
         self.add_configurable_attribute(
             "cache_evolution",
             "Whether to reevalute existing networks during evolution",
@@ -117,12 +200,108 @@ class Framework(Configurable):
             "Whether to include evaluated stats into the cache",
             validate=is_bool,
         )
+        self.add_configurable_attribute(
+            "cache_evolution_size",
+            "Maximum amount of fitness scores in the cache",
+            validate=[is_int, greater_than_zero],
+        )
+        self.add_configurable_attribute(
+            "cache_evolution_memory",
+            "Maximum memory of the cache in MB",
+            validate=[is_number, greater_than_zero],
+        )
+        self.add_configurable_attribute(
+            "evaluation_workers",
+            "Amount of processes to evaluate networks in parallel",
+            validate=[is_int, greater_than_zero],
+        )
+        self.add_configurable_attribute(
+            "evaluation_chunk_size",
+            "Amount of networks evaluated with the same seed, the scores of "
+            "a seeded run are the same for any amount of evaluation workers",
+            validate=[is_int, greater_than_zero],
+        )
+        self.add_configurable_attribute(
+            "fitness_store_file",
+            "File to keep fitness scores across runs (deterministic "
+            "experiments)",
+        )
+        self.add_configurable_attribute(
+            "fitness_store_stochastic",
+            "Also keep fitness scores of stochastic experiments in the file",
+            validate=is_bool,
+        )
+        self.add_configurable_attribute(
+            "fitness_store_size",
+            "Maximum amount of fitness scores in the file",
+            validate=[is_int, greater_than_zero],
+        )
         self.add_configurable_attribute(
             "seed",
             "Seed for all network related random operations",
             validate=is_int,
         )
 
+    def get_cache_evolution_bytes(self) -> Optional[int]:
+        """
+        Maximum memory of the cache in bytes
+
+        :return:
+        """
+        if self.cache_evolution_memory is None:
+            return None
+        return int(self.cache_evolution_memory * 1024 * 1024)
+
+    def get_cache_information(self) -> str:
+        """
+        Return a string with the size and memory of the cache
+
+        :return:
+        """
+        memory = self.fitness_cache.get_memory_size() / 1024 / 1024
+        return (
+            f"Cache: {len(self.fitness_cache)} networks ({memory:.2f} MB), "
+            f"{self.cache_hits} hits, {self.cache_misses} misses"
+        )
+
+    def use_fitness_store(self):
+        """
+        Whether fitness scores should be kept in the fitness store file
+        Stochastic experiments only use it, when explicitly enabled
+
+        :return:
+        """
+        if self.fitness_store_file is None or not self.cache_evolution:
+            return False
+        return self.experiment.is_deterministic() or (
+            self.fitness_store_stochastic
+        )
+
+    def get_fitness_store_namespace(self) -> str:
+        """
+        Identify the experiment settings, scores are only reused for same ones
+
+        :return:
+        """
+        config = self._configuration.get_config_dict()
+        if self.experiment.is_deterministic():
+            # the seed has no influence on the fitness score
+            seed_policy = "deterministic"
+        else:
+            seed_policy = f"seed:{self.seed}"
+
+        return json.dumps(
+            {
+                "experiment": config.get("experiment"),
+                "experiment_options": config.get("experiment_options"),
+                "seed_policy": seed_policy,
+                # keys of networks are not stripped for e.g. a size penalty
+                "structure": self.experiment.fitness_depends_on_structure(),
+            },
+            sort_keys=True,
+            default=str,
+        )
+
     def get_temporary_file(self):
         """
         Returns the temporary file, to save the stats after each epoch to
@@ -152,45 +331,67 @@ class Framework(Configurable):
 
         population, fitness_scores = stats.get_latest_population_fitness()
 
-        if self.print_status and self.temporary_file is not None:
-            print(f"Saving stats after each epoch to: {self.temporary_file}")
-
-        for i in range(start_epoch, epochs):
-            stats.start_epoch()
-
-            if population is None:
-                # first time: generate new population
-                population = self.generator.generate_networks(
-                    self.population_size
-                )
-                operations = [
-                    Origin(ReproductionType.Random, []) for _ in population
-                ]
-            else:
-                # reproduction mechanisms
-                population, operations = self.do_epoch(
-                    population, fitness_scores
-                )
-
-            fitness_scores = self.evaluate(population)
+        if self.temporary_file is not None:
+            if stats.log is None:
+                stats.set_log(self.temporary_file)
+            elif stats.log.filename != self.temporary_file:
+                # resumed runs keep appending to the log of the stats
+                if os.path.getsize(self.temporary_file) == 0:
+                    os.remove(self.temporary_file)
+                self.temporary_file = stats.log.filename
 
-            stats.add_epoch(population, fitness_scores, operations)
-            if self.print_status:
-                info = stats.get_epoch_information(i, epochs)
-                print(info)
+        if self.stats_keep_last is not None:
+            stats.set_retention(self.stats_keep_last, self.stats_keep_every)
 
-            # save stats after each epoch
-            if self.temporary_file is not None:
-                stats.to_file(self.temporary_file, indent=None)
+        if self.print_status and self.temporary_file is not None:
+            print(f"Saving stats after each epoch to: {self.temporary_file}")
 
-            # when specified a target, may abort evolution loop
-            if self.fitness_target is not None:
-                best_network = best(population, fitness_scores, n=1)
-                best_index = population.index(best_network[0])
-                best_fitness = fitness_scores[best_index]
-                if best_fitness >= self.fitness_target:
-                    # break evolution, if target reached
-                    break
+        try:
+            for i in range(start_epoch, epochs):
+                stats.start_epoch()
+
+                if population is None:
+                    # first time: generate new population
+                    with span("generation"):
+                        population = self.generator.generate_networks(
+                            self.population_size
+                        )
+                    operations = [
+                        Origin(ReproductionType.Random, []) for _ in population
+                    ]
+                else:
+                    # reproduction mechanisms
+                    population, operations = self.do_epoch(
+                        population, fitness_scores
+                    )
+
+                fitness_scores = self.evaluate(population)
+
+                stats.add_epoch(population, fitness_scores, operations)
+                if self.print_status:
+                    info = stats.get_epoch_information(i, epochs)
+                    if self.cache_evolution:
+                        info += f" - {self.get_cache_information()}"
+                    if self.print_timings:
+                        info += f" - {stats.get_timing_information(i)}"
+                    print(info)
+
+                # save the new epoch after each epoch
+                if self.temporary_file is not None:
+                    stats.write_log()
+
+                # when specified a target, may abort evolution loop
+                if self.fitness_target is not None:
+                    best_index = best(
+                        list(range(len(population))), fitness_scores, n=1
+                    )[0]
+                    best_fitness = fitness_scores[best_index]
+                    if best_fitness >= self.fitness_target:
+                        # break evolution, if target reached
+                        break
+        finally:
+            # workers are kept for all epochs of the evolution
+            self.close_pool()
 
         return stats
 
@@ -207,25 +408,31 @@ class Framework(Configurable):
         """
         # inject random networks for diversity
         random_count = self.get_random_count()
-        random_networks = self.generator.generate_networks(random_count)
+        with span("generation"):
+            random_networks = self.generator.generate_networks(random_count)
         random_operations = [
             Origin(ReproductionType.Random, []) for _ in random_networks
         ]
 
         # fill up available spots with reproduction
         reproduce_amount = self.get_reproduction_amount()
-        (
-            reproduce_networks,
-            reproduce_operations,
-        ) = self.reproduction.create_networks(
-            population, fitness_score, reproduce_amount
-        )
-
-        best_networks = best(population, fitness_score, n=self.num_best)
-        best_operations = [
-            Origin(ReproductionType.Same, [population.index(n)])
-            for n in best_networks
-        ]
+        with span("reproduction"):
+            (
+                reproduce_networks,
+                reproduce_operations,
+            ) = self.reproduction.create_networks(
+                population, fitness_score, reproduce_amount
+            )
+
+        with span("selection"):
+            # by index, a population can contain the same network twice
+            best_indices = best(
+                list(range(len(population))), fitness_score, n=self.num_best
+            )
+            best_networks = [population[i] for i in best_indices]
+            best_operations = [
+                Origin(ReproductionType.Same, [i]) for i in best_indices
+            ]
 
         # should be in same order
         networks = best_networks + reproduce_networks + random_networks
@@ -254,6 +461,19 @@ class Framework(Configurable):
             0, self.population_size - self.num_best - self.get_random_count()
         )
 
+    def get_fitness_key(self, network: Network) -> str:
+        """
+        Key of a network in the fitness cache, networks with the same key
+        get the same fitness score
+
+        :param network:
+        :return:
+        """
+        # stripped neurons and synapses only matter, if the experiment counts
+        return get_fingerprint(
+            network, strip=not self.experiment.fitness_depends_on_structure()
+        )
+
     def evaluate(self, population: List[Network]):
         """
         Evaluate the given population on the fitness function
@@ -263,16 +483,153 @@ class Framework(Configurable):
         """
         # when no caching is specified perform fitness function on all elements
         if not self.cache_evolution:
-            return self.experiment.fitness(population)
+            with span("fitness"):
+                return self.fitness(population)
+
+        # structurally identical networks share the same fingerprint
+        with span("fingerprints"):
+            fingerprints = [self.get_fitness_key(n) for n in population]
+
+        # scores of this population, the cache may evict some of them
+        scores: Dict[str, float] = {}
+        non_cached: Dict[str, Network] = {}
+        for network, fingerprint in zip(population, fingerprints):
+            if fingerprint in scores or fingerprint in non_cached:
+                self.cache_hits += 1
+            elif fingerprint in self.fitness_cache:
+                self.cache_hits += 1
+                scores[fingerprint] = self.fitness_cache[fingerprint]
+            else:
+                self.cache_misses += 1
+                non_cached[fingerprint] = network
+
+        if self.fitness_store is not None:
+            # scores of previous runs with the same experiment settings
+            with span("fitness_store"):
+                stored = self.fitness_store.get(list(non_cached.keys()))
+            for fingerprint, fitness in stored.items():
+                scores[fingerprint] = fitness
+                del non_cached[fingerprint]
+            self.cache_hits += len(stored)
+            self.cache_misses -= len(stored)
+
+        with span("fitness"):
+            non_cached_fitness = self.fitness(list(non_cached.values()))
+        for fingerprint, fitness in zip(non_cached.keys(), non_cached_fitness):
+            scores[fingerprint] = fitness
+
+        if self.fitness_store is not None:
+            with span("fitness_store"):
+                self.fitness_store.put(
+                    dict(zip(non_cached, non_cached_fitness))
+                )
+
+        fitness_scores = [scores[f] for f in fingerprints]
+        # elites are kept for the next epoch, their score must not change
+        self.fitness_cache.pin(
+            best(fingerprints, fitness_scores, n=self.num_best)
+        )
+        for fingerprint, fitness in scores.items():
+            self.fitness_cache[fingerprint] = fitness
+
+        return fitness_scores
+
+    def fitness(self, networks: List[Network]) -> List[float]:
+        """
+        Calculate the fitness of the networks with the experiment
+        With multiple evaluation workers, the networks are split into chunks,
+        which are evaluated in parallel processes
+
+        :param networks:
+        :return: list of fitness scores in same order as the networks
+        """
+        if len(networks) == 0:
+            return []
+
+        parallel = self.is_parallel_evaluation()
+        chunks, seeds = self.split_evaluation(networks)
+        if parallel:
+            results = self.get_pool().map(
+                partial(with_timings, evaluate_chunk), list(zip(chunks, seeds))
+            )
+            fitness_scores = []
+            for scores, durations in results:
+                timings.add_all(durations)
+                fitness_scores.append(scores)
+        else:
+            fitness_scores = []
+            for chunk, seed in zip(chunks, seeds):
+                if seed is not None:
+                    self.experiment.set_seed(seed)
+                fitness_scores.append(self.experiment.fitness(chunk))
+        return flat_list(fitness_scores)
+
+    def split_evaluation(self, networks: List[Network]):
+        """
+        Split the networks into chunks, which are evaluated together
+
+        :param networks:
+        :return: chunks and the seed of each chunk, None to keep the seed
+        """
+        if self.seed is None or self.experiment.is_deterministic():
+            # the scores don't depend on the chunks
+            chunks = split_list(networks, self.evaluation_workers)
+            return chunks, [None for _ in chunks]
+
+        # same chunks and seeds in a serial and a parallel evaluation
+        size = self.evaluation_chunk_size
+        chunks = [
+            networks[start : start + size]
+            for start in range(0, len(networks), size)
+        ]
+        seeds = [self._chunk_random.randint(0, 2**31) for _ in chunks]
+        return chunks, seeds
+
+    def get_pool(self) -> Pool:
+        """
+        Worker processes for parallel evaluation, each with a copy of the
+        experiment, created once and kept until close_pool
+
+        :return:
+        """
+        if self._pool is None:
+            self._pool = Pool(
+                processes=self.evaluation_workers,
+                initializer=init_worker,
+                initargs=(self.experiment,),
+            )
+        return self._pool
+
+    def close_pool(self):
+        """
+        Stop the worker processes for parallel evaluation
+
+        :return:
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def is_parallel_evaluation(self):
+        """
+        Whether networks should be evaluated in multiple processes
+
+        :return:
+        """
+        if self.evaluation_workers <= 1:
+            return False
 
-        # possibility: use network hash -> takes more time than it saves
-        non_cached = [n for n in population if n not in self.fitness_cache]
-        non_cached_fitness = self.experiment.fitness(non_cached)
-        for network, fitness in zip(non_cached, non_cached_fitness):
-            self.fitness_cache[network] = fitness
+        if multiprocessing.current_process().daemon:
+            # e.g. in a grid search worker, processes can't have children
+            warnings.warn(
+                "Parallel evaluation is not possible in a daemon process, "
+                "evaluate in a single process instead"
+            )
+            self.evaluation_workers = 1
+            return False
 
-        # here, all elements should be now in the cache
-        return [self.fitness_cache[n] for n in population]
+        return True
 
     def warm_cache(self, stats: Stats):
         """
@@ -281,8 +638,9 @@ class Framework(Configurable):
         :param stats:
         :return:
         """
-        for epoch_stats in stats.data:
-            population = epoch_stats["population"]
-            fitness_scores = epoch_stats["fitness_scores"]
-            for network, fitness in zip(population, fitness_scores):
-                self.fitness_cache[network] = fitness
+        # each network once, with its latest fitness score
+        fitness_scores = stats.get_network_fitness()
+        networks = stats.get_networks(fitness_scores.keys())
+        for fingerprint, fitness in fitness_scores.items():
+            network = networks[fingerprint]
+            self.fitness_cache[self.get_fitness_key(network)] = fitness
@@ -0,0 +1,256 @@
+"""
+Provide an index of the lineage of the networks in the stats
+"""
+import csv
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from network.evolution.origin import Origin
+
+
+def _get_type_value(reproduction_type) -> str:
+    """
+    Value of a reproduction type, also for plain strings
+
+    :param reproduction_type: ReproductionType or str
+    :return:
+    """
+    return getattr(reproduction_type, "value", reproduction_type)
+
+
+class LineageIndex:
+    """
+    Parent pointers of the networks of each epoch, built from the operations
+    A network is identified by its epoch and its index in the population,
+    the parents of a network are in the previous epoch
+    Operations are counted along every path of the lineage, like in
+    Stats.get_origin, e.g. an ancestor of both parents is counted twice
+    """
+
+    # types are stored as index into this list, in order of occurrence
+    reproduction_types: List
+    _type_index: Dict[str, int]
+    # for each epoch, -1 if the epoch has no operations
+    _types: List[np.ndarray]
+    # for each epoch, parents of network i are parents[offsets[i]:offsets[i+1]]
+    _parent_offsets: List[np.ndarray]
+    _parents: List[np.ndarray]
+
+    def __init__(self):
+        self.reproduction_types = []
+        self._type_index = {}
+        self._types = []
+        self._parent_offsets = []
+        self._parents = []
+
+    def __len__(self):
+        return len(self._types)
+
+    def add_epoch(self, operations: List[Origin], size: int):
+        """
+        Add the next epoch
+
+        :param operations: origin of each network, can be empty
+        :param size: amount of networks in the epoch
+        :return:
+        """
+        if len(operations) == 0:
+            types = np.full(size, -1, dtype=np.int8)
+            offsets = np.zeros(size + 1, dtype=np.int64)
+            parents = np.zeros(0, dtype=np.int64)
+        else:
+            for operation in operations:
+                value = _get_type_value(operation.reproduction_type)
+                if value not in self._type_index:
+                    self._type_index[value] = len(self.reproduction_types)
+                    self.reproduction_types.append(operation.reproduction_type)
+
+            types = np.array(
+                [
+                    self._type_index[_get_type_value(o.reproduction_type)]
+                    for o in operations
+                ],
+                dtype=np.int8,
+            )
+            sizes = [len(o.associated_networks) for o in operations]
+            offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+            parents = np.array(
+                [p for o in operations for p in o.associated_networks],
+                dtype=np.int64,
+            )
+            if len(self) == 0:
+                # the first epoch has no previous epoch
+                offsets = np.zeros(size + 1, dtype=np.int64)
+                parents = parents[:0]
+
+        self._types.append(types)
+        self._parent_offsets.append(offsets)
+        self._parents.append(parents)
+
+    def get_size(self, epoch: int) -> int:
+        """
+        Amount of networks in an epoch
+
+        :param epoch: index of the epoch
+        :return:
+        """
+        return len(self._types[epoch])
+
+    def get_types(self, epoch: int) -> np.ndarray:
+        """
+        Reproduction type of each network in an epoch
+
+        :param epoch: index of the epoch
+        :return: index in reproduction_types, -1 if unknown
+        """
+        return self._types[epoch]
+
+    def get_parents(self, epoch: int) -> np.ndarray:
+        """
+        Parent pointer of each network in an epoch, to the first parent
+
+        :param epoch: index of the epoch
+        :return: index in the previous epoch, -1 if there is no parent
+        """
+        offsets = self._parent_offsets[epoch]
+        has_parent = offsets[1:] > offsets[:-1]
+        parents = np.full(self.get_size(epoch), -1, dtype=np.int64)
+        parents[has_parent] = self._parents[epoch][offsets[:-1][has_parent]]
+        return parents
+
+    def get_associated_networks(self, epoch: int, index: int) -> np.ndarray:
+        """
+        All parents of a network, like the associated networks of its origin
+
+        :param epoch: index of the epoch
+        :param index: index of the network in the epoch
+        :return: indices in the previous epoch
+        """
+        offsets = self._parent_offsets[epoch]
+        return self._parents[epoch][offsets[index] : offsets[index + 1]]
+
+    def _get_edges(self, epoch: int):
+        """
+        Connections of the networks in an epoch to their parents
+
+        :param epoch: index of the epoch
+        :return: children and parents, one element for each connection
+        """
+        offsets = self._parent_offsets[epoch]
+        children = np.repeat(np.arange(self.get_size(epoch)), np.diff(offsets))
+        return children, self._parents[epoch]
+
+    def _get_path_counts(self, epoch: int, networks: Optional[Sequence[int]]):
+        """
+        Amount of lineage paths from the networks to the networks of the same
+        and all previous epochs, until there are no more ancestors
+
+        :param epoch: index of the epoch
+        :param networks: indices in the epoch, None for all
+        :return: generator of epoch and counts (networks x epoch size)
+        """
+        if networks is None:
+            networks = np.arange(self.get_size(epoch))
+        networks = np.asarray(networks, dtype=np.int64)
+
+        counts = np.zeros((len(networks), self.get_size(epoch)))
+        counts[np.arange(len(networks)), networks] = 1
+        for e in range(epoch, -1, -1):
+            yield e, counts
+            if e == 0 or not counts.any():
+                break
+
+            # each connection passes the paths of the child to its parent
+            children, parents = self._get_edges(e)
+            parent_counts = np.zeros((len(networks), self.get_size(e - 1)))
+            np.add.at(
+                parent_counts, (slice(None), parents), counts[:, children]
+            )
+            counts = parent_counts
+
+    def get_ancestry(
+        self, epoch: int, networks: Optional[Sequence[int]] = None
+    ) -> List[np.ndarray]:
+        """
+        Ancestors of networks in all previous epochs
+        Needs networks x epoch size memory for each epoch
+
+        :param epoch: index of the epoch
+        :param networks: indices in the epoch, None for all
+        :return: for each epoch up to the given one, a mask (networks x epoch
+        size), whether a network of that epoch is an ancestor (or the network)
+        """
+        size = self.get_size(epoch) if networks is None else len(networks)
+        ancestry = [
+            np.zeros((size, self.get_size(e)), dtype=bool)
+            for e in range(epoch + 1)
+        ]
+        for e, counts in self._get_path_counts(epoch, networks):
+            ancestry[e] = counts > 0
+        return ancestry
+
+    def get_type_histogram(
+        self, epoch: int, networks: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """
+        Amount of each reproduction type in the full history of networks
+
+        :param epoch: index of the epoch
+        :param networks: indices in the epoch, None for all
+        :return: networks x reproduction types, order of reproduction_types
+        """
+        size = self.get_size(epoch) if networks is None else len(networks)
+        histogram = np.zeros((size, len(self.reproduction_types)))
+        for e, counts in self._get_path_counts(epoch, networks):
+            types = self._types[e]
+            known = np.flatnonzero(types >= 0)
+            np.add.at(histogram, (slice(None), types[known]), counts[:, known])
+        return histogram
+
+    def get_edge_list(self) -> np.ndarray:
+        """
+        All connections between parents and children
+
+        :return: rows of parent epoch, parent index, epoch, index and
+        index of the reproduction type
+        """
+        edges = [np.zeros((0, 5), dtype=np.int64)]
+        for epoch in range(1, len(self)):
+            children, parents = self._get_edges(epoch)
+            edges.append(
+                np.stack(
+                    [
+                        np.full(len(children), epoch - 1),
+                        parents,
+                        np.full(len(children), epoch),
+                        children,
+                        self._types[epoch][children],
+                    ],
+                    axis=1,
+                ).astype(np.int64)
+            )
+        return np.concatenate(edges)
+
+    def edge_list_to_file(self, filename: str):
+        """
+        Save the edge list as csv, e.g. for external graph tools
+        A node is identified by epoch and index in the population
+
+        :param filename:
+        :return:
+        """
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                [
+                    "parent_epoch",
+                    "parent_index",
+                    "epoch",
+                    "index",
+                    "reproduction_type",
+                ]
+            )
+            for *nodes, type_index in self.get_edge_list().tolist():
+                reproduction_type = self.reproduction_types[type_index]
+                writer.writerow(nodes + [_get_type_value(reproduction_type)])
@@ -0,0 +1,438 @@
+"""
+Provide a compact binary format of the stats
+Fitness scores, timings and operations are stored as arrays,
+each network of the stats once in packed neuron and synapse tables
+"""
+import json
+import math
+import os
+import zipfile
+from functools import partial
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from network.compact_network import CompactNetwork
+from network.evolution.origin import Origin, ReproductionType
+from network.network import Network
+
+VERSION = 1
+
+# file extension, which selects the packed format when saving stats
+PACKED_STATS_EXTENSION = ".npz"
+
+# reproduction types are stored as index into this list
+REPRODUCTION_TYPES = list(ReproductionType)
+
+
+def is_packed_stats(filename: Union[str, os.PathLike]) -> bool:
+    """
+    Whether a file is in the packed format instead of a json file
+
+    :param filename:
+    :return:
+    """
+    return zipfile.is_zipfile(os.fspath(filename))
+
+
+def _concatenate(arrays: List[np.ndarray], dtype) -> np.ndarray:
+    """
+    Concatenate arrays, also if there are no arrays
+
+    :param arrays:
+    :param dtype:
+    :return:
+    """
+    if len(arrays) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate(arrays).astype(dtype, copy=False)
+
+
+def _get_offsets(sizes: np.ndarray) -> List[int]:
+    """
+    Start of each part in a flat array, with the total size at the end
+
+    :param sizes: amount of elements of each part
+    :return:
+    """
+    return [0] + np.cumsum(sizes, dtype=np.int64).tolist()
+
+
+def _pack_parameters(
+    prefix: str,
+    values: List[Dict[str, np.ndarray]],
+    defined: List[Dict[str, np.ndarray]],
+    sizes: List[int],
+) -> Dict[str, np.ndarray]:
+    """
+    Concatenate the parameter columns of all networks
+    A column with different types in the networks is stored as json texts
+
+    :param prefix: neuron or synapse
+    :param values: parameter columns of each network
+    :param defined: masks of the parameter columns of each network
+    :param sizes: amount of neurons or synapses of each network
+    :return: arrays by name
+    """
+    arrays = {}
+    keys = sorted(set(key for columns in values for key in columns))
+    for key in keys:
+        masks = [
+            masks[key] if key in masks else np.zeros(size, dtype=bool)
+            for masks, size in zip(defined, sizes)
+        ]
+        arrays[f"{prefix}_defined:{key}"] = _concatenate(masks, bool)
+
+        dtypes = set(
+            columns[key].dtype for columns in values if key in columns
+        )
+        dtype = dtypes.pop() if len(dtypes) == 1 else None
+        if dtype is not None and dtype != object:
+            columns = [
+                columns[key] if key in columns else np.zeros(size, dtype)
+                for columns, size in zip(values, sizes)
+            ]
+            arrays[f"{prefix}_parameter:{key}"] = _concatenate(columns, dtype)
+        else:
+            texts = [
+                json.dumps(value)
+                for columns, size in zip(values, sizes)
+                for value in (
+                    columns[key].tolist() if key in columns else [None] * size
+                )
+            ]
+            arrays[f"{prefix}_json_parameter:{key}"] = np.array(
+                texts, dtype=str
+            )
+
+    return arrays
+
+
+def _unpack_parameters(
+    prefix: str, arrays: Dict[str, np.ndarray], start: int, end: int
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Inverse of _pack_parameters for a single network
+
+    :param prefix: neuron or synapse
+    :param arrays: packed arrays
+    :param start: position of the first neuron or synapse of the network
+    :param end: position after the last neuron or synapse of the network
+    :return: parameter columns and masks of the network
+    """
+    values = {}
+    defined = {}
+    for name, array in arrays.items():
+        if not name.startswith(f"{prefix}_defined:"):
+            continue
+        key = name.split(":", 1)[1]
+        mask = array[start:end]
+        if not mask.any():
+            continue
+
+        defined[key] = mask
+        if f"{prefix}_parameter:{key}" in arrays:
+            values[key] = arrays[f"{prefix}_parameter:{key}"][start:end]
+        else:
+            texts = arrays[f"{prefix}_json_parameter:{key}"][start:end]
+            # element wise, to not create nested arrays of lists
+            column = np.empty(len(texts), dtype=object)
+            for index, text in enumerate(texts.tolist()):
+                column[index] = json.loads(text)
+            values[key] = column
+
+    return values, defined
+
+
+def _pack_networks(networks: List[Network]) -> Dict[str, np.ndarray]:
+    """
+    Store all networks in one neuron and one synapse table
+
+    :param networks:
+    :return: arrays by name
+    """
+    compact = [CompactNetwork.from_network(n) for n in networks]
+    neuron_size = [c.get_number_of_neurons() for c in compact]
+    synapse_size = [c.get_number_of_synapses() for c in compact]
+
+    return {
+        "neuron_size": np.array(neuron_size, dtype=np.int64),
+        "synapse_size": np.array(synapse_size, dtype=np.int64),
+        "neuron_uid": _concatenate([c.neuron_uid for c in compact], np.int64),
+        "neuron_type": _concatenate([c.neuron_type for c in compact], np.int8),
+        "synapse_from": _concatenate(
+            [c.synapse_from for c in compact], np.int64
+        ),
+        "synapse_to": _concatenate([c.synapse_to for c in compact], np.int64),
+        **_pack_parameters(
+            "neuron",
+            [c.neuron_parameters for c in compact],
+            [c.neuron_defined for c in compact],
+            neuron_size,
+        ),
+        **_pack_parameters(
+            "synapse",
+            [c.synapse_parameters for c in compact],
+            [c.synapse_defined for c in compact],
+            synapse_size,
+        ),
+    }
+
+
+def write_packed_stats(
+    filename: str, epochs: List[dict], networks: Mapping[str, Network]
+):
+    """
+    Save epochs of stats in the packed format
+
+    :param filename: the name is used as is, no extension is added
+    :param epochs: epoch stats
+    :param networks: pool of the networks in the epochs, by fingerprint
+    :return:
+    """
+    operations = [o for e in epochs for o in e["operations"]]
+    timing_names = list(dict.fromkeys(k for e in epochs for k in e["timings"]))
+    # spans, that are missing in an epoch, are stored as nan
+    timings = np.array(
+        [[e["timings"].get(k, np.nan) for k in timing_names] for e in epochs],
+        dtype=float,
+    ).reshape(len(epochs), len(timing_names))
+    # position of each network in the tables
+    index = {
+        f: i
+        for i, f in enumerate(
+            dict.fromkeys(f for e in epochs for f in e["fingerprints"])
+        )
+    }
+
+    arrays = {
+        "version": np.array(VERSION),
+        "took": np.array([e["took"] for e in epochs], dtype=float),
+        "population_size": np.array(
+            [len(e["fitness_scores"]) for e in epochs], dtype=np.int64
+        ),
+        "population": np.array(
+            [index[f] for e in epochs for f in e["fingerprints"]],
+            dtype=np.int64,
+        ),
+        # keeps the type of the scores, e.g. int
+        "fitness_scores": np.array(
+            [f for e in epochs for f in e["fitness_scores"]]
+        ),
+        "operations_size": np.array(
+            [len(e["operations"]) for e in epochs], dtype=np.int64
+        ),
+        "operation_type": np.array(
+            [
+                REPRODUCTION_TYPES.index(o.reproduction_type)
+                for o in operations
+            ],
+            dtype=np.int8,
+        ),
+        "operation_parents_size": np.array(
+            [len(o.associated_networks) for o in operations], dtype=np.int64
+        ),
+        "operation_parents": np.array(
+            [n for o in operations for n in o.associated_networks],
+            dtype=np.int64,
+        ),
+        "timing_names": np.array(timing_names, dtype=str),
+        "timings": timings,
+        "fingerprints": np.array(list(index.keys()), dtype=str),
+        **_pack_networks([networks[f] for f in index.keys()]),
+    }
+
+    # a file object, as numpy would add the extension to a name
+    with open(filename, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+class PackedNetworks(dict):
+    """
+    Pool of the networks of a file in the packed format, by fingerprint
+    Networks are created, when they are accessed for the first time,
+    the tables are read from the file for the first network
+    """
+
+    filename: str
+    _index: Dict[str, int]  # position in the tables, by fingerprint
+    _arrays: Optional[Dict[str, np.ndarray]]
+    _neuron_offsets: List[int]
+    _synapse_offsets: List[int]
+
+    def __init__(self, filename: str, fingerprints: List[str]):
+        """
+        :param filename:
+        :param fingerprints: of the networks in order of the tables
+        """
+        super().__init__()
+        self.filename = filename
+        self._index = {f: i for i, f in enumerate(fingerprints)}
+        self._arrays = None
+        self._neuron_offsets = []
+        self._synapse_offsets = []
+
+    def __missing__(self, fingerprint: str) -> Network:
+        if fingerprint not in self._index:
+            raise KeyError(fingerprint)
+        network = self._create_network(self._index[fingerprint])
+        self[fingerprint] = network
+        return network
+
+    def __contains__(self, fingerprint) -> bool:
+        return super().__contains__(fingerprint) or fingerprint in self._index
+
+    def _load(self):
+        """
+        Read the neuron and synapse tables from the file
+
+        :return:
+        """
+        with np.load(self.filename, allow_pickle=False) as data:
+            self._arrays = {
+                name: data[name]
+                for name in data.files
+                if name.startswith(("neuron_", "synapse_"))
+            }
+        self._neuron_offsets = _get_offsets(self._arrays["neuron_size"])
+        self._synapse_offsets = _get_offsets(self._arrays["synapse_size"])
+
+    def _create_network(self, index: int) -> Network:
+        """
+        Create a single network from the tables
+
+        :param index: position of the network in the tables
+        :return:
+        """
+        if self._arrays is None:
+            self._load()
+
+        n_start, n_end = self._neuron_offsets[index : index + 2]
+        s_start, s_end = self._synapse_offsets[index : index + 2]
+        neuron_parameters, neuron_defined = _unpack_parameters(
+            "neuron", self._arrays, n_start, n_end
+        )
+        synapse_parameters, synapse_defined = _unpack_parameters(
+            "synapse", self._arrays, s_start, s_end
+        )
+
+        return CompactNetwork(
+            neuron_uid=self._arrays["neuron_uid"][n_start:n_end],
+            neuron_type=self._arrays["neuron_type"][n_start:n_end],
+            neuron_parameters=neuron_parameters,
+            neuron_defined=neuron_defined,
+            synapse_from=self._arrays["synapse_from"][s_start:s_end],
+            synapse_to=self._arrays["synapse_to"][s_start:s_end],
+            synapse_parameters=synapse_parameters,
+            synapse_defined=synapse_defined,
+        ).to_network()
+
+
+def get_networks(
+    networks: Mapping[str, Network], fingerprints: List[str]
+) -> List[Network]:
+    """
+    Get networks from a pool, e.g. the population of an epoch
+
+    :param networks: pool by fingerprint
+    :param fingerprints:
+    :return:
+    """
+    return [networks[f] for f in fingerprints]
+
+
+class LazyEpochStats(dict):
+    """
+    Epoch stats, that create the population on the first access
+    All other values are available without creating networks
+    """
+
+    def __init__(self, load_population: Callable[[], List[Network]], **kwargs):
+        """
+        :param load_population: creates the population of the epoch
+        :param kwargs: other values of the epoch
+        """
+        super().__init__(**kwargs)
+        self._load_population = load_population
+
+    def __missing__(self, key):
+        if key != "population":
+            raise KeyError(key)
+        population = self._load_population()
+        self["population"] = population
+        return population
+
+    def is_population_loaded(self) -> bool:
+        """
+        Whether the population was created already
+
+        :return:
+        """
+        return dict.__contains__(self, "population")
+
+
+def read_packed_stats(
+    filename: str,
+) -> Tuple[List[LazyEpochStats], PackedNetworks]:
+    """
+    Read the epochs of stats in the packed format
+    Populations are read from the file, when they are accessed
+
+    :param filename:
+    :return: epoch stats and the pool of their networks
+    """
+    with np.load(filename, allow_pickle=False) as data:
+        if "version" not in data.files or int(data["version"]) != VERSION:
+            raise RuntimeError(
+                f"'{filename}' is no packed stats file of version {VERSION}"
+            )
+        arrays = {
+            name: data[name]
+            for name in data.files
+            if not name.startswith(("neuron_", "synapse_"))
+        }
+
+    fingerprints = arrays["fingerprints"].tolist()
+    networks = PackedNetworks(filename, fingerprints)
+    population_offsets = _get_offsets(arrays["population_size"])
+    operation_offsets = _get_offsets(arrays["operations_size"])
+    parent_offsets = _get_offsets(arrays["operation_parents_size"])
+
+    population = [fingerprints[i] for i in arrays["population"].tolist()]
+    fitness_scores = arrays["fitness_scores"].tolist()
+    operation_types = arrays["operation_type"].tolist()
+    parents = arrays["operation_parents"].tolist()
+    timing_names = arrays["timing_names"].tolist()
+
+    epochs = []
+    for epoch, took in enumerate(arrays["took"].tolist()):
+        start, end = population_offsets[epoch : epoch + 2]
+        operations = [
+            Origin(
+                REPRODUCTION_TYPES[operation_types[o]],
+                parents[parent_offsets[o] : parent_offsets[o + 1]],
+            )
+            for o in range(
+                operation_offsets[epoch], operation_offsets[epoch + 1]
+            )
+        ]
+        timings = {
+            name: duration
+            for name, duration in zip(
+                timing_names, arrays["timings"][epoch].tolist()
+            )
+            if not math.isnan(duration)
+        }
+
+        epochs.append(
+            LazyEpochStats(
+                partial(get_networks, networks, population[start:end]),
+                took=took,
+                fingerprints=population[start:end],
+                fitness_scores=fitness_scores[start:end],
+                operations=operations,
+                timings=timings,
+            )
+        )
+
+    return epochs, networks
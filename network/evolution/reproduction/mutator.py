@@ -130,7 +130,9 @@ class Mutator(Configurable):
             network.remove_synapse(random_synapse)
             network.strip()  # more nodes might need to be removed
         elif mutation_type == "node_param":
-            random_neuron: Neuron = random.choice(network.get_all_neurons())
+            random_neuron: Neuron = network.get_writable_neuron(
+                random.choice(network.get_all_neurons())
+            )
             mutation_type, mutation_parameter = random.choice(
                 get_mutable_parameters(self.neuron_parameters)
             )
@@ -141,7 +143,9 @@ class Mutator(Configurable):
             if len(network.synapses) == 0:
                 return
 
-            random_synapse: Synapse = random.choice(network.get_all_synapses())
+            random_synapse: Synapse = network.get_writable_synapse(
+                random.choice(network.get_all_synapses())
+            )
             mutation_type, mutation_parameter = random.choice(
                 get_mutable_parameters(self.synapse_parameters)
             )
@@ -234,11 +238,12 @@ class Mutator(Configurable):
     def apply_mutations(self, network: Network):
         """
         Clones the network and returns a new network, with applied mutations
+        Unchanged neurons and synapses are shared with the given network
 
         :param network: basic network to start from
         :return: cloned network with mutations applied
         """
-        new_network = network.clone()
+        new_network = network.clone_shared()
 
         number_of_mutations = parameter_to_value(self.number_of_mutations)
         for _ in range(number_of_mutations):
@@ -1,15 +1,38 @@
+import csv
+import json
+import os
 import statistics
 import time
-from typing import List, Optional, Tuple, TypedDict, Union
+from functools import partial
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import networkx as nx
 from matplotlib import pyplot as plt
 
+from network.compact_network import get_fingerprint
+from network.evolution.epoch_log import EpochLog, is_epoch_log
+from network.evolution.lineage import LineageIndex
 from network.evolution.origin import Origin, ReproductionType
+from network.evolution.packed_stats import (
+    PACKED_STATS_EXTENSION,
+    LazyEpochStats,
+    is_packed_stats,
+    read_packed_stats,
+    write_packed_stats,
+)
 from network.evolution.selection import best
 from network.network import Network
 from utility.json_serialize import JsonSerialize
-from utility.list_operation import count_occurrences, flat_list
+from utility.timing import span, timings
 
 
 class EpochStats(TypedDict):
@@ -19,31 +42,80 @@ class EpochStats(TypedDict):
 
     took: float  # time it took for evaluation
     population: List[Network]
+    # keys of the population in the pool of networks of the stats,
+    # set when the population is added to the pool
+    fingerprints: List[str]
     fitness_scores: List[float]
     operations: List[Origin]
+    # seconds of each timing span since the previous epoch was added
+    timings: Dict[str, float]
 
 
 class Stats(JsonSerialize):
     """
     Store the stats for one evolution
+    Each network is stored once in a pool, keyed by its exact fingerprint,
+    the epochs refer to the networks by fingerprint
+    Populations are added to the pool, when the fingerprints are needed,
+    e.g. for saving
+    With a retention policy, only some populations are kept in memory,
+    the others are read from the log, when they are accessed
     """
 
     data: List[EpochStats]
+    networks: MutableMapping[str, Network]
     last_epoch_start: float
+    log: Optional[EpochLog] = None
+    # retention policy, keep the populations of the latest epochs and
+    # of every k-th epoch in memory, None to keep all
+    keep_last: Optional[int] = None
+    keep_every: Optional[int] = None
+    # epoch of the log line, that contains a network, by fingerprint
+    _logged_networks: Dict[str, int]
+    _lineage: LineageIndex
 
-    def __init__(self, data=None):
+    def __init__(self, data=None, networks=None):
+        """
+        :param data: epochs
+        :param networks: pool of the networks in the epochs
+        """
         if data is None:
             data = []
+        if networks is None:
+            networks = {}
 
         self.data = data
+        self.networks = networks
         self.last_epoch_start = 0
+        self._logged_networks = {}
+        self._lineage = LineageIndex()
 
     def start_epoch(self):
         """
         Set the internal timer, for timing the evaluation
+        Spans before the start of the epoch are not counted
         :return:
         """
         self.last_epoch_start = time.time()
+        timings.reset()
+
+    def get_fingerprints(self, epoch: int) -> List[str]:
+        """
+        Fingerprints of the population of an epoch
+        Adds the population to the pool, copies of a network are added once
+
+        :param epoch: index of the epoch
+        :return:
+        """
+        epoch_stats = self.get_epoch(epoch)
+        if "fingerprints" not in epoch_stats:
+            population = epoch_stats["population"]
+            fingerprints = [get_fingerprint(n, exact=True) for n in population]
+            for fingerprint, network in zip(fingerprints, population):
+                if fingerprint not in self.networks:
+                    self.networks[fingerprint] = network
+            epoch_stats["fingerprints"] = fingerprints
+        return epoch_stats["fingerprints"]
 
     def add_epoch(
         self,
@@ -75,6 +147,7 @@ class Stats(JsonSerialize):
                 fitness_scores=fitness_scores,
                 took=took,
                 operations=operations,
+                timings=timings.reset(),
             )
         )
 
@@ -108,6 +181,20 @@ class Stats(JsonSerialize):
             )
         )
 
+    def get_timing_information(self, epoch: int):
+        """
+        Return a string with the timing spans of the executed epoch
+
+        :param epoch: index of the epoch
+        :return:
+        """
+        epoch_timings = self.get_epoch(epoch)["timings"]
+        spans = ", ".join(
+            f"{name} {duration:4.4f}s"
+            for name, duration in epoch_timings.items()
+        )
+        return f"Timings: {spans}"
+
     def get_epoch(self, epoch: int) -> EpochStats:
         """
         Get statistics for a given epoch
@@ -171,15 +258,41 @@ class Stats(JsonSerialize):
 
         :return:
         """
-        best_network, best_fitness = None, None
+        best_position, best_fitness = None, None
 
-        for epoch in self.data:
-            for index, fitness in enumerate(epoch["fitness_scores"]):
+        for epoch, e in enumerate(self.data):
+            for index, fitness in enumerate(e["fitness_scores"]):
                 if best_fitness is None or fitness > best_fitness:
                     best_fitness = fitness
-                    best_network = epoch["population"][index]
+                    best_position = epoch, index
+
+        if best_position is None:
+            return None, None
+
+        epoch, index = best_position
+        epoch_stats = self.data[epoch]
+        if "population" in epoch_stats:
+            return epoch_stats["population"][index], best_fitness
+        # the population is not in memory, the pool keeps the best networks
+        fingerprint = epoch_stats["fingerprints"][index]
+        return self.networks[fingerprint], best_fitness
+
+    def get_network_fitness(self) -> Dict[str, float]:
+        """
+        Latest fitness score of each network in the stats
+        Networks are ordered by their latest epoch
 
-        return best_network, best_fitness
+        :return: fingerprint -> fitness
+        """
+        fitness_scores = {}
+        for epoch, e in enumerate(self.data):
+            for fingerprint, fitness in zip(
+                self.get_fingerprints(epoch), e["fitness_scores"]
+            ):
+                # move to the end
+                fitness_scores.pop(fingerprint, None)
+                fitness_scores[fingerprint] = fitness
+        return fitness_scores
 
     def compare(self, other_stats: "Stats"):
         """
@@ -193,15 +306,20 @@ class Stats(JsonSerialize):
         :return:
         """
 
-        def remove_population(json_object):
-            for data in json_object["data"]:
-                del data["population"]
-            return json_object
-
-        s1 = remove_population(self.to_json_object())
-        s2 = remove_population(other_stats.to_json_object())
+        def remove_population(stats: "Stats"):
+            # without accessing the populations, which can be loaded lazily
+            return [
+                {
+                    k: v
+                    for k, v in e.items()
+                    if k not in ["population", "fingerprints"]
+                }
+                for e in stats.data
+            ]
 
-        same_without_population = s1 == s2
+        same_without_population = remove_population(self) == remove_population(
+            other_stats
+        )
         return same_without_population
 
     def is_same_populations(self, other_stats: "Stats"):
@@ -329,9 +447,45 @@ class Stats(JsonSerialize):
         took = [e["took"] for e in self.data]
         return sum(took)
 
+    def get_timings(self) -> List[Dict[str, float]]:
+        """
+        Time took and timing spans of each epoch
+
+        :return: one row for each epoch, with the epoch index
+        """
+        return [
+            {"epoch": epoch, "took": e["took"], **e["timings"]}
+            for epoch, e in enumerate(self.data)
+        ]
+
+    def timings_to_file(self, filename: str):
+        """
+        Save the timings of each epoch, e.g. to track the performance
+        The format is given by the file extension, csv or json
+
+        :param filename:
+        :return:
+        """
+        rows = self.get_timings()
+        if filename.endswith(".json"):
+            with open(filename, "w") as f:
+                json.dump(rows, f, indent=4)
+        elif filename.endswith(".csv"):
+            # spans, that are missing in an epoch, took no time
+            columns = list(dict.fromkeys(key for row in rows for key in row))
+            with open(filename, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            raise RuntimeError(
+                f"Unknown format of '{filename}', use .csv or .json"
+            )
+
     def get_origin(self, network: Union[int, Network], epoch=None):
         """
         get full history of a given network
+        Built from the lineage index, histories of common ancestors are shared
 
         :param network: can be int or the network
         :param epoch: if none, latest epoch will be searched
@@ -340,64 +494,186 @@ class Stats(JsonSerialize):
         if epoch is None:
             epoch = self.get_latest_epoch()
 
-        epoch_data = self.get_epoch(epoch)
-        if isinstance(network, Network):
-            index = epoch_data["population"].index(network)
-            if index == -1:
-                return None
-        else:
-            index = network
-
-        operation = epoch_data["operations"][index]
-
-        if len(operation.associated_networks) == 0:
-            return [operation]
-        if len(operation.associated_networks) == 1:
-            return [
-                operation,
-                self.get_origin(
-                    operation.associated_networks[0], epoch=epoch - 1
-                ),
-            ]
+        index = self._get_index(network, epoch)
+        if index is None:
+            return None
 
-        next_level = [operation]
-        for n in operation.associated_networks:
-            next_level.append(self.get_origin(n, epoch=epoch - 1))
-        return next_level
+        # ancestors in each epoch, from the network backwards
+        lineage = self.get_lineage()
+        ancestors = [[index]]
+        for e in range(epoch, 0, -1):
+            parents = {
+                int(p)
+                for i in ancestors[-1]
+                for p in lineage.get_associated_networks(e, i)
+            }
+            if len(parents) == 0:
+                break
+            ancestors.append(sorted(parents))
+
+        # from the oldest ancestors, an ancestor of both parents is shared
+        histories = {}
+        first_epoch = epoch - len(ancestors) + 1
+        for e, networks in zip(
+            range(first_epoch, epoch + 1), reversed(ancestors)
+        ):
+            for i in networks:
+                histories[e, i] = [self.data[e]["operations"][i]] + [
+                    histories[e - 1, int(p)]
+                    for p in lineage.get_associated_networks(e, i)
+                ]
+        return histories[epoch, index]
 
     def get_origin_distribution(
         self, network: Union[int, Network], epoch=None
     ):
         """
         get the distribution of actions across full history
+        Uses the lineage index, instead of the nested history of get_origin
         :param network:
         :param epoch:
         :return:
         """
-        history = self.get_origin(network, epoch)
-        history_flat: List[Origin] = flat_list(history)
-        history_flat_string = [o.reproduction_type for o in history_flat]
-        return count_occurrences(history_flat_string)
+        if epoch is None:
+            epoch = self.get_latest_epoch()
+
+        index = self._get_index(network, epoch)
+        if index is None:
+            return None
+
+        lineage = self.get_lineage()
+        histogram = lineage.get_type_histogram(epoch, [index])[0]
+        return {
+            reproduction_type: int(count)
+            for reproduction_type, count in zip(
+                lineage.reproduction_types, histogram
+            )
+            if count > 0
+        }
+
+    def _get_index(self, network: Union[int, Network], epoch: int):
+        """
+        Index of a network in the population of an epoch
+
+        :param network: can be int or the network
+        :param epoch:
+        :return: None, if the network is not in the population
+        """
+        if not isinstance(network, Network):
+            return network
+
+        for index, n in enumerate(self.get_epoch(epoch)["population"]):
+            if n is network:
+                return index
+        return None
+
+    def get_lineage(self) -> LineageIndex:
+        """
+        Index of the lineage of all networks, e.g. for queries of the whole
+        population, it is updated with the epochs added since the last call
+
+        :return:
+        """
+        for epoch in self.data[len(self._lineage) :]:
+            self._lineage.add_epoch(
+                epoch["operations"], len(epoch["fitness_scores"])
+            )
+        return self._lineage
+
+    @staticmethod
+    def _epoch_to_json_object(epoch: EpochStats) -> dict:
+        """
+        Convert a single epoch to a dict for json dumps
+        The population is stored as fingerprints of the networks
+
+        :param epoch:
+        :return:
+        """
+        return {
+            "took": epoch["took"],
+            "population": epoch["fingerprints"],
+            "fitness_scores": epoch["fitness_scores"],
+            "operations": epoch["operations"],
+            "timings": epoch["timings"],
+        }
+
+    @staticmethod
+    def _epoch_from_json_object(
+        json_object: dict, networks: Dict[str, Network]
+    ) -> EpochStats:
+        """
+        Create a single epoch from a json dict
+        Stats of older versions store the networks in each epoch,
+        these epochs have no fingerprints
+
+        :param json_object:
+        :param networks: pool of networks by fingerprint
+        :return:
+        """
+        population = json_object["population"]
+        if all(isinstance(n, str) for n in population):
+            epoch = EpochStats(
+                population=[networks[n] for n in population],
+                fingerprints=population,
+            )
+        else:
+            epoch = EpochStats(
+                population=[Network.from_json_object(n) for n in population]
+            )
+
+        return EpochStats(
+            **epoch,
+            took=json_object["took"],
+            fitness_scores=json_object["fitness_scores"],
+            operations=[
+                Origin(ReproductionType(o[0]), o[1])
+                for o in json_object["operations"]
+            ],
+            # stats of older versions have no timings
+            timings=json_object.get("timings", {}),
+        )
 
     def to_json_object(self):
         """
         Convert the object to a dict for json dumps
         :return:
         """
+        fingerprints = dict.fromkeys(
+            f
+            for epoch in range(len(self.data))
+            for f in self.get_fingerprints(epoch)
+        )
+        networks = self.get_networks(fingerprints)
         return {
-            "data": [
-                {
-                    "took": data["took"],
-                    "population": [
-                        n.to_json_object() for n in data["population"]
-                    ],
-                    "fitness_scores": data["fitness_scores"],
-                    "operations": data["operations"],
-                }
-                for data in self.data
-            ],
+            "networks": {
+                f: networks[f].to_json_object() for f in fingerprints
+            },
+            "data": [self._epoch_to_json_object(data) for data in self.data],
         }
 
+    def to_file(self, filename, indent=4):
+        """
+        Save the stats to a file
+        Uses the packed format for the extension .npz, otherwise json
+
+        :param filename:
+        :param indent: can be a number for spaces or None
+        :return:
+        """
+        filename = os.fspath(filename)
+        with span("save_stats"):
+            if filename.endswith(PACKED_STATS_EXTENSION):
+                fingerprints = dict.fromkeys(
+                    f
+                    for epoch in range(len(self.data))
+                    for f in self.get_fingerprints(epoch)
+                )
+                write_packed_stats(
+                    filename, self.data, self.get_networks(fingerprints)
+                )
+            else:
+                super().to_file(filename, indent=indent)
+
     @classmethod
     def from_json_object(cls, json_object: dict) -> "Stats":
         """
@@ -406,18 +682,219 @@ class Stats(JsonSerialize):
         :param json_object:
         :return:
         """
+        networks = {
+            f: Network.from_json_object(n)
+            for f, n in json_object.get("networks", {}).items()
+        }
         data = [
-            EpochStats(
-                took=d["took"],
-                population=[
-                    Network.from_json_object(n) for n in d["population"]
-                ],
-                fitness_scores=d["fitness_scores"],
-                operations=[
-                    Origin(ReproductionType(o[0]), o[1])
-                    for o in d["operations"]
-                ],
-            )
+            cls._epoch_from_json_object(d, networks)
             for d in json_object["data"]
         ]
-        return cls(data)
+        return cls(data, networks)
+
+    @classmethod
+    def from_file(cls, filename) -> "Stats":
+        """
+        Read the stats from a json file, a packed file or an epoch log
+        Stats of a log keep appending to it with write_log,
+        populations of a packed file are read, when they are accessed
+
+        :param filename:
+        :return:
+        """
+        filename = os.fspath(filename)
+        if is_packed_stats(filename):
+            return cls(*read_packed_stats(filename))
+        if not is_epoch_log(filename):
+            return super().from_file(filename)
+
+        log = EpochLog(filename)
+        networks = {}
+        logged = {}
+        data = []
+        for epoch, record in enumerate(log.read_all()):
+            # each line contains the networks, that are new in the log
+            for fingerprint, network in record.get("networks", {}).items():
+                networks[fingerprint] = Network.from_json_object(network)
+                logged.setdefault(fingerprint, epoch)
+            data.append(cls._epoch_from_json_object(record, networks))
+
+        stats = cls(data, networks)
+        stats.log = log
+        stats._logged_networks = logged
+        return stats
+
+    def set_log(self, filename: str):
+        """
+        Keep an append-only log of the epochs in the given file,
+        epochs, that are not in the file yet, are written immediately
+
+        :param filename:
+        :return:
+        """
+        log = EpochLog(filename)
+        if len(log) > len(self.data):
+            raise RuntimeError(
+                f"The log '{filename}' has more epochs than the stats"
+            )
+        self.log = log
+        self._logged_networks = self._get_logged_networks(log)
+        self.write_log()
+
+    @staticmethod
+    def _get_logged_networks(log: EpochLog) -> Dict[str, int]:
+        """
+        Find the networks, that are written to a log
+
+        :param log:
+        :return: epoch of the line with the network, by fingerprint
+        """
+        logged = {}
+        for epoch, record in enumerate(log.read_all()):
+            for fingerprint in record.get("networks", {}):
+                logged.setdefault(fingerprint, epoch)
+        return logged
+
+    def write_log(self):
+        """
+        Append the epochs, that are not in the log yet, to the log
+        Afterwards, the retention policy is applied
+
+        :return:
+        """
+        if self.log is None:
+            raise RuntimeError("The stats have no log, use set_log")
+
+        start = time.perf_counter()
+        records = []
+        logged = dict(self._logged_networks)
+        for epoch in range(len(self.log), len(self.data)):
+            fingerprints = self.get_fingerprints(epoch)
+            record = self._epoch_to_json_object(self.data[epoch])
+            record["networks"] = {
+                f: self.networks[f].to_json_object()
+                for f in dict.fromkeys(fingerprints)
+                if f not in logged
+            }
+            for fingerprint in record["networks"]:
+                logged[fingerprint] = epoch
+            records.append(record)
+
+        if len(records) > 0:
+            # part of the latest epoch, the log can't include its own write
+            duration = time.perf_counter() - start
+            epoch_timings = self.data[-1]["timings"]
+            epoch_timings["save_stats"] = (
+                epoch_timings.get("save_stats", 0) + duration
+            )
+            records[-1]["timings"] = epoch_timings
+        self.log.append(records)
+        self._logged_networks = logged
+
+        self.apply_retention()
+
+    def set_retention(
+        self, keep_last: Optional[int], keep_every: Optional[int] = None
+    ):
+        """
+        Only keep some populations in memory, the others are spilled to the
+        log, fitness scores and operations of all epochs are kept
+        The pool keeps the best network of each epoch
+
+        :param keep_last: amount of latest epochs, None to keep all
+        :param keep_every: also keep every k-th epoch
+        :return:
+        """
+        if keep_last is not None and self.log is None:
+            raise RuntimeError(
+                "The stats need a log for the evicted populations, "
+                "use set_log"
+            )
+        self.keep_last = keep_last
+        self.keep_every = keep_every
+        self.apply_retention()
+
+    def is_retained(self, epoch: int) -> bool:
+        """
+        Whether the population of an epoch is kept in memory
+
+        :param epoch: index of the epoch
+        :return:
+        """
+        if self.keep_last is None or epoch >= len(self.data) - self.keep_last:
+            return True
+        return self.keep_every is not None and epoch % self.keep_every == 0
+
+    def apply_retention(self):
+        """
+        Evict the populations, that are not retained and written to the log,
+        and remove their networks from the pool
+
+        :return:
+        """
+        if self.keep_last is None:
+            return
+
+        for epoch in range(min(len(self.log), len(self.data))):
+            epoch_stats = self.data[epoch]
+            if "population" in epoch_stats and not self.is_retained(epoch):
+                self.get_fingerprints(epoch)
+                self.data[epoch] = LazyEpochStats(
+                    partial(self._read_population, epoch),
+                    **{
+                        k: v
+                        for k, v in epoch_stats.items()
+                        if k != "population"
+                    },
+                )
+
+        # networks of the populations in memory and the best of each epoch
+        keep = set()
+        for epoch_stats in self.data:
+            fingerprints = epoch_stats.get("fingerprints", [])
+            if "population" in epoch_stats:
+                keep.update(fingerprints)
+            elif len(fingerprints) > 0:
+                fitness_scores = epoch_stats["fitness_scores"]
+                keep.add(
+                    fingerprints[fitness_scores.index(max(fitness_scores))]
+                )
+        for fingerprint in list(self.networks.keys()):
+            if fingerprint not in keep:
+                del self.networks[fingerprint]
+
+    def get_networks(self, fingerprints: Iterable[str]) -> Dict[str, Network]:
+        """
+        Get networks by fingerprint
+        Networks, that are not in the pool, are read from the log
+
+        :param fingerprints:
+        :return: fingerprint -> network
+        """
+        fingerprints = set(fingerprints)
+        networks = {
+            f: self.networks[f] for f in fingerprints if f in self.networks
+        }
+        lines = set(
+            self._logged_networks[f]
+            for f in fingerprints
+            if f not in networks and f in self._logged_networks
+        )
+        for line in sorted(lines):
+            for fingerprint, network in self.log.read(line)[
+                "networks"
+            ].items():
+                if fingerprint in fingerprints and fingerprint not in networks:
+                    networks[fingerprint] = Network.from_json_object(network)
+        return networks
+
+    def _read_population(self, epoch: int) -> List[Network]:
+        """
+        Read the population of an evicted epoch from the log
+
+        :param epoch: index of the epoch
+        :return:
+        """
+        record = self.log.read(epoch)
+        networks = self.get_networks(self.data[epoch]["fingerprints"])
+        return self._epoch_from_json_object(record, networks)["population"]
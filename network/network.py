@@ -2,8 +2,9 @@
 Provide the network class for neural network architecture and parameters
 """
 import copy
+from collections import deque
 from enum import Enum
-from typing import List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -40,6 +41,34 @@ def get_neuron_color(neuron_type: NeuronType):
     raise RuntimeError("The given neuron type is not specified")
 
 
+def _traverse(
+    start: Iterable[int],
+    adjacency: Dict[int, Set[int]],
+    visited: Optional[Set[int]] = None,
+) -> Set[int]:
+    """
+    Breadth first search over an adjacency index
+    The start nodes are included in the result
+
+    :param start: uids to start the search from
+    :param adjacency: uid -> uids of neighbouring neurons
+    :param visited: already visited uids, are extended in place
+    :return: all visited uids
+    """
+    if visited is None:
+        visited = set()
+
+    queue = deque(uid for uid in start if uid not in visited)
+    visited.update(queue)
+    while queue:
+        uid = queue.popleft()
+        for neighbour in adjacency[uid]:
+            if neighbour not in visited:
+                visited.add(neighbour)
+                queue.append(neighbour)
+    return visited
+
+
 class Network(JsonSerialize):
     """
     Class to represent a spiking neural network
@@ -53,6 +82,20 @@ class Network(JsonSerialize):
 
     synapses = Set[Synapse]
 
+    # indices, kept in sync by add/remove operations on neurons and synapses
+    _neurons_by_uid: Dict[int, Neuron]
+    _neuron_types: Dict[int, NeuronType]
+    _synapses_by_neurons: Dict[Tuple[int, int], Synapse]
+    _successors: Dict[int, Set[int]]  # uid -> uids of post-synaptic neurons
+    _predecessors: Dict[int, Set[int]]  # uid -> uids of pre-synaptic neurons
+
+    # cached reachability, None when it has to be recalculated
+    _reachable: Optional[Set[int]]
+    _influence: Optional[Set[int]]
+
+    # ids of neurons and synapses, that are shared with other networks
+    _shared: Set[int]
+
     def __init__(
         self, input_neurons=None, output_neurons=None, hidden_neurons=None
     ):
@@ -71,6 +114,8 @@ class Network(JsonSerialize):
             raise RuntimeError("Neuron uid should be unique")
 
         self.synapses = set()
+        self._shared = set()
+        self._build_index()
 
     def _has_duplicate_uid(self):
         """
@@ -81,13 +126,219 @@ class Network(JsonSerialize):
             self.get_all_neurons_uid()
         )
 
+    def _build_index(self):
+        """
+        (Re-)build the lookup indices from the neurons and synapses
+        Required, if uids of neurons or synapses were changed directly
+
+        :return:
+        """
+        self._neurons_by_uid = {}
+        self._neuron_types = {}
+        self._synapses_by_neurons = {}
+        self._successors = {}
+        self._predecessors = {}
+        self._reachable = None
+        self._influence = None
+
+        for neuron in self.input_neurons:
+            self._index_neuron(neuron, NeuronType.Input)
+        for neuron in self.output_neurons:
+            self._index_neuron(neuron, NeuronType.Output)
+        for neuron in self.hidden_neurons:
+            self._index_neuron(neuron, NeuronType.Hidden)
+        for synapse in self.synapses:
+            self._index_synapse(synapse)
+
+    def _index_neuron(self, neuron: Neuron, neuron_type: NeuronType):
+        """
+        Add a neuron to the lookup indices
+
+        :param neuron:
+        :param neuron_type:
+        :return:
+        """
+        self._neurons_by_uid[neuron.uid] = neuron
+        self._neuron_types[neuron.uid] = neuron_type
+        self._successors[neuron.uid] = set()
+        self._predecessors[neuron.uid] = set()
+
+    def _index_synapse(self, synapse: Synapse):
+        """
+        Add a synapse to the lookup indices
+
+        :param synapse:
+        :return:
+        """
+        key = (synapse.connect_from, synapse.connect_to)
+        self._synapses_by_neurons[key] = synapse
+        self._successors[synapse.connect_from].add(synapse.connect_to)
+        self._predecessors[synapse.connect_to].add(synapse.connect_from)
+
+        # a new connection can only extend the reachable neurons
+        if (
+            self._reachable is not None
+            and synapse.connect_from in self._reachable
+        ):
+            _traverse([synapse.connect_to], self._successors, self._reachable)
+        if (
+            self._influence is not None
+            and synapse.connect_to in self._influence
+        ):
+            _traverse(
+                [synapse.connect_from], self._predecessors, self._influence
+            )
+
+    def _unindex_synapse(self, synapse: Synapse):
+        """
+        Remove a synapse from the lookup indices
+
+        :param synapse:
+        :return:
+        """
+        key = (synapse.connect_from, synapse.connect_to)
+        del self._synapses_by_neurons[key]
+        self._successors[synapse.connect_from].discard(synapse.connect_to)
+        self._predecessors[synapse.connect_to].discard(synapse.connect_from)
+
+        # removing a used connection may disconnect arbitrary many neurons
+        if (
+            self._reachable is not None
+            and synapse.connect_from in self._reachable
+        ):
+            self._reachable = None
+        if (
+            self._influence is not None
+            and synapse.connect_to in self._influence
+        ):
+            self._influence = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # ids are only valid for the objects of this instance
+        state["_shared"] = set()
+        return state
+
     def clone(self):
         """
         Make a deep copy of the network
 
         :return:
         """
-        return copy.deepcopy(self)
+        network = copy.deepcopy(self)
+        network._build_index()
+        return network
+
+    def _copy_structure(self) -> "Network":
+        """
+        Make a copy of the network, which uses the same neurons and synapses
+        Does not mark any element as shared
+
+        :return:
+        """
+        network = copy.copy(self)
+
+        network.input_neurons = list(self.input_neurons)
+        network.output_neurons = list(self.output_neurons)
+        network.hidden_neurons = set(self.hidden_neurons)
+        network.synapses = set(self.synapses)
+
+        network._neurons_by_uid = dict(self._neurons_by_uid)
+        network._neuron_types = dict(self._neuron_types)
+        network._synapses_by_neurons = dict(self._synapses_by_neurons)
+        network._successors = {k: set(v) for k, v in self._successors.items()}
+        network._predecessors = {
+            k: set(v) for k, v in self._predecessors.items()
+        }
+        if self._reachable is not None:
+            network._reachable = set(self._reachable)
+        if self._influence is not None:
+            network._influence = set(self._influence)
+        network._shared = set()
+
+        return network
+
+    def clone_shared(self) -> "Network":
+        """
+        Make a copy of the network, which shares neurons and synapses
+        Structural changes (add/remove) only affect the copy,
+        parameters have to be changed on elements returned by
+        get_writable_neuron/get_writable_synapse,
+        which copies shared elements before the first change
+
+        :return:
+        """
+        network = self._copy_structure()
+
+        # all elements are now shared by both networks
+        shared = set(id(n) for n in self._neurons_by_uid.values())
+        shared.update(id(s) for s in self.synapses)
+        self._shared.update(shared)
+        network._shared = shared
+
+        return network
+
+    def stripped(self) -> "Network":
+        """
+        Stripped copy of the network, to read it, e.g. for a simulation
+        Does not modify the network, nor marks its elements as shared,
+        the copy uses the same neurons and synapses and must not be changed
+
+        :return:
+        """
+        return self._copy_structure().strip()
+
+    def get_writable_neuron(self, neuron: Neuron) -> Neuron:
+        """
+        Return a neuron of this network, whose parameters can be changed
+        without affecting other networks
+        A shared neuron is replaced by a copy
+
+        :param neuron: neuron in the network
+        :return:
+        """
+        if id(neuron) not in self._shared:
+            return neuron
+
+        neuron_type = self.get_neuron_type(neuron=neuron)
+        writable = Neuron(neuron.uid, **neuron.parameters)
+
+        if neuron_type == NeuronType.Input:
+            index = self.input_neurons.index(neuron)
+            self.input_neurons[index] = writable
+        elif neuron_type == NeuronType.Output:
+            index = self.output_neurons.index(neuron)
+            self.output_neurons[index] = writable
+        else:
+            self.hidden_neurons.remove(neuron)
+            self.hidden_neurons.add(writable)
+
+        self._neurons_by_uid[writable.uid] = writable
+        self._shared.discard(id(neuron))
+        return writable
+
+    def get_writable_synapse(self, synapse: Synapse) -> Synapse:
+        """
+        Return a synapse of this network, whose parameters can be changed
+        without affecting other networks
+        A shared synapse is replaced by a copy
+
+        :param synapse: synapse in the network
+        :return:
+        """
+        if id(synapse) not in self._shared:
+            return synapse
+
+        writable = Synapse(
+            synapse.connect_from, synapse.connect_to, **synapse.parameters
+        )
+        self.synapses.remove(synapse)
+        self.synapses.add(writable)
+
+        key = (writable.connect_from, writable.connect_to)
+        self._synapses_by_neurons[key] = writable
+        self._shared.discard(id(synapse))
+        return writable
 
     def get_neuron_type(self, uid: int = None, neuron: Neuron = None):
         """
@@ -103,14 +354,13 @@ class Network(JsonSerialize):
                 raise RuntimeError("Please provide either uid or a neuron")
             neuron = self.find_neuron_by_uid(uid)
 
-        if neuron in self.input_neurons:
-            return NeuronType.Input
-        if neuron in self.output_neurons:
-            return NeuronType.Output
-        if neuron in self.hidden_neurons:
-            return NeuronType.Hidden
+        if (
+            neuron is None
+            or self._neurons_by_uid.get(neuron.uid) is not neuron
+        ):
+            raise RuntimeError("Given neuron is not in network")
 
-        raise RuntimeError("Given neuron is not in network")
+        return self._neuron_types[neuron.uid]
 
     def get_all_neurons(self) -> List[Neuron]:
         """
@@ -159,25 +409,18 @@ class Network(JsonSerialize):
         :param synapse:
         :return: whether the operation was successful
         """
-        found = next(
-            (
-                True
-                for syn in self.synapses
-                if syn.connect_from == synapse.connect_from
-                and syn.connect_to == synapse.connect_to
-            ),
-            False,
-        )
-        if found:
+        key = (synapse.connect_from, synapse.connect_to)
+        if key in self._synapses_by_neurons:
             return False
 
         if (
-            self.find_neuron_by_uid(synapse.connect_from) is None
-            or self.find_neuron_by_uid(synapse.connect_to) is None
+            synapse.connect_from not in self._neurons_by_uid
+            or synapse.connect_to not in self._neurons_by_uid
         ):
             return False
 
         self.synapses.add(synapse)
+        self._index_synapse(synapse)
         return True
 
     def add_neuron(self, neuron: Neuron):
@@ -188,9 +431,10 @@ class Network(JsonSerialize):
         :param neuron:
         :return: returns, whether the operation was succesful
         """
-        if self.find_neuron_by_uid(neuron.uid) is not None:
+        if neuron.uid in self._neurons_by_uid:
             return False
         self.hidden_neurons.add(neuron)
+        self._index_neuron(neuron, NeuronType.Hidden)
         return True
 
     def remove_neuron(self, neuron: Neuron):
@@ -202,11 +446,22 @@ class Network(JsonSerialize):
         """
         # removes a neuron and all corresponding synapses
         self.hidden_neurons.remove(neuron)
-        self.synapses = set(
-            s
-            for s in self.synapses
-            if neuron.uid not in (s.connect_from, s.connect_to)
-        )
+
+        uid = neuron.uid
+        connections = set((uid, to) for to in self._successors[uid])
+        connections.update((pre, uid) for pre in self._predecessors[uid])
+        for key in connections:
+            self.remove_synapse(self._synapses_by_neurons[key])
+
+        self._shared.discard(id(neuron))
+        del self._neurons_by_uid[uid]
+        del self._neuron_types[uid]
+        del self._successors[uid]
+        del self._predecessors[uid]
+        if self._reachable is not None:
+            self._reachable.discard(uid)
+        if self._influence is not None:
+            self._influence.discard(uid)
 
     def remove_neuron_uid(self, uid: int):
         """
@@ -225,7 +480,10 @@ class Network(JsonSerialize):
         :param uid:
         :return:
         """
-        return next((n for n in self.hidden_neurons if n.uid == uid), None)
+        neuron = self._neurons_by_uid.get(uid)
+        if neuron not in self.hidden_neurons:
+            return None
+        return neuron
 
     def find_neuron_by_uid(self, uid: int) -> Optional[Neuron]:
         """
@@ -234,7 +492,7 @@ class Network(JsonSerialize):
         :param uid:
         :return:
         """
-        return next((n for n in self.get_all_neurons() if n.uid == uid), None)
+        return self._neurons_by_uid.get(uid)
 
     def remove_synapse(self, synapse: Synapse):
         """
@@ -244,6 +502,8 @@ class Network(JsonSerialize):
         :return:
         """
         self.synapses.remove(synapse)
+        self._shared.discard(id(synapse))
+        self._unindex_synapse(synapse)
 
     def find_synapse_by_neurons(
         self, from_neuron: Neuron, to_neuron: Neuron
@@ -267,15 +527,7 @@ class Network(JsonSerialize):
         :param connect_to:
         :return:
         """
-        return next(
-            (
-                s
-                for s in self.synapses
-                if s.connect_from == connect_from
-                and s.connect_to == connect_to
-            ),
-            None,
-        )
+        return self._synapses_by_neurons.get((connect_from, connect_to))
 
     def can_reach_output(self):
         """
@@ -297,11 +549,10 @@ class Network(JsonSerialize):
 
         :return:
         """
-        graph = self.to_networkx()
-        graph.add_node("start")
-        for input_neuron in self.input_neurons:
-            graph.add_edge("start", input_neuron.uid)
-        return nx.descendants(graph, "start")
+        if self._reachable is None:
+            start = [n.uid for n in self.input_neurons]
+            self._reachable = _traverse(start, self._successors)
+        return set(self._reachable)
 
     def influence_output_neurons(self) -> Set[int]:
         """
@@ -309,11 +560,10 @@ class Network(JsonSerialize):
 
         :return:
         """
-        graph = self.to_networkx().reverse()
-        graph.add_node("start")
-        for output_neuron in self.output_neurons:
-            graph.add_edge("start", output_neuron.uid)
-        return nx.descendants(graph, "start")
+        if self._influence is None:
+            start = [n.uid for n in self.output_neurons]
+            self._influence = _traverse(start, self._predecessors)
+        return set(self._influence)
 
     def to_networkx(self):
         """
@@ -41,7 +41,23 @@ if __name__ == "__main__":
         action="store_false",
     )
     parser.add_argument(
-        "-s", "--stats", help="Save stats", type=str, default=None
+        "-s",
+        "--stats",
+        help="Save stats (.npz for the compact binary format, json otherwise)",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--timings",
+        help="Save the timings of each epoch (.csv or .json)",
+        type=str,
+        default=None,
+    )
+    parser.add_argument(
+        "--lineage",
+        help="Save the lineage of all networks as csv edge list",
+        type=str,
+        default=None,
     )
     parser.add_argument(
         "-l",
@@ -138,3 +154,9 @@ if __name__ == "__main__":
 
     if args.stats:
         stats.to_file(args.stats, indent=None)
+
+    if args.timings:
+        stats.timings_to_file(args.timings)
+
+    if args.lineage:
+        stats.get_lineage().edge_list_to_file(args.lineage)
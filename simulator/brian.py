@@ -1,26 +1,37 @@
 """
 Actual implementation of a simulator using brian
 """
+import gc
 import os
 import platform
-from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 from brian2 import (
     Network,
+    NetworkOperation,
     NeuronGroup,
+    SpikeGeneratorGroup,
     SpikeMonitor,
     StateMonitor,
     Synapses,
     Unit,
+    defaultclock,
+    device,
     ms,
+    second,
     seed,
+    set_device,
 )
+from brian2.devices.device import reset_device
 
+from network.compact_network import CompactNetwork
 from network.decoder.brian.decoder import BrianDecoder
 from network.encoder.brian.encoder import BrianEncoder
 from network.network import Network as EoNetwork
 from simulator.simulator import Simulator
+from utility.timing import span
 from utility.validation import (
     any_check,
     chain_checks,
@@ -41,6 +52,100 @@ def set_brian_parameters():
 
 set_brian_parameters()
 
+try:
+    import fcntl
+except ImportError:  # e.g. on windows, standalone projects are not locked
+    fcntl = None
+
+# increase of the membrane potential, when an input neuron receives a spike
+INPUT_WEIGHT = 129
+# approximate memory of a neuron and a synapse in brian, measured
+NEURON_BYTES = 40
+SYNAPSE_BYTES = 120
+
+
+def get_standalone_capacity(amount: int) -> int:
+    """
+    Size of an array in a standalone project, rounded up to a power of two,
+    so populations of similar size share the same compiled project
+    At least one element is left for padding
+
+    :param amount: amount of used elements
+    :return:
+    """
+    return 1 << int(amount).bit_length()
+
+
+def pad_array(values: np.ndarray, size: int, value) -> np.ndarray:
+    """
+    Append the value to an array, until it has the given size
+
+    :param values:
+    :param size:
+    :param value:
+    :return:
+    """
+    padding = np.full(size - len(values), value, dtype=values.dtype)
+    return np.concatenate([values, padding])
+
+
+@contextmanager
+def standalone_device():
+    """
+    Use the brian standalone device for the objects created in the context
+
+    :return:
+    """
+    set_device("cpp_standalone", build_on_run=False)
+    try:
+        yield
+    finally:
+        # forget the objects, to start a new project next time
+        device.reinit()
+        reset_device()
+
+
+@contextmanager
+def locked_directory(directory: str):
+    """
+    Create a directory and lock it against other processes in the context
+
+    :param directory:
+    :return:
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "lock"), "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def is_decided(
+    decoder: BrianDecoder,
+    counts: np.ndarray,
+    remaining_steps: int,
+    dt: float,
+    max_rate: Optional[float] = None,
+) -> bool:
+    """
+    Whether the decoded values of all outputs can't change anymore
+    A neuron spikes at most once per time step, unless a maximum rate
+    is assumed
+
+    :param decoder: decoder, which decodes spike counts
+    :param counts: output spike counts, one row for each output
+    :param remaining_steps: time steps, that are not simulated yet
+    :param dt: duration of a time step in seconds
+    :param max_rate: assumed maximum rate of a neuron in Hz
+    :return:
+    """
+    max_additional = remaining_steps
+    if max_rate is not None:
+        max_additional = min(
+            max_additional, int(np.ceil(max_rate * remaining_steps * dt))
+        )
+    return bool(decoder.get_decided(counts, max_additional).all())
+
 
 class BrianSimulator(Simulator):
     """
@@ -48,29 +153,127 @@ class BrianSimulator(Simulator):
     """
 
     brian_network: Network
-    spikes: SpikeMonitor
+    spikes: Optional[SpikeMonitor]  # None, if spikes are only counted
     _neurons: NeuronGroup
+    _output_indices: np.ndarray  # output neurons, one row for each network
+    _spike_generator: SpikeGeneratorGroup
+    _input_synapses: Synapses
+    _input_network_index: np.ndarray  # network of each input synapse
     simulation_time: Unit
+    persistent: bool
+    monitor_spikes: bool
+    early_stop_interval: Optional[Unit]
+    early_stop_max_rate: Optional[float]
+    simulated_time: Unit  # time of the last simulation, until stopped
+    _start_time: Unit
+    standalone_directory: Optional[str]
+    _standalone_name: str  # project of the network capacities
+    _standalone_counts: np.ndarray  # spike counts of the last standalone run
+    _brian_seed: Optional[int]
 
     encoder: BrianEncoder
     decoder: BrianDecoder
 
     def __init__(
         self,
-        networks: List[EoNetwork],
+        networks: List[Union[EoNetwork, CompactNetwork]],
         inputs: List[Tuple],
         encoder: BrianEncoder,
         decoder: BrianDecoder,
         simulation_time=1000 * ms,
         brian_seed: Optional[int] = None,
+        persistent: bool = False,
+        monitor_spikes: bool = True,
+        early_stop_interval: Optional[Unit] = None,
+        early_stop_max_rate: Optional[float] = None,
+        standalone_directory: Optional[str] = None,
     ):
+        """
+        :param persistent: keep the brian network, to simulate new inputs
+            via set_inputs without building it again
+        :param monitor_spikes: record the spike times of all neurons,
+            otherwise the neurons only count their spikes
+        :param early_stop_interval: simulate in chunks of this time and stop,
+            when no decoded value can change anymore, None to disable
+        :param early_stop_max_rate: assumed maximum rate (Hz) of an output
+            neuron for the early stop, None for one spike per time step
+        :param standalone_directory: simulate with compiled c++ projects,
+            which are kept in this directory and reused for populations
+            of similar size, None to simulate in python
+        """
         super().__init__(networks, encoder, decoder)
         self.inputs = inputs
-        self._create_network()
+        self.persistent = persistent
+        self.monitor_spikes = monitor_spikes
+        self.early_stop_interval = early_stop_interval
+        self.early_stop_max_rate = early_stop_max_rate
+        if early_stop_interval is not None and not decoder.decodes_counts:
+            raise RuntimeError(
+                "An early stop requires a decoder, which decodes counts"
+            )
+        self.standalone_directory = standalone_directory
+        if standalone_directory is not None and (
+            persistent or monitor_spikes or early_stop_interval is not None
+        ):
+            raise RuntimeError(
+                "The standalone simulation only counts spikes, "
+                "without persistence or an early stop"
+            )
         self.simulation_time = simulation_time
+        self._brian_seed = brian_seed
+
+        # standalone networks are created on the standalone device
+        if standalone_directory is None:
+            with span("create_network"):
+                self._create_network()
+            if brian_seed is not None:
+                seed(brian_seed)
+
+    @classmethod
+    def estimate_memory(
+        cls,
+        networks: List[Union[EoNetwork, CompactNetwork]],
+        encoder: BrianEncoder,
+    ) -> np.ndarray:
+        """
+        Approximate memory of each network in a simulation,
+        including its input synapses and spike generators
+
+        :param networks: networks as given to the simulator
+        :param encoder:
+        :return: bytes for each network
+        """
+        sizes = cls.get_network_sizes(networks)
+        memory = (
+            sizes["neurons"] * NEURON_BYTES
+            + (sizes["synapses"] + sizes["inputs"]) * SYNAPSE_BYTES
+        )
+        if not encoder.is_deterministic():
+            # otherwise spike generators are shared for same patterns
+            memory += encoder.number_of_neurons * NEURON_BYTES
+        return memory
+
+    @staticmethod
+    def get_network_parameters(compact: CompactNetwork):
+        """
+        Get the arrays of the neuron model for a single network
+        Neurons are referenced by their index in the network
 
-        if brian_seed is not None:
-            seed(brian_seed)
+        :param compact:
+        :return:
+        """
+        weight = compact.get_synapse_parameter("weight")
+        exciting = compact.get_synapse_parameter("exciting").astype(bool)
+        return {
+            "threshold": compact.get_neuron_parameter("threshold"),
+            "leak": compact.get_neuron_parameter("leak", default=10),
+            "synapse_from": compact.get_synapse_from_index(),
+            "synapse_to": compact.get_synapse_to_index(),
+            "delay": compact.get_synapse_parameter("delay"),
+            "weight": np.where(exciting, weight, -weight),
+            "input": compact.get_input_index(),
+            "output": compact.get_output_index(),
+        }
 
     def _create_network(self):
         """
@@ -78,102 +281,158 @@ class BrianSimulator(Simulator):
 
         :return:
         """
-        networks = self.networks
-        number_neurons = sum(len(x.get_all_neurons()) for x in networks)
+        compact_networks = self._get_compact_networks()
+
+        # parameters are only calculated once per distinct network
+        distinct_parameters = {}
+        for compact in compact_networks:
+            if id(compact) not in distinct_parameters:
+                distinct_parameters[id(compact)] = self.get_network_parameters(
+                    compact
+                )
+        parameters = [distinct_parameters[id(c)] for c in compact_networks]
+
+        def concatenate(key):
+            return np.concatenate([p[key] for p in parameters])
+
+        def counts(key):
+            return np.array([len(p[key]) for p in parameters], dtype=int)
+
+        neuron_counts = counts("threshold")
+        # index of the first neuron of each network
+        offsets = np.cumsum(neuron_counts) - neuron_counts
+
+        if self.encoder.is_deterministic() and not self.persistent:
+            # keep the order of the patterns, to reuse the encoder's layout
+            input_patterns = list(dict.fromkeys(self.inputs))
+            pattern_index = {p: i for i, p in enumerate(input_patterns)}
+            generator_index = [pattern_index[p] for p in self.inputs]
+        else:
+            input_patterns = self.inputs
+            generator_index = list(range(len(self.networks)))
+
+        # shift indices of each network by the offset of its first neuron
+        synapse_offsets = np.repeat(offsets, counts("synapse_from"))
+        synapse_connections_from = (
+            concatenate("synapse_from") + synapse_offsets
+        )
+        synapse_connections_to = concatenate("synapse_to") + synapse_offsets
+
+        # connect the spike generator of the specified input pattern
+        # to the input neurons of each network
+        input_counts = counts("input")
+        input_starts = np.cumsum(input_counts) - input_counts
+        input_position = np.arange(input_counts.sum()) - np.repeat(
+            input_starts, input_counts
+        )
+        spike_generator_offsets = (
+            np.array(generator_index, dtype=int)
+            * self.encoder.number_of_neurons
+        )
+        spike_generator_synapses_from = input_position + np.repeat(
+            spike_generator_offsets, input_counts
+        )
+        spike_generator_synapses_to = concatenate("input") + np.repeat(
+            offsets, input_counts
+        )
+
+        threshold = concatenate("threshold")
+        leak = concatenate("leak")
+        delay = concatenate("delay")
+        weight = concatenate("weight")
+        input_weight = np.full(len(spike_generator_synapses_to), INPUT_WEIGHT)
+        number_neurons = len(threshold)
+        if self.standalone_directory is not None:
+            # the compiled code only depends on the sizes of the arrays,
+            # so padded arrays let similar populations share a project
+            number_neurons = get_standalone_capacity(number_neurons)
+            number_synapses = get_standalone_capacity(len(weight))
+            number_inputs = get_standalone_capacity(len(input_weight))
+            number_generators = get_standalone_capacity(
+                len(input_patterns) * self.encoder.number_of_neurons
+            )
+            self._standalone_name = (
+                f"{number_neurons}_{number_synapses}"
+                f"_{number_inputs}_{number_generators}"
+            )
+
+            # padded synapses connect the last neuron or generator
+            # without weight to the last neuron, both never spike
+            unused_neuron = number_neurons - 1
+            threshold = pad_array(threshold, number_neurons, 1)
+            leak = pad_array(leak, number_neurons, 10)
+            synapse_connections_from = pad_array(
+                synapse_connections_from, number_synapses, unused_neuron
+            )
+            synapse_connections_to = pad_array(
+                synapse_connections_to, number_synapses, unused_neuron
+            )
+            delay = pad_array(delay, number_synapses, 0)
+            weight = pad_array(weight, number_synapses, 0)
+            spike_generator_synapses_from = pad_array(
+                spike_generator_synapses_from,
+                number_inputs,
+                number_generators - 1,
+            )
+            spike_generator_synapses_to = pad_array(
+                spike_generator_synapses_to, number_inputs, unused_neuron
+            )
+            input_weight = pad_array(input_weight, number_inputs, 0)
+            spike_generator = self.encoder.get_padded_spike_generator(
+                input_patterns,
+                number_generators,
+                name="standalone_spike_generator",
+            )
+        else:
+            spike_generator = self.encoder.get_spike_generator(input_patterns)
 
         # create all brian objects that we need
         # leaky integrate and fire neuron
         eqs = """dv/dt = (-v)/(leak*ms) : 1
                  v_th: 1
-                 leak: 1"""
+                 leak: 1
+                 spike_count: integer"""
+        names = ["neurongroup*", "synapses*", "synapses*", "network*"]
+        if self.standalone_directory is not None:
+            # fixed names keep the generated code of a project the same
+            names = [
+                "standalone_neurons",
+                "standalone_synapses",
+                "standalone_input_synapses",
+                "standalone_network",
+            ]
         neurons = NeuronGroup(
             N=number_neurons,
             model=eqs,
             threshold="v > v_th",
-            reset="v = 0",
+            # counting in the reset is cheaper than a spike monitor
+            reset="""v = 0
+                     spike_count += 1""",
             method="euler",
+            name=names[0],
+        )
+        synapses = Synapses(
+            neurons, neurons, model="w: 1", on_pre="v += w", name=names[1]
         )
-        synapses = Synapses(neurons, neurons, model="w: 1", on_pre="v += w")
-        if self.encoder.is_deterministic():
-            input_patterns = list(set(self.inputs))
-        else:
-            input_patterns = self.inputs
-        spike_generator = self.encoder.get_spike_generator(input_patterns)
         spike_generator_synapses = Synapses(
-            spike_generator, neurons, on_pre="v += 129"
+            spike_generator,
+            neurons,
+            model="w: 1",
+            on_pre="v += w",
+            name=names[2],
         )
-        spikes = SpikeMonitor(neurons)
-
-        # iteration over networks, for neuron variables and
-        offset = 0  # offset variable, to get correct neuron ids in networks
-
-        synapse_connections_from = []
-        synapse_connections_to = []
-        synapse_delay = []
-        synapse_weight = []
-
-        spike_generator_synapses_from = []
-        spike_generator_synapses_to = []
-
-        neuron_threshold = np.zeros(number_neurons)
-        neuron_leak = np.zeros(number_neurons)
-
-        for i, network in enumerate(networks):
-            sorted_neurons = network.get_all_neurons()
-            sorted_neurons_uid = [n.uid for n in sorted_neurons]
-
-            # set synapse values for all synapses in a network
-            for synapse in network.get_all_synapses():
-                # get absolute ids for neuron in network
-                from_id = (
-                    sorted_neurons_uid.index(synapse.connect_from) + offset
-                )
-                to_id = sorted_neurons_uid.index(synapse.connect_to) + offset
-
-                synapse_connections_from.append(from_id)
-                synapse_connections_to.append(to_id)
-
-                synapse_delay.append(synapse.delay * ms)
-                weight = synapse.weight
-                if not synapse.exciting:
-                    weight *= -1
-                synapse_weight.append(weight)
-
-            # set neuron thresholds
-            for index, neuron in enumerate(sorted_neurons):
-                neuron_threshold[index + offset] = neuron.threshold
-                neuron_leak[index + offset] = self._get_neuron_leak(neuron)
-
-            # find the correct spike generator for the specified input pattern
-            if self.encoder.is_deterministic():
-                spike_generator_offset = (
-                    input_patterns.index(self.inputs[i])
-                    * self.encoder.number_of_neurons
-                )
-            else:
-                spike_generator_offset = i * self.encoder.number_of_neurons
-
-            # add synapse from spike generator to input neurons
-            for index, _ in enumerate(network.input_neurons):
-                spike_generator_synapses_from.append(
-                    index + spike_generator_offset
-                )
-                spike_generator_synapses_to.append(offset + index)
-
-            offset += len(
-                sorted_neurons
-            )  # set offset to first neuron id of next network
+        spikes = SpikeMonitor(neurons) if self.monitor_spikes else None
 
         # single calls of brian improve performance
-        neurons.v_th = neuron_threshold
-        neurons.leak = neuron_leak
+        neurons.v_th = threshold
+        neurons.leak = leak
         if len(synapse_connections_from) != 0:
             synapses.connect(
                 i=synapse_connections_from, j=synapse_connections_to
             )
             # set synapse values after connections are established
-            synapses.delay = synapse_delay
-            synapses.w = synapse_weight
+            synapses.delay = delay * ms
+            synapses.w = weight
         else:
             # when there are no synpases in all networks, set them to false
             # otherwise, brian will throw an exception
@@ -181,6 +440,7 @@ class BrianSimulator(Simulator):
         spike_generator_synapses.connect(
             i=spike_generator_synapses_from, j=spike_generator_synapses_to
         )
+        spike_generator_synapses.w = input_weight
 
         # finally, create the brian network and set class variables
         net = Network(
@@ -188,47 +448,71 @@ class BrianSimulator(Simulator):
             synapses,
             spike_generator,
             spike_generator_synapses,
-            spikes,
+            name=names[3],
         )
+        if spikes is not None:
+            net.add(spikes)
+        if self.early_stop_interval is not None:
+            net.add(
+                NetworkOperation(
+                    self._stop_if_decided,
+                    dt=self.early_stop_interval,
+                    when="end",
+                )
+            )
         self.brian_network = net
         self.spikes = spikes
         # add neurons for later access (e.g. for adding state monitor values)
         self._neurons = neurons
+        self._spike_generator = spike_generator
+        self._input_synapses = spike_generator_synapses
+        self._input_network_index = np.repeat(
+            np.arange(len(parameters)), input_counts
+        )
+        # absolute indices of the output neurons for each network
+        self._output_indices = self._get_output_index_matrix(
+            [p["output"] + offset for p, offset in zip(parameters, offsets)]
+        )
 
-    @staticmethod
-    def _get_neuron_leak(neuron):
-        """
-        Use 10 as default value
-
-        :param neuron:
-        :return:
-        """
-        if "leak" not in neuron.parameters:
-            return 10  # default value
-        return neuron.leak
+        if self.persistent:
+            # initial state, to reset before each simulation
+            net.store()
 
-    def _get_output_spike_trains(self, spike_trains):
+    def set_inputs(
+        self, inputs: List[Tuple], active: Optional[np.ndarray] = None
+    ):
         """
-        Get spike trains from all networks with output neurons,
-        in order of neurons given in network
+        Reset the persistent network to its initial state
+        (membrane potential, monitors, time) and set new inputs
 
-        :param spike_trains:
+        :param inputs: one input for each network
+        :param active: mask of networks to simulate,
+            inactive networks do not receive input spikes
         :return:
         """
-        network_spike_trains = []
+        if not self.persistent:
+            raise RuntimeError(
+                "Inputs can only be changed for a persistent simulator"
+            )
 
-        offset = 0
-        for network in self.networks:
-            out_spike_trains = []
-            sorted_neurons = network.get_all_neurons()
-            for output_neuron in network.output_neurons:
-                index = sorted_neurons.index(output_neuron) + offset
-                out_spike_trains.append(spike_trains[index])
-            network_spike_trains.append(out_spike_trains)
+        self.brian_network.restore()
+        self.inputs = inputs
+        self.encoder.set_spike_data(self._spike_generator, inputs)
+        if active is not None:
+            active_synapses = np.asarray(active)[self._input_network_index]
+            self._input_synapses.w = np.where(active_synapses, INPUT_WEIGHT, 0)
 
-            offset += len(sorted_neurons)
+    def get_output_counts(self) -> np.ndarray:
+        """
+        Spike counts of the output neurons
 
-        return network_spike_trains
+        :return: one row for each network, one column for each output neuron
+        """
+        if self.standalone_directory is not None:
+            spike_counts = self._standalone_counts
+        else:
+            spike_counts = np.asarray(self._neurons.spike_count[:])
+        return spike_counts[self._output_indices]
 
     def _get_decoded_values(self):
         """
@@ -236,15 +520,18 @@ class BrianSimulator(Simulator):
 
         :return:
         """
-        spike_trains = self.spikes.spike_trains()
-        output_network = self._get_output_spike_trains(spike_trains)
+        if self.decoder.decodes_counts:
+            return self.decoder.get_values(self.get_output_counts())
 
+        if self.spikes is None:
+            raise RuntimeError(
+                "The decoder needs spike times, enable monitor_spikes"
+            )
+        spike_trains = self.spikes.spike_trains()
         decoded = []
-        for output in output_network:
-            self.decoder.set_spikes(output)
-            value = self.decoder.get_value()
-            decoded.append(value)
-
+        for output_indices in self._output_indices:
+            self.decoder.set_spikes([spike_trains[i] for i in output_indices])
+            decoded.append(self.decoder.get_value())
         return decoded
 
     def add_neuron_state_monitor(self):
@@ -262,9 +549,75 @@ class BrianSimulator(Simulator):
 
         :return: values returned by the decoder
         """
+        if self.standalone_directory is not None:
+            return self._simulate_standalone()
+
         net = self.brian_network
-        net.run(self.simulation_time)
-        return self._get_decoded_values()
+        self._start_time = net.t
+        # includes the code generation of brian
+        with span("simulation"):
+            net.run(self.simulation_time)
+        self.simulated_time = net.t - self._start_time
+        with span("decoding"):
+            return self._get_decoded_values()
+
+    def _simulate_standalone(self):
+        """
+        Simulate the network with a compiled project of its capacities
+        The project is only compiled, if it doesn't exist yet,
+        otherwise the binary runs with the arrays of the new network
+
+        :return: values returned by the decoder
+        """
+        # names of code objects are only reused, when the objects of
+        # previous simulations are released
+        gc.collect()
+        with standalone_device():
+            if self._brian_seed is not None:
+                seed(self._brian_seed)
+            with span("create_network"):
+                self._create_network()
+
+            directory = os.path.join(
+                self.standalone_directory, self._standalone_name
+            )
+            # includes the code generation and, if needed, the compilation
+            with span("simulation"), locked_directory(directory):
+                self.brian_network.run(self.simulation_time)
+                device.build(directory=directory, with_output=False)
+                self._standalone_counts = np.asarray(
+                    self._neurons.spike_count[:]
+                )
+            # the objects can't be used without the standalone device
+            self.brian_network = None
+            self._neurons = None
+            self._spike_generator = None
+            self._input_synapses = None
+        self.simulated_time = self.simulation_time
+        with span("decoding"):
+            return self._get_decoded_values()
+
+    def _stop_if_decided(self, t):
+        """
+        Stop the current run, when the decoded values can't change anymore
+
+        :param t: current time of the simulation
+        :return:
+        """
+        dt = defaultclock.dt
+        # operation is called at the end of a time step
+        simulated_steps = int(round((t - self._start_time) / dt)) + 1
+        remaining_steps = (
+            int(round(self.simulation_time / dt)) - simulated_steps
+        )
+        if is_decided(
+            self.decoder,
+            self.get_output_counts(),
+            remaining_steps,
+            float(dt / second),
+            self.early_stop_max_rate,
+        ):
+            self.brian_network.stop()
 
     @staticmethod
     def get_neuron_parameters():
@@ -0,0 +1,433 @@
+"""
+Simulator for the neuron model of brian, implemented with numpy
+"""
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+from brian2 import Unit, ms, second
+from scipy.sparse import csr_matrix
+
+from network.compact_network import CompactNetwork
+from network.decoder.brian.decoder import BrianDecoder
+from network.encoder.brian.encoder import BrianEncoder
+from network.network import Network
+from simulator.brian import INPUT_WEIGHT, BrianSimulator, is_decided
+from simulator.simulator import Simulator
+from utility.timing import span
+
+# time step of the simulation, same as the default clock of brian
+DT = 0.0001
+# brian's value of a millisecond, to calculate the same way as brian
+MS = 0.001
+# approximate memory of a neuron without the buffer and of a synapse
+NEURON_BYTES = 64
+SYNAPSE_BYTES = 40
+# approximate memory of the input spikes of an input neuron in one second
+INPUT_NEURON_BYTES = 2000
+
+
+class NumpySimulator(Simulator):
+    """
+    Simulate the same leaky integrate and fire neurons as BrianSimulator,
+    without code generation of brian
+    All networks are simulated at once, delayed spikes are kept in a
+    circular buffer with one row per time step of the longest delay
+    """
+
+    simulation_time: Unit
+    persistent: bool
+    monitor_spikes: bool
+    early_stop_interval: Optional[Unit]
+    early_stop_max_rate: Optional[float]
+    simulated_time: Unit  # time of the last simulation, until stopped
+
+    spike_counts: np.ndarray  # amount of spikes for each neuron
+    _spike_steps: np.ndarray  # time step of each spike
+    _spike_neurons: np.ndarray  # neuron of each spike
+
+    _threshold: np.ndarray
+    _leak: np.ndarray
+    _synapse_pointer: np.ndarray  # first synapse of each neuron
+    _synapse_to: np.ndarray
+    _synapse_steps: np.ndarray  # delay in time steps
+    _synapse_weight: np.ndarray
+    _generator_targets: csr_matrix  # (spike generator, neuron) -> amount
+    _input_patterns: List[Tuple]  # one pattern for each spike generator
+    _input_network_index: np.ndarray  # network of each neuron
+    _inputs: csr_matrix  # (time step, neuron) -> added potential
+    _output_indices: np.ndarray  # output neurons, one row for each network
+
+    encoder: BrianEncoder
+    decoder: BrianDecoder
+
+    def __init__(
+        self,
+        networks: List[Union[Network, CompactNetwork]],
+        inputs: List[Tuple],
+        encoder: BrianEncoder,
+        decoder: BrianDecoder,
+        simulation_time=1000 * ms,
+        brian_seed: Optional[int] = None,
+        persistent: bool = False,
+        monitor_spikes: bool = True,
+        early_stop_interval: Optional[Unit] = None,
+        early_stop_max_rate: Optional[float] = None,
+    ):
+        """
+        Same parameters as for BrianSimulator
+
+        :param brian_seed: seed for numpy, e.g. for poisson spikes
+        :param persistent: allow to simulate new inputs via set_inputs
+        :param monitor_spikes: record the spike times of all neurons,
+            otherwise only the amount of spikes is available
+        """
+        super().__init__(networks, encoder, decoder)
+        self.inputs = inputs
+        self.simulation_time = simulation_time
+        self.persistent = persistent
+        self.monitor_spikes = monitor_spikes
+        self.early_stop_interval = early_stop_interval
+        self.early_stop_max_rate = early_stop_max_rate
+        if early_stop_interval is not None and not decoder.decodes_counts:
+            raise RuntimeError(
+                "An early stop requires a decoder, which decodes counts"
+            )
+
+        if brian_seed is not None:
+            np.random.seed(brian_seed)
+
+        with span("create_network"):
+            self._create_network()
+            self._set_input_spikes(self._input_patterns)
+
+    @classmethod
+    def estimate_memory(
+        cls,
+        networks: List[Union[Network, CompactNetwork]],
+        encoder: BrianEncoder,
+    ) -> np.ndarray:
+        """
+        Approximate memory of each network in a simulation of one second,
+        the buffer of each neuron has a row for each step of the longest
+        delay of all networks
+
+        :param networks: networks as given to the simulator
+        :param encoder:
+        :return: bytes for each network
+        """
+        max_delay = 0
+        for network in {id(n): n for n in networks}.values():
+            if isinstance(network, CompactNetwork):
+                delays = network.get_synapse_parameter("delay", default=0)
+            else:
+                delays = [
+                    s.parameters.get("delay", 0) for s in network.synapses
+                ]
+            max_delay = max(max_delay, max(delays, default=0))
+        buffer_size = int(round(max_delay * MS / DT)) + 1
+
+        sizes = cls.get_network_sizes(networks)
+        return (
+            sizes["neurons"] * (NEURON_BYTES + 8 * buffer_size)
+            + sizes["synapses"] * SYNAPSE_BYTES
+            + sizes["inputs"] * INPUT_NEURON_BYTES
+        )
+
+    def get_steps(self) -> int:
+        """
+        Amount of time steps to simulate
+
+        :return:
+        """
+        return int(round(self.simulation_time / second / DT))
+
+    def _create_network(self):
+        """
+        Create the arrays for all networks
+
+        :return:
+        """
+        compact_networks = self._get_compact_networks()
+
+        # parameters are only calculated once per distinct network
+        distinct_parameters = {}
+        for compact in compact_networks:
+            if id(compact) not in distinct_parameters:
+                distinct_parameters[
+                    id(compact)
+                ] = BrianSimulator.get_network_parameters(compact)
+        parameters = [distinct_parameters[id(c)] for c in compact_networks]
+
+        def concatenate(key, dtype=float):
+            values = [np.asarray(p[key], dtype=dtype) for p in parameters]
+            if len(values) == 0:
+                return np.zeros(0, dtype=dtype)
+            return np.concatenate(values)
+
+        def counts(key):
+            return np.array([len(p[key]) for p in parameters], dtype=int)
+
+        neuron_counts = counts("threshold")
+        number_neurons = int(neuron_counts.sum())
+        # index of the first neuron of each network
+        offsets = np.cumsum(neuron_counts) - neuron_counts
+
+        self._threshold = concatenate("threshold")
+        self._leak = concatenate("leak")
+
+        # synapses in compressed sparse row format, rows are the
+        # pre-synaptic neurons, delay in steps is kept for each synapse
+        synapse_offsets = np.repeat(offsets, counts("synapse_from"))
+        synapse_from = concatenate("synapse_from", int) + synapse_offsets
+        synapse_to = concatenate("synapse_to", int) + synapse_offsets
+        synapse_steps = np.round(concatenate("delay") * MS / DT).astype(int)
+        order = np.argsort(synapse_from, kind="stable")
+        self._synapse_pointer = np.searchsorted(
+            synapse_from[order], np.arange(number_neurons + 1)
+        )
+        self._synapse_to = synapse_to[order]
+        self._synapse_steps = synapse_steps[order]
+        self._synapse_weight = concatenate("weight")[order]
+
+        # each network has own spike generators, unless they can be shared
+        if self.encoder.is_deterministic() and not self.persistent:
+            # keep the order of the patterns, to reuse the encoder's layout
+            input_patterns = list(dict.fromkeys(self.inputs))
+            pattern_index = {p: i for i, p in enumerate(input_patterns)}
+            generator_index = [pattern_index[p] for p in self.inputs]
+        else:
+            input_patterns = self.inputs
+            generator_index = list(range(len(self.networks)))
+        self._input_patterns = input_patterns
+
+        input_counts = counts("input")
+        input_starts = np.cumsum(input_counts) - input_counts
+        input_position = np.arange(input_counts.sum()) - np.repeat(
+            input_starts, input_counts
+        )
+        generator_offsets = (
+            np.array(generator_index, dtype=int)
+            * self.encoder.number_of_neurons
+        )
+        generators = input_position + np.repeat(
+            generator_offsets, input_counts
+        )
+        input_neurons = concatenate("input", int) + np.repeat(
+            offsets, input_counts
+        )
+        self._generator_targets = csr_matrix(
+            (np.ones(len(generators)), (generators, input_neurons)),
+            shape=(
+                len(input_patterns) * self.encoder.number_of_neurons,
+                number_neurons,
+            ),
+        )
+        self._input_network_index = np.repeat(
+            np.arange(len(parameters)), neuron_counts
+        )
+
+        # absolute indices of the output neurons for each network
+        self._output_indices = self._get_output_index_matrix(
+            [p["output"] + offset for p, offset in zip(parameters, offsets)]
+        )
+
+    def _set_input_spikes(
+        self, input_patterns: List[Tuple], active: Optional[np.ndarray] = None
+    ):
+        """
+        Calculate the input potential for each time step and neuron
+
+        :param input_patterns: one pattern for each spike generator
+        :param active: mask of networks, that receive input spikes
+        :return:
+        """
+        steps = self.get_steps()
+        duration = self.simulation_time / second
+        spike_indices, times = self.encoder.get_spike_times(
+            input_patterns, duration=duration
+        )
+        # same time bins as brian's spike generator
+        spike_steps = ((np.asarray(times) + 1e-3 * DT) / DT).astype(int)
+        # spikes after the simulated time are never delivered
+        in_time = spike_steps < steps
+
+        generator_spikes = csr_matrix(
+            (
+                np.full(np.count_nonzero(in_time), INPUT_WEIGHT, dtype=float),
+                (spike_steps[in_time], np.asarray(spike_indices)[in_time]),
+            ),
+            shape=(steps, self._generator_targets.shape[0]),
+        )
+        inputs = generator_spikes @ self._generator_targets
+        if active is not None:
+            neuron_active = np.asarray(active)[self._input_network_index]
+            inputs = inputs.multiply(neuron_active).tocsr()
+        inputs.sum_duplicates()
+        self._inputs = inputs
+
+    def set_inputs(
+        self, inputs: List[Tuple], active: Optional[np.ndarray] = None
+    ):
+        """
+        Set new inputs for the next simulation, which starts from the
+        initial state again
+
+        :param inputs: one input for each network
+        :param active: mask of networks to simulate,
+            inactive networks do not receive input spikes
+        :return:
+        """
+        if not self.persistent:
+            raise RuntimeError(
+                "Inputs can only be changed for a persistent simulator"
+            )
+
+        self.inputs = inputs
+        self._set_input_spikes(inputs, active)
+
+    def _run(self):
+        """
+        Simulate all time steps in the same order as brian:
+        state update, threshold, synaptic transmission and reset
+
+        :return:
+        """
+        number_neurons = len(self._threshold)
+        buffer_size = int(self._synapse_steps.max(initial=0)) + 1
+        # potential, which arrives at the neurons in the future time steps
+        # flat, with one row of neurons for each time step
+        buffer = np.zeros(buffer_size * number_neurons)
+
+        v = np.zeros(number_neurons)
+        leak = self._leak * MS
+        input_pointer = self._inputs.indptr
+        input_neurons = self._inputs.indices
+        input_data = self._inputs.data
+
+        steps = self.get_steps()
+        check_steps = None
+        if self.early_stop_interval is not None:
+            check_steps = max(
+                int(round(self.early_stop_interval / second / DT)), 1
+            )
+
+        spike_counts = np.zeros(number_neurons, dtype=int)
+        spike_steps = []
+        spike_neurons = []
+        simulated_steps = 0
+        for step in range(steps):
+            # same calculation as brian's euler state updater
+            v = -DT * v / leak + v
+            spiking = np.flatnonzero(v > self._threshold)
+
+            row = (step % buffer_size) * number_neurons
+            if len(spiking) > 0:
+                spike_counts[spiking] += 1
+                if self.monitor_spikes:
+                    spike_steps.append(np.full(len(spiking), step))
+                    spike_neurons.append(spiking)
+
+                # indices of all synapses of the spiking neurons
+                starts = self._synapse_pointer[spiking]
+                amounts = self._synapse_pointer[spiking + 1] - starts
+                synapses = np.repeat(
+                    starts - np.cumsum(amounts) + amounts, amounts
+                ) + np.arange(amounts.sum())
+
+                arrival = (step + self._synapse_steps[synapses]) % buffer_size
+                np.add.at(
+                    buffer,
+                    arrival * number_neurons + self._synapse_to[synapses],
+                    self._synapse_weight[synapses],
+                )
+
+            start, end = input_pointer[step], input_pointer[step + 1]
+            v[input_neurons[start:end]] += input_data[start:end]
+            v += buffer[row : row + number_neurons]
+            buffer[row : row + number_neurons] = 0
+
+            v[spiking] = 0
+            simulated_steps = step + 1
+
+            if (
+                check_steps is not None
+                # same time steps as brian's network operation
+                and step % check_steps == 0
+                and is_decided(
+                    self.decoder,
+                    spike_counts[self._output_indices],
+                    steps - simulated_steps,
+                    DT,
+                    self.early_stop_max_rate,
+                )
+            ):
+                break
+
+        spike_steps = np.concatenate(spike_steps + [np.zeros(0, int)])
+        spike_neurons = np.concatenate(spike_neurons + [np.zeros(0, int)])
+        # sort spikes by neuron, to find the spikes of a neuron quickly
+        order = np.argsort(spike_neurons, kind="stable")
+        self._spike_steps = spike_steps[order]
+        self._spike_neurons = spike_neurons[order]
+        self.spike_counts = spike_counts
+        self.simulated_time = simulated_steps * DT * second
+
+    def get_spike_trains(self, indices: np.ndarray):
+        """
+        Spike times of the given neurons
+
+        :param indices: neuron indices
+        :return: one array of spike times (with unit) for each neuron
+        """
+        if not self.monitor_spikes:
+            raise RuntimeError(
+                "Spike times are not recorded, enable monitor_spikes"
+            )
+        starts = np.searchsorted(self._spike_neurons, indices, side="left")
+        ends = np.searchsorted(self._spike_neurons, indices, side="right")
+        return [
+            self._spike_steps[start:end] * DT * second
+            for start, end in zip(starts, ends)
+        ]
+
+    def get_output_counts(self) -> np.ndarray:
+        """
+        Spike counts of the output neurons
+
+        :return: one row for each network, one column for each output neuron
+        """
+        return self.spike_counts[self._output_indices]
+
+    def _get_decoded_values(self):
+        """
+        return decoded values for all outputs
+
+        :return:
+        """
+        if self.decoder.decodes_counts:
+            return self.decoder.get_values(self.get_output_counts())
+
+        decoded = []
+        for output_indices in self._output_indices:
+            self.decoder.set_spikes(self.get_spike_trains(output_indices))
+            decoded.append(self.decoder.get_value())
+        return decoded
+
+    def simulate(self):
+        """
+        Simulate the networks as created before
+
+        :return: values returned by the decoder
+        """
+        with span("simulation"):
+            self._run()
+        with span("decoding"):
+            return self._get_decoded_values()
+
+    @staticmethod
+    def get_neuron_parameters():
+        return BrianSimulator.get_neuron_parameters()
+
+    @staticmethod
+    def get_synapse_parameters():
+        return BrianSimulator.get_synapse_parameters()
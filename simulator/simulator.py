@@ -1,8 +1,11 @@
 """
 Provide an abstract class for simulators
 """
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Union
 
+import numpy as np
+
+from network.compact_network import CompactNetwork
 from network.decoder.decoder import Decoder
 from network.encoder.encoder import Encoder
 from network.network import Network
@@ -26,6 +29,78 @@ class Simulator:
         self.encoder = encoder
         self.decoder = decoder
 
+    def _get_compact_networks(self) -> List[CompactNetwork]:
+        """
+        Convert all networks to the compact representation
+        Networks, that are given multiple times, are converted only once
+
+        :return:
+        """
+        compact_networks = {}
+        for network in self.networks:
+            if id(network) in compact_networks:
+                continue
+            if isinstance(network, CompactNetwork):
+                compact = network
+            else:
+                compact = CompactNetwork.from_network(network)
+            compact_networks[id(network)] = compact
+
+        return [compact_networks[id(network)] for network in self.networks]
+
+    @staticmethod
+    def get_network_sizes(
+        networks: List[Union[Network, CompactNetwork]]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Amount of neurons, synapses and input neurons of each network
+        Networks, that are given multiple times, are counted only once
+
+        :param networks:
+        :return: name -> amount for each network
+        """
+        distinct_sizes = {}
+        for network in networks:
+            if id(network) in distinct_sizes:
+                continue
+            if isinstance(network, CompactNetwork):
+                sizes = (
+                    network.get_number_of_neurons(),
+                    network.get_number_of_synapses(),
+                    len(network.get_input_index()),
+                )
+            else:
+                sizes = (
+                    len(network.get_all_neurons()),
+                    len(network.synapses),
+                    len(network.input_neurons),
+                )
+            distinct_sizes[id(network)] = sizes
+
+        sizes = np.array(
+            [distinct_sizes[id(n)] for n in networks], dtype=int
+        ).reshape(-1, 3)
+        return {
+            "neurons": sizes[:, 0],
+            "synapses": sizes[:, 1],
+            "inputs": sizes[:, 2],
+        }
+
+    @staticmethod
+    def _get_output_index_matrix(
+        output_indices: List[np.ndarray],
+    ) -> np.ndarray:
+        """
+        Combine the output neuron indices of all networks,
+        all networks have the same amount of outputs
+
+        :param output_indices: indices of the output neurons of each network
+        :return: one row for each network
+        """
+        if len(output_indices) == 0:
+            return np.zeros((0, 0), dtype=int)
+        return np.stack(output_indices)
+
     def simulate(self):
         """
         Simulation of networks with and returns output from decoder
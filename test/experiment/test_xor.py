@@ -1,8 +1,14 @@
 import os
+import random
+import tempfile
 import unittest
 
 from experiment.brian.xor import XOR
+from network.evolution.generator import Generator
 from network.network import Network
+from network.neuron import Neuron
+from network.synapse import Synapse
+from utility.configuration import Configuration
 
 
 class TestXor(unittest.TestCase):
@@ -17,3 +23,82 @@ class TestXor(unittest.TestCase):
         self.assertEqual(
             4, experiment.performance(net), "networks classifies all correct"
         )
+
+    def test_network_without_path_to_output(self):
+        filename = os.path.join(
+            os.path.dirname(__file__), "data/almost-ideal-xor.json"
+        )
+        net = Network.from_file(filename)
+        dead = Network(
+            [Neuron(0, threshold=1), Neuron(1, threshold=1)],
+            [Neuron(2, threshold=1)],
+            [Neuron(3, threshold=1)],
+        )
+        dead.add_synapse(Synapse(0, 3, weight=1, delay=1, exciting=True))
+
+        experiment = XOR(decoder_type="binary")
+        outputs = experiment._simulate_on_multiple_inputs(
+            [dead, net], experiment.get_data()
+        )
+
+        self.assertEqual([(False, 0.0)] * 4, outputs[0])
+        counts = experiment._simulate_on_multiple_inputs(
+            [dead, net], experiment.get_data(), counts=True
+        )
+        self.assertEqual(0, counts[0].sum())
+        self.assertEqual([o[1] for o in outputs[1]], list(counts[1][:, 0]))
+        # the given network is not stripped
+        self.assertEqual(1, len(dead.hidden_neurons))
+
+    def test_simulation_chunks(self):
+        random.seed(5)
+        experiment = XOR(simulator="numpy")
+        networks = Generator.create_from_experiment(
+            experiment=experiment, configuration=Configuration()
+        ).generate_networks(10)
+        expected = experiment.fitness(networks)
+
+        # about one network with its patterns per chunk
+        experiment.set_simulation_chunks(0.04)
+        replicas = [n for n in networks for _ in experiment.get_data()]
+        chunks = experiment._get_chunks(replicas)
+
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual((0, len(replicas)), (chunks[0][0], chunks[-1][1]))
+        self.assertEqual(expected, experiment.fitness(networks))
+
+    def test_standalone(self):
+        random.seed(5)
+        experiment = XOR(poisson=False)
+        networks = Generator.create_from_experiment(
+            experiment=experiment, configuration=Configuration()
+        ).generate_networks(10)
+        expected = experiment.fitness(networks)
+
+        # next generation with other weights, but the same capacities
+        next_networks = [n.clone() for n in networks]
+        for network in next_networks:
+            for synapse in network.synapses:
+                synapse.weight = synapse.weight * 10
+        next_expected = experiment.fitness(next_networks)
+        self.assertNotEqual(expected, next_expected)
+
+        with tempfile.TemporaryDirectory() as directory:
+            experiment.set_standalone(directory)
+            self.assertEqual(expected, experiment.fitness(networks))
+            # one project for the capacities of the population
+            projects = os.listdir(directory)
+            self.assertEqual(1, len(projects))
+            binary = os.path.join(directory, projects[0], "main")
+            built = os.path.getmtime(binary)
+
+            self.assertEqual(next_expected, experiment.fitness(next_networks))
+            # the compiled project runs again without a new build
+            self.assertEqual(projects, os.listdir(directory))
+            self.assertEqual(built, os.path.getmtime(binary))
+
+    def test_standalone_requires_brian(self):
+        experiment = XOR(simulator="numpy")
+
+        with self.assertRaises(RuntimeError):
+            experiment.set_standalone("standalone")
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from network.decoder.brian.binary import BinaryBrianDecoder
 
 
@@ -13,3 +15,27 @@ class TestBinaryBrianDecoder(unittest.TestCase):
         self.assertEqual(25, decoder.get_absolute_distance(75, False))
         self.assertEqual(75, decoder.get_absolute_distance(125, False))
         self.assertEqual(25, decoder.get_absolute_distance(125, True))
+
+    def test_values_from_counts(self):
+        decoder = BinaryBrianDecoder(boundary=75, simulated_seconds=2)
+
+        values = decoder.get_values(np.array([[100], [200]]))
+
+        self.assertEqual([(False, 50.0), (True, 100.0)], values)
+
+    def test_decode_batch(self):
+        decoder = BinaryBrianDecoder(boundary=75)
+
+        batch = decoder.decode_batch(np.array([[50], [75], [100]]))
+
+        self.assertEqual([False, False, True], list(batch.values))
+        self.assertEqual([False, True, False], list(batch.ties))
+        self.assertEqual([50, 75, 100], list(batch.rates[:, 0]))
+
+    def test_decided(self):
+        decoder = BinaryBrianDecoder(boundary=75)
+        counts = np.array([[76], [75], [60], [50]])
+
+        self.assertEqual(
+            [True, False, False, True], list(decoder.get_decided(counts, 25))
+        )
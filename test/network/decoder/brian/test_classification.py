@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from network.decoder.brian.classification import ClassificationBrianDecoder
 
 
@@ -20,3 +22,41 @@ class TestClassificationBrianDecoder(unittest.TestCase):
         self.assertEqual(-1, decoder.get_best_class([0, 1, 2, 2]))
         self.assertEqual(-1, decoder.get_best_class([0, 0, 0, 0]))
         self.assertEqual(3, decoder.get_best_class([1, 1, 1, 2]))
+
+    def test_best_classes_same_as_best_class(self):
+        decoder = ClassificationBrianDecoder(classes=4)
+        counts = np.random.RandomState(1).randint(0, 4, size=(200, 4))
+
+        classes = decoder.get_best_classes(counts)
+
+        self.assertEqual(
+            [decoder.get_best_class(list(c)) for c in counts], list(classes)
+        )
+
+    def test_values_from_counts(self):
+        decoder = ClassificationBrianDecoder(classes=2)
+
+        values = decoder.get_values(np.array([[3, 1], [2, 2], [0, 5]]))
+
+        self.assertEqual([(0, [3, 1]), (-1, [2, 2]), (1, [0, 5])], values)
+        self.assertEqual([], decoder.get_values(np.zeros((0, 2), dtype=int)))
+
+    def test_decode_batch(self):
+        decoder = ClassificationBrianDecoder(classes=3, simulated_seconds=2)
+
+        batch = decoder.decode_batch(
+            np.array([[4, 2, 0], [2, 2, 0], [0, 0, 0]])
+        )
+
+        self.assertEqual([0, -1, -1], list(batch.values))
+        self.assertEqual([False, True, False], list(batch.ties))
+        self.assertEqual([2, 1, 0], list(batch.rates[:, 0]))
+
+    def test_decided(self):
+        decoder = ClassificationBrianDecoder(classes=3)
+        counts = np.array([[10, 4, 0], [10, 5, 0], [0, 0, 0]])
+
+        self.assertEqual(
+            [True, False, False], list(decoder.get_decided(counts, 5))
+        )
+        self.assertTrue(decoder.get_decided(counts, 0).all())
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+from brian2 import ms, second
+
+from network.encoder.brian.binary import BinaryBrianEncoder
+
+
+class TestBinaryBrianEncoder(unittest.TestCase):
+    def test_spike_times(self):
+        encoder = BinaryBrianEncoder(
+            number_of_neurons=2, true_rate=4, false_rate=2
+        )
+
+        indices, times = encoder.get_spike_times([(True, False)])
+
+        self.assertEqual([0, 0, 0, 0, 1, 1], list(indices))
+        self.assertEqual([0, 0.25, 0.5, 0.75, 0, 0.5], list(times))
+
+    def test_spike_times_multiple_patterns(self):
+        encoder = BinaryBrianEncoder(
+            number_of_neurons=2, true_rate=4, false_rate=2
+        )
+
+        indices, _ = encoder.get_spike_times([(True, False), (False, True)])
+
+        # each pattern has its own spike generators
+        self.assertEqual([4, 2, 2, 4], list(np.bincount(indices)))
+
+    def test_simulation_time(self):
+        encoder = BinaryBrianEncoder(
+            number_of_neurons=1,
+            true_rate=100,
+            false_rate=50,
+            simulation_time=500 * ms,
+        )
+
+        indices, times = encoder.get_spike_times([(True,)])
+
+        self.assertEqual(50, len(indices))
+        self.assertLess(max(times), 0.5)
+
+    def test_spike_generator(self):
+        encoder = BinaryBrianEncoder(number_of_neurons=2)
+
+        generator = encoder.get_spike_generator([(True, False), (True, True)])
+
+        self.assertEqual(4, generator.N)
+        self.assertEqual(100 + 50 + 100 + 100, len(generator.spike_time[:]))
+        self.assertEqual(second, generator.spike_time.unit)
+
+    def test_padded_spike_generator(self):
+        encoder = BinaryBrianEncoder(number_of_neurons=2)
+
+        generator = encoder.get_padded_spike_generator(
+            [(True, False)], size=8, name="generator"
+        )
+
+        self.assertEqual(8, generator.N)
+        self.assertEqual("generator", generator.name)
+        self.assertEqual(100 + 50, len(generator.spike_time[:]))
+        self.assertLess(max(generator.neuron_index[:]), 2)
+
+    def test_cached_spike_times(self):
+        encoder = BinaryBrianEncoder(number_of_neurons=2)
+        data = [(True, False), (False, False), (True, False)]
+
+        indices, times = encoder.get_spike_times(data)
+        expected_indices, expected_times = encoder._calculate_spike_times(data)
+
+        self.assertEqual(list(expected_indices), list(indices))
+        self.assertEqual(list(expected_times), list(times))
+        # the same data set is only concatenated once
+        self.assertIs(indices, encoder.get_spike_times(data)[0])
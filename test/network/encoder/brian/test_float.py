@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from network.encoder.brian.float import FloatBrianEncoder
 
 
@@ -24,3 +26,51 @@ class TestFloatBrianEncoder(unittest.TestCase):
         self.assertEqual(110, len(indices))
         self.assertEqual(110, list(indices).count(0))
         self.assertEqual(110, len(times))
+
+    def test_rate_zero(self):
+        encoder = FloatBrianEncoder(number_of_neurons=2, poisson=False)
+        indices, times = encoder._convert_rate_to_brian([0, 1])
+        self.assertEqual([1], list(indices))
+        self.assertEqual([0.5], list(times))
+
+    def test_spike_times_multiple_patterns(self):
+        encoder = FloatBrianEncoder(number_of_neurons=2, poisson=False)
+        data = [(0.1, 0), (1, 0.5)]
+
+        indices, times = encoder.get_spike_times(data)
+
+        self.assertEqual(20 + 10 + 110 + 60, len(indices))
+        self.assertEqual([20, 10, 110, 60], list(np.bincount(indices)))
+        self.assertTrue(all(0 < t < 1 for t in times))
+
+    def test_precompute(self):
+        encoder = FloatBrianEncoder(number_of_neurons=2, poisson=False)
+        data = [(0.1, 0), (1, 0.5)]
+
+        encoder.precompute(data)
+        indices, times = encoder.get_spike_times(data)
+
+        self.assertEqual(2, len(encoder._pattern_spikes))
+        self.assertEqual([20, 10, 110, 60], list(np.bincount(indices)))
+        # patterns of other data sets are taken from the cache
+        reversed_indices, _ = encoder.get_spike_times(data[::-1])
+        self.assertEqual(
+            [110, 60, 20, 10], list(np.bincount(reversed_indices))
+        )
+
+    def test_precompute_poisson(self):
+        encoder = FloatBrianEncoder(number_of_neurons=2, poisson=True)
+
+        encoder.precompute([(0.1, 0), (1, 0.5)])
+
+        self.assertEqual(0, len(encoder._pattern_spikes))
+
+    def test_padded_poisson_generator(self):
+        encoder = FloatBrianEncoder(number_of_neurons=2, poisson=True)
+
+        generator = encoder.get_padded_spike_generator(
+            [(0.1, 0)], size=4, name="generator"
+        )
+
+        self.assertEqual(4, generator.N)
+        self.assertEqual([20, 10, 0, 0], list(generator.rates_[:]))
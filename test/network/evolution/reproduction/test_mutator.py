@@ -103,6 +103,23 @@ class TestMutator(unittest.TestCase):
 
         self.assertEqual(15, synapse.weight)
 
+    def test_apply_mutations_keeps_parent(self):
+        random.seed(0)
+        net = Network([Neuron(0, threshold=1)], [Neuron(1, threshold=1)])
+        config = Configuration(
+            {"number_of_mutations": {"type": "fixed", "value": 20}}
+        )
+        mutator = Mutator(configuration=config)
+        for _ in range(5):
+            mutator.mutate_network(net, "add_node")
+            mutator.mutate_network(net, "add_edge")
+        original = net.clone()
+
+        for _ in range(20):
+            mutator.apply_mutations(net)
+
+        self.assertEqual(0, net.distance(original))
+
     def test_mutations_should_never_be_able_to_strip(self):
         """
         Mutations should never produce a network, with useless nodes
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from network.evolution.epoch_log import EpochLog, is_epoch_log
+
+
+class TestEpochLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "stats.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_read(self):
+        log = EpochLog(self.filename)
+        log.append([{"took": 1}])
+        log.append([{"took": 2}, {"took": 3}])
+
+        self.assertEqual(3, len(log))
+        self.assertEqual({"took": 2}, log.read(1))
+        self.assertEqual([1, 2, 3], [e["took"] for e in log.read_all()])
+
+    def test_only_appends(self):
+        log = EpochLog(self.filename)
+        log.append([{"took": 1}])
+        with open(self.filename) as f:
+            first_line = f.readline()
+
+        log.append([{"took": 2}])
+
+        with open(self.filename) as f:
+            self.assertEqual(first_line, f.readline())
+
+    def test_open_existing(self):
+        EpochLog(self.filename).append([{"took": 1}, {"took": 2}])
+
+        log = EpochLog(self.filename)
+        log.append([{"took": 3}])
+
+        self.assertEqual(3, len(log))
+        self.assertEqual({"took": 3}, log.read(2))
+
+    def test_remove_incomplete_epoch(self):
+        EpochLog(self.filename).append([{"took": 1}])
+        with open(self.filename, "a") as f:
+            f.write('{"took": 2, "popul')
+
+        log = EpochLog(self.filename)
+        log.append([{"took": 3}])
+
+        self.assertEqual([1, 3], [e["took"] for e in log.read_all()])
+
+    def test_is_epoch_log(self):
+        EpochLog(self.filename).append([{"took": 1}])
+        json_file = os.path.join(self.directory.name, "stats.json")
+        with open(json_file, "w") as f:
+            json.dump({"data": [{"took": 1}]}, f)
+
+        self.assertTrue(is_epoch_log(self.filename))
+        self.assertFalse(is_epoch_log(json_file))
+
+    def test_is_epoch_log_reads_prefix(self):
+        json_file = os.path.join(self.directory.name, "stats.json")
+        with open(json_file, "w") as f:
+            json.dump({"data": [{"took": i} for i in range(10000)]}, f)
+        open(self.filename, "w").close()
+
+        with patch("json.loads") as loads:
+            self.assertFalse(is_epoch_log(json_file))
+            self.assertTrue(is_epoch_log(self.filename))
+        loads.assert_not_called()
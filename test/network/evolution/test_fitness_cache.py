@@ -0,0 +1,66 @@
+import unittest
+
+from network.evolution.fitness_cache import FitnessCache
+
+
+class TestFitnessCache(unittest.TestCase):
+    def test_get_set(self):
+        cache = FitnessCache()
+        cache["a"] = 1
+        cache["b"] = 2
+
+        self.assertEqual(1, cache["a"])
+        self.assertIn("b", cache)
+        self.assertNotIn("c", cache)
+        self.assertEqual(2, len(cache))
+
+    def test_max_entries(self):
+        cache = FitnessCache(max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        # use a, so b is the least recently used
+        _ = cache["a"]
+        cache["c"] = 3
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_max_bytes(self):
+        cache = FitnessCache()
+        cache["a"] = 1
+        entry_size = cache.get_memory_size()
+
+        cache = FitnessCache(max_bytes=entry_size * 3)
+        for i in range(10):
+            cache[f"{i}"] = float(i)
+
+        self.assertEqual(3, len(cache))
+        self.assertLessEqual(cache.get_memory_size(), entry_size * 3)
+
+    def test_memory_size_overwrite(self):
+        cache = FitnessCache()
+        cache["a"] = 1.0
+        size = cache.get_memory_size()
+        cache["a"] = 2.0
+
+        self.assertEqual(size, cache.get_memory_size())
+
+    def test_pinned(self):
+        cache = FitnessCache(max_entries=2)
+        cache["a"] = 1
+        cache.pin(["a"])
+        cache["b"] = 2
+        cache["c"] = 3
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_all_pinned(self):
+        cache = FitnessCache(max_entries=1)
+        cache.pin(["a", "b"])
+        cache["a"] = 1
+        cache["b"] = 2
+
+        self.assertEqual(2, len(cache))
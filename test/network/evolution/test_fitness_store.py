@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from multiprocessing import Pool
+
+from network.evolution.fitness_store import FitnessStore
+
+
+def put_scores(args):
+    path, offset = args
+    store = FitnessStore(path, namespace="test")
+    for i in range(20):
+        store.put({f"{offset}-{i}": float(i)})
+    return len(store.get([f"{offset}-{i}" for i in range(20)]))
+
+
+class TestFitnessStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "fitness.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_get(self):
+        store = FitnessStore(self.path, namespace="test")
+        store.put({"a": 1, "b": 2.5})
+
+        self.assertEqual({"a": 1, "b": 2.5}, store.get(["a", "b", "c"]))
+        self.assertEqual(2, len(store))
+
+    def test_persistent(self):
+        store = FitnessStore(self.path, namespace="test")
+        store.put({"a": 1})
+        store.close()
+
+        other = FitnessStore(self.path, namespace="test")
+        self.assertEqual({"a": 1}, other.get(["a"]))
+
+    def test_namespace(self):
+        store = FitnessStore(self.path, namespace="test")
+        other = FitnessStore(self.path, namespace="other")
+        store.put({"a": 1})
+
+        self.assertEqual({}, other.get(["a"]))
+
+    def test_eviction(self):
+        store = FitnessStore(self.path, namespace="test", max_entries=2)
+        store.put({"a": 1})
+        store.put({"b": 2})
+        # use a, so b is the least recently used
+        store.get(["a"])
+        store.put({"c": 3})
+
+        self.assertEqual({"a": 1, "c": 3}, store.get(["a", "b", "c"]))
+
+    def test_multiple_processes(self):
+        FitnessStore(self.path, namespace="test")
+        with Pool(processes=4) as pool:
+            found = pool.map(put_scores, [(self.path, i) for i in range(4)])
+
+        self.assertEqual([20, 20, 20, 20], found)
+        self.assertEqual(80, len(FitnessStore(self.path, namespace="test")))
@@ -1,11 +1,20 @@
+import os
+import random
 import re
+import tempfile
 import unittest
 from io import StringIO
+from typing import Optional
 from unittest.mock import patch
 
 from experiment.dummy import Dummy
+from network.compact_network import get_fingerprint
 from network.evolution.framework import Framework
+from network.evolution.origin import Origin, ReproductionType
 from network.evolution.stats import Stats
+from network.network import Network
+from network.neuron import Neuron
+from network.synapse import Synapse
 from utility.configuration import Configuration
 
 
@@ -32,10 +41,37 @@ def dummy_experiment_epoch(parameters: dict):
     return networks
 
 
+def get_distinct_networks(amount: int):
+    """
+    Networks with a different threshold on the output neuron
+    :param amount:
+    :return:
+    """
+    return [
+        Network([Neuron(0)], [Neuron(1, threshold=i)]) for i in range(amount)
+    ]
+
+
 class MockException(RuntimeError):
     pass
 
 
+class StochasticDummy(Dummy):
+    """
+    Dummy experiment with random fitness scores, which depend on the seed
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.random = random.Random()
+
+    def single_fitness(self, network: Network):
+        return self.random.random()
+
+    def set_seed(self, seed: Optional[int] = None):
+        self.random.seed(seed)
+
+
 class TestFramework(unittest.TestCase):
     def test_size_population_after_epoch(self):
         parameters = {
@@ -83,6 +119,17 @@ class TestFramework(unittest.TestCase):
         new_population = dummy_experiment_epoch(parameters)
         self.assertEqual(473, len(new_population))
 
+    def test_elites_by_index(self):
+        f = get_dummy_framework(
+            {"population_size": 3, "num_best": 1, "random_factor": 0}
+        )
+        network, other = get_distinct_networks(2)
+
+        networks, operations = f.do_epoch([network, other, network], [1, 0, 5])
+
+        self.assertIs(network, networks[0])
+        self.assertEqual(Origin(ReproductionType.Same, [2]), operations[0])
+
     def test_simple_evolution(self):
         # test the correct functioning of the evolution
         parameters = {
@@ -134,7 +181,8 @@ class TestFramework(unittest.TestCase):
                 r"^Epoch 1\/1 - "
                 r"Best fitness: [\d.]* - "
                 r"Average fitness: [\d.]* - "
-                r"Took [\d.]*s$"
+                r"Took [\d.]*s - "
+                r"Cache: \d+ networks \([\d.]* MB\), \d+ hits, \d+ misses$"
             )
             match = re.match(
                 regex,
@@ -142,6 +190,24 @@ class TestFramework(unittest.TestCase):
             )
             self.assertIsNotNone(match)
 
+    def test_evolution_print_timings(self):
+        parameters = {
+            "population_size": 10,
+            "num_generations": 2,
+            "print_status": True,
+            "print_timings": True,
+        }
+
+        f = get_dummy_framework(parameters)
+
+        with patch("sys.stdout", new=StringIO()) as fake_out:
+            stats = f.evolution()
+
+        lines = fake_out.getvalue().splitlines()
+        self.assertRegex(lines[0], r" - Timings: generation [\d.]*s, ")
+        self.assertRegex(lines[1], r"reproduction [\d.]*s")
+        self.assertIn("fitness", stats.get_epoch(1)["timings"])
+
     def test_evolution_continue(self):
         parameters = {
             "population_size": 20,
@@ -178,6 +244,47 @@ class TestFramework(unittest.TestCase):
 
         self.assertEqual(True, saved_stats.compare(original_stats))
 
+    def test_save_stat_regularly_resumed(self):
+        parameters = {
+            "population_size": 20,
+            "num_generations": 3,
+            "print_status": False,
+            "save_stat_regularly": True,
+        }
+        f = get_dummy_framework(parameters)
+        log_file = f.get_temporary_file()
+        f.evolution()
+
+        parameters["num_generations"] = 5
+        resumed = get_dummy_framework(parameters)
+        stats = resumed.evolution(Stats.from_file(log_file))
+
+        self.assertEqual(log_file, resumed.get_temporary_file())
+        with open(log_file) as log:
+            self.assertEqual(5, len(log.readlines()))
+        self.assertTrue(Stats.from_file(log_file).compare(stats))
+
+    def test_stats_retention(self):
+        parameters = {
+            "population_size": 20,
+            "num_generations": 5,
+            "print_status": False,
+            "stats_keep_last": 1,
+            "stats_keep_every": 2,
+        }
+        f = get_dummy_framework(parameters)
+
+        stats = f.evolution()
+        saved_stats = Stats.from_file(f.get_temporary_file())
+
+        self.assertEqual(
+            [True, False, True, False, True],
+            ["population" in epoch for epoch in stats.data],
+        )
+        self.assertTrue(saved_stats.compare(stats))
+        self.assertTrue(saved_stats.is_same_populations(stats))
+        os.remove(f.get_temporary_file())
+
     def test_save_stat_in_case_of_error(self):
         executions_left = 3
         parameters = {
@@ -244,10 +351,10 @@ class TestFramework(unittest.TestCase):
         }
 
         f = get_dummy_framework(parameters)
-        population = f.generator.generate_networks(f.population_size)
+        population = get_distinct_networks(5)
 
-        f.fitness_cache[population[0]] = 1000
-        f.fitness_cache[population[2]] = 2000
+        f.fitness_cache[get_fingerprint(population[0])] = 1000
+        f.fitness_cache[get_fingerprint(population[2])] = 2000
 
         fitness = f.evaluate(population)
 
@@ -255,6 +362,155 @@ class TestFramework(unittest.TestCase):
         mock.assert_called_once_with(uncached)
         self.assertEqual([1000, 1, 2000, 3, 4], fitness)
 
+    @patch.object(Dummy, "fitness", return_value=[1, 2])
+    def test_cache_same_structure(self, mock):
+        f = get_dummy_framework({"cache_evolution": True})
+        n1, n2 = get_distinct_networks(2)
+        population = [n1, n2, n1.clone(), n2.clone(), n1]
+
+        fitness = f.evaluate(population)
+
+        mock.assert_called_once_with([n1, n2])
+        self.assertEqual([1, 2, 1, 2, 1], fitness)
+        self.assertEqual(3, f.cache_hits)
+        self.assertEqual(2, f.cache_misses)
+
+    def test_cache_size_penalty(self):
+        f = get_dummy_framework({"cache_evolution": True})
+        network = Network([Neuron(0)], [Neuron(1)], [Neuron(2)])
+        network.add_synapse(Synapse(0, 1))
+        larger = network.clone()
+        larger.add_synapse(Synapse(0, 2))
+        self.assertEqual(get_fingerprint(network), get_fingerprint(larger))
+
+        fitness = f.evaluate([network, larger])
+
+        self.assertEqual([2, 3], fitness)
+        self.assertEqual(2, f.cache_misses)
+
+    @patch.object(Dummy, "fitness_depends_on_structure", return_value=False)
+    @patch.object(Dummy, "fitness", return_value=[2])
+    def test_cache_ignores_stripped(self, mock, _):
+        f = get_dummy_framework({"cache_evolution": True})
+        network = Network([Neuron(0)], [Neuron(1)], [Neuron(2)])
+        network.add_synapse(Synapse(0, 1))
+        larger = network.clone()
+        larger.add_synapse(Synapse(0, 2))
+
+        fitness = f.evaluate([network, larger])
+
+        mock.assert_called_once_with([network])
+        self.assertEqual([2, 2], fitness)
+
+    def test_cache_counter(self):
+        f = get_dummy_framework({"cache_evolution": True})
+        population = get_distinct_networks(3)
+
+        f.evaluate(population)
+        f.evaluate(population)
+
+        self.assertEqual(3, f.cache_hits)
+        self.assertEqual(3, f.cache_misses)
+
+    def test_cache_not_shared_between_instances(self):
+        f1 = get_dummy_framework({"cache_evolution": True})
+        f2 = get_dummy_framework({"cache_evolution": True})
+
+        f1.evaluate(get_distinct_networks(3))
+
+        self.assertEqual(0, len(f2.fitness_cache))
+
+    def test_cache_keeps_elites(self):
+        p = {"cache_evolution": True, "cache_evolution_size": 2, "num_best": 2}
+        f = get_dummy_framework(p)
+        population = get_distinct_networks(5)
+
+        with patch.object(Dummy, "fitness", return_value=[5, 1, 2, 4, 3]):
+            f.evaluate(population)
+
+        self.assertEqual(2, len(f.fitness_cache))
+        self.assertIn(get_fingerprint(population[0]), f.fitness_cache)
+        self.assertIn(get_fingerprint(population[3]), f.fitness_cache)
+
+    def test_warm_cache(self):
+        f = get_dummy_framework({"cache_evolution": True})
+        networks = get_distinct_networks(2)
+        stats = Stats()
+        stats.add_epoch(networks, [1, 2])
+        stats.add_epoch([networks[1], networks[1]], [3, 3])
+
+        f.warm_cache(stats)
+
+        self.assertEqual(2, len(f.fitness_cache))
+        self.assertEqual(1, f.fitness_cache[get_fingerprint(networks[0])])
+        self.assertEqual(3, f.fitness_cache[get_fingerprint(networks[1])])
+
+    def test_fitness_store_between_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            p = {
+                "cache_evolution": True,
+                "fitness_store_file": os.path.join(directory, "fitness"),
+                "fitness_store_stochastic": True,
+            }
+            population = get_distinct_networks(3)
+            fitness = get_dummy_framework(p).evaluate(population)
+
+            f = get_dummy_framework(p)
+            with patch.object(Dummy, "fitness") as mock:
+                self.assertEqual(fitness, f.evaluate(population))
+            mock.assert_not_called()
+            self.assertEqual(3, f.cache_hits)
+            f.fitness_store.close()
+
+    def test_fitness_store_size_penalty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            p = {
+                "cache_evolution": True,
+                "fitness_store_file": os.path.join(directory, "fitness"),
+                "fitness_store_stochastic": True,
+            }
+            network = Network([Neuron(0)], [Neuron(1)], [Neuron(2)])
+            network.add_synapse(Synapse(0, 1))
+            larger = network.clone()
+            larger.add_synapse(Synapse(0, 2))
+            get_dummy_framework(p).evaluate([network])
+
+            f = get_dummy_framework(p)
+            fitness = f.evaluate([network, larger])
+
+            self.assertEqual([2, 3], fitness)
+            self.assertEqual(1, f.cache_hits)
+            f.fitness_store.close()
+
+    def test_fitness_store_only_deterministic(self):
+        p = {"cache_evolution": True, "fitness_store_file": "fitness"}
+        f = get_dummy_framework(p)
+        self.assertIsNone(f.fitness_store)
+
+    def test_fitness_store_namespace(self):
+        f1 = get_dummy_framework({"experiment": "xor", "seed": 1})
+        f2 = get_dummy_framework({"experiment": "xor", "seed": 2})
+        f3 = get_dummy_framework({"experiment": "dummy", "seed": 1})
+
+        self.assertNotEqual(
+            f1.get_fitness_store_namespace(), f2.get_fitness_store_namespace()
+        )
+        self.assertNotEqual(
+            f1.get_fitness_store_namespace(), f3.get_fitness_store_namespace()
+        )
+
+        with patch.object(Dummy, "is_deterministic", return_value=True):
+            self.assertEqual(
+                f1.get_fitness_store_namespace(),
+                f2.get_fitness_store_namespace(),
+            )
+
+        namespace = f1.get_fitness_store_namespace()
+        with patch.object(
+            Dummy, "fitness_depends_on_structure", return_value=False
+        ):
+            self.assertNotEqual(namespace, f1.get_fitness_store_namespace())
+
     def test_seed_should_reproduce(self):
         parameters = {
             "seed": 123,
@@ -328,3 +584,60 @@ class TestFramework(unittest.TestCase):
         s2 = f2.evolution()
 
         self.assertTrue(s1.is_same_populations(s2))
+
+    def test_parallel_evaluation_same_as_serial(self):
+        p = {"seed": 1, "population_size": 20}
+        serial = get_dummy_framework(p)
+        parallel = get_dummy_framework({**p, "evaluation_workers": 3})
+        population = serial.generator.generate_networks(20)
+
+        self.assertEqual(
+            serial.evaluate(population), parallel.evaluate(population)
+        )
+        parallel.close_pool()
+
+    def test_parallel_stochastic_same_as_serial(self):
+        p = {"seed": 1, "cache_evolution": False, "evaluation_chunk_size": 3}
+        serial = Framework(StochasticDummy(), Configuration(config=p))
+        parallel = Framework(
+            StochasticDummy(),
+            Configuration(config={**p, "evaluation_workers": 2}),
+        )
+        population = serial.generator.generate_networks(10)
+
+        for _ in range(2):
+            fitness = serial.evaluate(population)
+            self.assertEqual(fitness, parallel.evaluate(population))
+        self.assertEqual(10, len(set(fitness)))
+        parallel.close_pool()
+
+    def test_parallel_keeps_workers(self):
+        p = {
+            "seed": 1,
+            "print_status": False,
+            "population_size": 10,
+            "num_generations": 2,
+            "evaluation_workers": 2,
+        }
+        f = get_dummy_framework(p)
+        population = f.generator.generate_networks(10)
+
+        f.evaluate(population)
+        pool = f.get_pool()
+        f.evaluate(f.generator.generate_networks(10))
+        self.assertIs(pool, f.get_pool())
+
+        f.evolution()
+        self.assertIsNone(f._pool)
+
+    def test_parallel_evolution_same_as_serial(self):
+        p = {
+            "seed": 1,
+            "print_status": False,
+            "population_size": 20,
+            "num_generations": 3,
+        }
+        s1 = get_dummy_framework(p).evolution()
+        s2 = get_dummy_framework({**p, "evaluation_workers": 2}).evolution()
+
+        self.assertTrue(s1.is_same_populations(s2))
@@ -0,0 +1,149 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from network.evolution.lineage import LineageIndex
+from network.evolution.origin import Origin, ReproductionType
+from network.evolution.stats import Stats
+from utility.list_operation import count_occurrences, flat_list
+
+
+def get_lineage():
+    """
+    Lineage of three epochs with two networks
+    """
+    lineage = LineageIndex()
+    lineage.add_epoch([], 2)
+    lineage.add_epoch(
+        [
+            Origin(ReproductionType.Mutation, [1]),
+            Origin(ReproductionType.Random, []),
+        ],
+        2,
+    )
+    lineage.add_epoch(
+        [
+            Origin(ReproductionType.Same, [0]),
+            Origin(ReproductionType.Crossover, [0, 1]),
+        ],
+        2,
+    )
+    return lineage
+
+
+class TestLineageIndex(unittest.TestCase):
+    def test_parents(self):
+        lineage = get_lineage()
+
+        self.assertEqual(3, len(lineage))
+        self.assertEqual([-1, -1], lineage.get_parents(0).tolist())
+        self.assertEqual([1, -1], lineage.get_parents(1).tolist())
+        self.assertEqual([0, 0], lineage.get_parents(2).tolist())
+        self.assertEqual([-1, -1], lineage.get_types(0).tolist())
+
+    def test_ancestry(self):
+        lineage = get_lineage()
+
+        ancestry = lineage.get_ancestry(2)
+
+        self.assertEqual([[1, 0], [0, 1]], ancestry[2].tolist())
+        self.assertEqual([[1, 0], [1, 1]], ancestry[1].tolist())
+        self.assertEqual([[0, 1], [0, 1]], ancestry[0].tolist())
+        self.assertEqual(
+            [[0, 1]], lineage.get_ancestry(2, networks=[0])[0].tolist()
+        )
+
+    def test_type_histogram(self):
+        lineage = get_lineage()
+
+        histogram = lineage.get_type_histogram(2)
+
+        types = lineage.reproduction_types
+        self.assertEqual(
+            {ReproductionType.Same: 1, ReproductionType.Mutation: 1},
+            {t: c for t, c in zip(types, histogram[0]) if c > 0},
+        )
+        self.assertEqual(
+            {
+                ReproductionType.Crossover: 1,
+                ReproductionType.Mutation: 1,
+                ReproductionType.Random: 1,
+            },
+            {t: c for t, c in zip(types, histogram[1]) if c > 0},
+        )
+
+    def test_type_histogram_same_as_history(self):
+        random.seed(3)
+        stats = Stats()
+        types = list(ReproductionType)
+        for epoch in range(8):
+            operations = [
+                Origin(random.choice(types), [])
+                if epoch == 0
+                else Origin(
+                    random.choice(types),
+                    random.sample(range(6), random.randint(0, 2)),
+                )
+                for _ in range(6)
+            ]
+            stats.add_epoch([0] * 6, [0] * 6, operations)
+
+        histogram = stats.get_lineage().get_type_histogram(7)
+
+        for index in range(6):
+            history = flat_list(stats.get_origin(index, 7))
+            expected = count_occurrences(
+                [o.reproduction_type for o in history]
+            )
+            self.assertEqual(expected, stats.get_origin_distribution(index))
+            self.assertEqual(sum(expected.values()), histogram[index].sum())
+
+    def test_edge_list(self):
+        lineage = get_lineage()
+
+        edges = lineage.get_edge_list()
+
+        np.testing.assert_array_equal(
+            [
+                [0, 1, 1, 0, 0],
+                [1, 0, 2, 0, 2],
+                [1, 0, 2, 1, 3],
+                [1, 1, 2, 1, 3],
+            ],
+            edges,
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "lineage.csv")
+            lineage.edge_list_to_file(filename)
+            with open(filename) as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(4, len(rows))
+        self.assertEqual(
+            {
+                "parent_epoch": "1",
+                "parent_index": "0",
+                "epoch": "2",
+                "index": "1",
+                "reproduction_type": "crossover",
+            },
+            rows[2],
+        )
+
+    def test_stats_lineage_is_updated(self):
+        stats = Stats()
+        stats.add_epoch([0], [0], [Origin(ReproductionType.Random, [])])
+        self.assertEqual(1, len(stats.get_lineage()))
+
+        stats.add_epoch([0], [0], [Origin(ReproductionType.Mutation, [0])])
+
+        self.assertEqual(2, len(stats.get_lineage()))
+        self.assertEqual([0], stats.get_lineage().get_parents(1).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
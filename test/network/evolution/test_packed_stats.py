@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from network.evolution.origin import Origin, ReproductionType
+from network.evolution.packed_stats import (
+    is_packed_stats,
+    read_packed_stats,
+    write_packed_stats,
+)
+from network.evolution.stats import Stats
+from network.network import Network
+from network.neuron import Neuron
+from network.synapse import Synapse
+from utility.timing import timings
+
+
+def get_network(threshold=1, weight=0.5):
+    """
+    Get a network with synapses and parameters
+    """
+    network = Network(
+        [Neuron(0), Neuron(1)],
+        [Neuron(2, threshold=threshold, leak=2)],
+        [Neuron(3, threshold=threshold)],
+    )
+    network.add_synapse(Synapse(0, 3, weight=weight, delay=1))
+    network.add_synapse(Synapse(1, 3, weight=weight, exciting=True))
+    network.add_synapse(Synapse(3, 2, weight=weight, delay=2))
+    return network
+
+
+class TestPackedStats(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "stats.npz")
+
+        timings.reset()
+        self.stats = Stats()
+        timings.add("simulation", 2)
+        self.stats.add_epoch(
+            [get_network(), get_network(threshold=2.5)],
+            [1, 2],
+            operations=[
+                Origin(ReproductionType.Random, []),
+                Origin(ReproductionType.Random, []),
+            ],
+        )
+        timings.add("selection", 1)
+        self.stats.add_epoch(
+            [get_network(weight=3), Network([Neuron(0)], [Neuron(1)])],
+            [4, 3],
+            operations=[
+                Origin(ReproductionType.Crossover, [0, 1]),
+                Origin(ReproductionType.Mutation, [1]),
+            ],
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        self.stats.to_file(self.filename)
+        imported = Stats.from_file(self.filename)
+
+        self.assertTrue(self.stats.compare(imported))
+        self.assertTrue(self.stats.is_same_populations(imported))
+        self.assertEqual([4, 3], imported.get_epoch(1)["fitness_scores"])
+        self.assertEqual(
+            Origin(ReproductionType.Crossover, [0, 1]),
+            imported.get_epoch(1)["operations"][0],
+        )
+        self.assertEqual({"selection": 1}, imported.get_epoch(1)["timings"])
+
+    def test_round_trip_keeps_parameters(self):
+        self.stats.to_file(self.filename)
+        imported = Stats.from_file(self.filename)
+
+        for expected, network in zip(
+            self.stats.get_epoch(0)["population"],
+            imported.get_epoch(0)["population"],
+        ):
+            self.assertEqual(
+                expected.to_json_object(), network.to_json_object()
+            )
+        # int and float thresholds in the same column keep their type
+        neuron = imported.get_epoch(0)["population"][0].get_all_neurons()[3]
+        self.assertIsInstance(neuron.parameters["threshold"], int)
+
+    def test_population_is_loaded_lazily(self):
+        self.stats.to_file(self.filename)
+        imported = Stats.from_file(self.filename)
+
+        imported.get_epoch_information(1, 2)
+        imported.get_total_time_took()
+        imported.get_timings()
+        imported.get_origin(0, epoch=1)
+        self.assertTrue(imported.compare(self.stats))
+        self.assertFalse(any(e.is_population_loaded() for e in imported.data))
+
+        best_network, best_fitness = imported.get_best_network_alltime()
+
+        self.assertEqual(4, best_fitness)
+        self.assertEqual(
+            get_network(weight=3).to_json_object(),
+            best_network.to_json_object(),
+        )
+        self.assertFalse(any(e.is_population_loaded() for e in imported.data))
+
+    def test_is_packed_stats(self):
+        json_filename = os.path.join(self.directory.name, "stats.json")
+        self.stats.to_file(json_filename)
+        self.stats.to_file(self.filename)
+
+        self.assertFalse(is_packed_stats(json_filename))
+        self.assertTrue(is_packed_stats(self.filename))
+
+    def test_networks_are_stored_once(self):
+        elite = self.stats.get_epoch(1)["population"][0]
+        self.stats.add_epoch([elite, elite.clone()], [4, 4])
+        self.stats.to_file(self.filename)
+
+        imported = Stats.from_file(self.filename)
+        population = imported.get_epoch(2)["population"]
+
+        self.assertIs(imported.get_epoch(1)["population"][0], population[0])
+        self.assertIs(population[0], population[1])
+        with np.load(self.filename) as data:
+            self.assertEqual(4, len(data["fingerprints"]))
+
+    def test_empty(self):
+        write_packed_stats(self.filename, [], {})
+
+        epochs, networks = read_packed_stats(self.filename)
+
+        self.assertEqual([], epochs)
+        self.assertEqual({}, networks)
+
+
+if __name__ == "__main__":
+    unittest.main()
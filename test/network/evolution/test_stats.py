@@ -1,11 +1,16 @@
+import csv
+import json
+import os
 import tempfile
 import unittest
+from pathlib import Path
 from unittest import mock
 
 from network.evolution.origin import Origin, ReproductionType
 from network.evolution.stats import EpochStats, Stats
 from network.network import Network
 from network.neuron import Neuron
+from utility.timing import timings
 
 
 def get_network():
@@ -119,6 +124,247 @@ class TestStats(unittest.TestCase):
             Origin(ReproductionType.Random, []), epoch["operations"][0]
         )
 
+    def test_networks_are_stored_once(self):
+        elite = get_network()
+        other = Network([Neuron(0), Neuron(1)], [Neuron(2), Neuron(4)])
+        stats = Stats()
+        stats.add_epoch([elite, other], [1, 2])
+        stats.add_epoch([elite, elite.clone()], [2, 3])
+
+        json_object = stats.to_json_object()
+        imported = Stats.from_json_object(json_object)
+
+        self.assertEqual(2, len(json_object["networks"]))
+        self.assertEqual(2, len(imported.networks))
+        population = imported.get_epoch(1)["population"]
+        self.assertIs(imported.get_epoch(0)["population"][0], population[0])
+        self.assertIs(population[0], population[1])
+        self.assertTrue(imported.compare(stats))
+
+    def test_import_networks_in_epochs(self):
+        stats = Stats()
+        stats.add_epoch([get_network()], [1])
+        json_object = stats.to_json_object()
+        # older versions store the networks in the epochs
+        del json_object["networks"]
+        json_object["data"][0]["population"] = [get_network().to_json_object()]
+
+        imported = Stats.from_json_object(json_object)
+
+        self.assertTrue(imported.is_same_populations(stats))
+        self.assertEqual(1, len(imported.to_json_object()["networks"]))
+
+    def test_network_fitness(self):
+        first, second = get_network(), Network([Neuron(0)], [Neuron(1)])
+        stats = Stats()
+        stats.add_epoch([first, second], [1, 2])
+        stats.add_epoch([second, first], [3, 4])
+        stats.add_epoch([second], [5])
+
+        fitness = stats.get_network_fitness()
+
+        self.assertEqual([4, 5], list(fitness.values()))
+        self.assertIs(first, stats.networks[list(fitness.keys())[0]])
+
+    def test_timings_of_epoch(self):
+        stats = Stats()
+        timings.reset()
+        timings.add("simulation", 2)
+        stats.add_epoch([get_network()], [0])
+        stats.add_epoch([get_network()], [0])
+
+        self.assertEqual({"simulation": 2}, stats.get_epoch(0)["timings"])
+        self.assertEqual({}, stats.get_epoch(1)["timings"])
+        self.assertEqual(
+            "Timings: simulation 2.0000s", stats.get_timing_information(0)
+        )
+
+    def test_timings_start_epoch(self):
+        stats = Stats()
+        timings.add("cache_warm_up", 2)
+        stats.start_epoch()
+        timings.add("simulation", 1)
+        stats.add_epoch([get_network()], [0])
+
+        self.assertEqual({"simulation": 1}, stats.get_epoch(0)["timings"])
+
+    def test_timings_of_log(self):
+        stats = Stats()
+        stats.start_epoch()
+        stats.add_epoch([get_network()], [1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "stats.jsonl")
+            stats.set_log(filename)
+            stats.write_log()
+            stats.start_epoch()
+            stats.add_epoch([get_network()], [2])
+            imported = Stats.from_file(filename)
+
+        self.assertIn("save_stats", stats.get_epoch(0)["timings"])
+        self.assertNotIn("save_stats", stats.get_epoch(1)["timings"])
+        self.assertEqual(
+            stats.get_epoch(0)["timings"], imported.get_epoch(0)["timings"]
+        )
+
+    def test_path_filename(self):
+        stats = Stats()
+        stats.add_epoch([get_network()], [1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ["stats.json", "stats.npz"]:
+                filename = Path(directory).joinpath(name)
+                stats.to_file(filename)
+                imported = Stats.from_file(filename)
+
+                self.assertTrue(imported.compare(stats))
+                self.assertTrue(imported.is_same_populations(stats))
+
+    def test_timings_import_export(self):
+        stats = Stats()
+        timings.add("simulation", 2)
+        stats.add_epoch([get_network()], [0])
+
+        with tempfile.NamedTemporaryFile() as tmp_file:
+            stats.to_file(tmp_file.name)
+            imported = Stats.from_file(tmp_file.name)
+
+        self.assertEqual({"simulation": 2}, imported.get_epoch(0)["timings"])
+        # saving outside of the log is timed like any other span
+        self.assertIn("save_stats", timings.get_durations())
+
+    def test_import_without_timings(self):
+        stats = Stats()
+        stats.add_epoch([get_network()], [0])
+        json_object = stats.to_json_object()
+        del json_object["data"][0]["timings"]
+
+        imported = Stats.from_json_object(json_object)
+
+        self.assertEqual({}, imported.get_epoch(0)["timings"])
+
+    def test_timings_to_file(self):
+        stats = Stats()
+        timings.reset()
+        timings.add("simulation", 2)
+        stats.add_epoch([get_network()], [0])
+        timings.add("generation", 1)
+        stats.add_epoch([get_network()], [0])
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = os.path.join(directory, "timings.csv")
+            json_file = os.path.join(directory, "timings.json")
+            stats.timings_to_file(csv_file)
+            stats.timings_to_file(json_file)
+            with open(csv_file) as f:
+                rows = list(csv.DictReader(f))
+            with open(json_file) as f:
+                json_rows = json.load(f)
+
+            with self.assertRaises(RuntimeError):
+                stats.timings_to_file(os.path.join(directory, "timings"))
+
+        self.assertEqual(
+            ["epoch", "took", "simulation", "generation"], list(rows[0])
+        )
+        self.assertEqual(["0", "2"], [rows[0]["epoch"], rows[0]["simulation"]])
+        # missing spans took no time
+        self.assertEqual("0", rows[1]["simulation"])
+        self.assertEqual(stats.get_timings(), json_rows)
+
+    def test_log(self):
+        stats = Stats()
+        stats.add_epoch([get_network()], [1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "stats.jsonl")
+            stats.set_log(filename)
+            stats.add_epoch([get_network()], [2])
+            stats.write_log()
+
+            imported = Stats.from_file(filename)
+            with open(filename) as f:
+                lines = f.readlines()
+
+        self.assertEqual(2, len(lines))
+        self.assertTrue(imported.compare(stats))
+        self.assertTrue(imported.is_same_populations(stats))
+        self.assertEqual(filename, imported.log.filename)
+
+    def test_log_stores_networks_once(self):
+        elite = get_network()
+        stats = Stats()
+        stats.add_epoch([elite], [1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "stats.jsonl")
+            stats.set_log(filename)
+            stats.add_epoch([elite, elite.clone()], [1, 1])
+            stats.write_log()
+
+            imported = Stats.from_file(filename)
+            with open(filename) as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(1, len(records[0]["networks"]))
+        self.assertEqual(0, len(records[1]["networks"]))
+        self.assertIs(
+            imported.get_epoch(0)["population"][0],
+            imported.get_epoch(1)["population"][1],
+        )
+
+    def test_retention(self):
+        networks = [
+            Network([Neuron(0)], [Neuron(1, threshold=i)]) for i in range(12)
+        ]
+        stats = Stats()
+        for epoch in range(6):
+            stats.add_epoch(
+                networks[2 * epoch : 2 * epoch + 2],
+                [epoch, 10 - epoch],
+                [Origin(ReproductionType.Random, [])] * 2,
+            )
+        expected = Stats.from_json_object(stats.to_json_object())
+
+        with tempfile.TemporaryDirectory() as directory:
+            stats.set_log(os.path.join(directory, "stats.jsonl"))
+            stats.set_retention(2, keep_every=3)
+
+            retained = ["population" in epoch for epoch in stats.data]
+            # the latest populations and the best network of each epoch
+            pool_size = len(stats.networks)
+            best_network, best_fitness = stats.get_best_network_alltime()
+            origin = stats.get_origin(stats.get_epoch(1)["population"][0], 1)
+            same_populations = expected.is_same_populations(stats)
+
+        self.assertEqual([True, False, False, True, True, True], retained)
+        self.assertEqual(8 + 2, pool_size)
+        self.assertEqual(10, best_fitness)
+        self.assertEqual(
+            networks[1].to_json_object(), best_network.to_json_object()
+        )
+        self.assertEqual([Origin(ReproductionType.Random, [])], origin)
+        self.assertTrue(same_populations)
+        self.assertTrue(expected.compare(stats))
+
+    def test_retention_requires_log(self):
+        stats = Stats()
+        stats.add_epoch([get_network()], [1])
+
+        with self.assertRaises(RuntimeError):
+            stats.set_retention(1)
+
+    def test_log_with_more_epochs(self):
+        stats = Stats()
+        stats.add_epoch([get_network()], [1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "stats.jsonl")
+            stats.set_log(filename)
+
+            with self.assertRaises(RuntimeError):
+                Stats().set_log(filename)
+
     def test_compare_stats_epochs_simple_cases(self):
         s1 = Stats()
         s2 = Stats()
@@ -201,6 +447,22 @@ class TestStats(unittest.TestCase):
         ]
         self.assertEqual(expected_history, history)
 
+    def test_get_origin_long_history(self):
+        s = Stats()
+        s.add_epoch([0], [0], [Origin("random", [])])
+        for _ in range(2000):
+            s.add_epoch([0], [0], [Origin("same", [0])])
+
+        history = s.get_origin(0)
+
+        depth = 0
+        while len(history) == 2:
+            self.assertEqual(Origin("same", [0]), history[0])
+            history = history[1]
+            depth += 1
+        self.assertEqual(2000, depth)
+        self.assertEqual([Origin("random", [])], history)
+
     def test_get_origin_distribution(self):
         dummy = [0, 0]
         s = Stats()
@@ -0,0 +1,170 @@
+import unittest
+
+import numpy as np
+
+from network.compact_network import CompactNetwork, get_fingerprint
+from network.network import Network
+from network.neuron import Neuron
+from network.synapse import Synapse
+
+
+def create_network():
+    net = Network(
+        [Neuron(0, threshold=1, leak=5), Neuron(1, threshold=2)],
+        [Neuron(3, threshold=3, leak=10)],
+        [Neuron(20, threshold=4, leak=20), Neuron(7, threshold=5, leak=1)],
+    )
+    net.add_synapse(Synapse(0, 20, weight=1, delay=2, exciting=True))
+    net.add_synapse(Synapse(20, 3, weight=3, delay=4, exciting=False))
+    net.add_synapse(Synapse(1, 7, weight=5, delay=None, exciting=True))
+    net.add_synapse(Synapse(7, 3, weight=7, delay=0, exciting=True))
+    return net
+
+
+class TestCompactNetwork(unittest.TestCase):
+    def test_arrays(self):
+        compact = CompactNetwork.from_network(create_network())
+
+        np.testing.assert_array_equal([0, 1, 3, 7, 20], compact.neuron_uid)
+        np.testing.assert_array_equal(
+            [1, 2, 3, 5, 4], compact.get_neuron_parameter("threshold")
+        )
+        np.testing.assert_array_equal(
+            [5, 10, 10, 1, 20],
+            compact.get_neuron_parameter("leak", default=10),
+        )
+        np.testing.assert_array_equal([0, 1, 7, 20], compact.synapse_from)
+        np.testing.assert_array_equal([20, 7, 3, 3], compact.synapse_to)
+        np.testing.assert_array_equal(
+            [True, True, True, False],
+            compact.get_synapse_parameter("exciting"),
+        )
+
+    def test_indices(self):
+        compact = CompactNetwork.from_network(create_network())
+
+        np.testing.assert_array_equal([0, 1], compact.get_input_index())
+        np.testing.assert_array_equal([2], compact.get_output_index())
+        np.testing.assert_array_equal(
+            [0, 1, 3, 4], compact.get_synapse_from_index()
+        )
+        np.testing.assert_array_equal(
+            [4, 3, 2, 2], compact.get_synapse_to_index()
+        )
+
+    def test_missing_parameter(self):
+        compact = CompactNetwork.from_network(create_network())
+
+        self.assertRaises(RuntimeError, compact.get_neuron_parameter, "leak")
+        self.assertRaises(RuntimeError, compact.get_neuron_parameter, "other")
+        np.testing.assert_array_equal(
+            [0, 0, 0, 0, 0], compact.get_neuron_parameter("other", default=0)
+        )
+
+    def test_missing_parameter_no_synapses(self):
+        net = Network([Neuron(0)], [Neuron(1)])
+        compact = CompactNetwork.from_network(net)
+        delay = compact.get_synapse_parameter("delay")
+
+        self.assertEqual(0, len(delay))
+        self.assertNotEqual(object, delay.dtype)
+
+    def test_round_trip(self):
+        net = create_network()
+        converted = CompactNetwork.from_network(net).to_network()
+
+        self.assertEqual(0, net.distance(converted))
+        for neuron in net.get_all_neurons():
+            other = converted.find_neuron_by_uid(neuron.uid)
+            self.assertEqual(vars(neuron), vars(other))
+            self.assertEqual(
+                net.get_neuron_type(neuron=neuron),
+                converted.get_neuron_type(neuron=other),
+            )
+        for synapse in net.get_all_synapses():
+            other = converted.find_synapse_by_neurons(
+                converted.find_neuron_by_uid(synapse.connect_from),
+                converted.find_neuron_by_uid(synapse.connect_to),
+            )
+            self.assertEqual(vars(synapse), vars(other))
+
+    def test_round_trip_keeps_python_types(self):
+        net = create_network()
+        converted = CompactNetwork.from_network(net).to_network()
+
+        neuron = converted.find_neuron_by_uid(20)
+        synapse = converted.find_synapse_by_neurons_uid(20, 3)
+        self.assertIs(int, type(neuron.threshold))
+        self.assertIs(bool, type(synapse.exciting))
+        self.assertIsNone(converted.find_synapse_by_neurons_uid(1, 7).delay)
+
+    def test_empty_network(self):
+        net = Network([Neuron(0)], [Neuron(1)])
+        converted = CompactNetwork.from_network(net).to_network()
+
+        self.assertEqual(0, net.distance(converted))
+        self.assertEqual(0, len(converted.synapses))
+
+    def test_fingerprint_same_structure(self):
+        net = create_network()
+        clone = net.clone()
+
+        self.assertEqual(get_fingerprint(net), get_fingerprint(clone))
+
+    def test_fingerprint_different_parameter(self):
+        net = create_network()
+        clone = net.clone()
+        clone.find_synapse_by_neurons_uid(20, 3).weight = 4
+
+        self.assertNotEqual(get_fingerprint(net), get_fingerprint(clone))
+
+    def test_fingerprint_different_structure(self):
+        net = create_network()
+        clone = net.clone()
+        clone.add_synapse(Synapse(0, 7, weight=1, delay=2, exciting=True))
+
+        self.assertNotEqual(get_fingerprint(net), get_fingerprint(clone))
+
+    def test_fingerprint_hidden_uid(self):
+        net = create_network()
+        renamed = Network(
+            [Neuron(0, threshold=1, leak=5), Neuron(1, threshold=2)],
+            [Neuron(3, threshold=3, leak=10)],
+            [Neuron(50, threshold=4, leak=20), Neuron(9, threshold=5, leak=1)],
+        )
+        renamed.add_synapse(Synapse(0, 50, weight=1, delay=2, exciting=True))
+        renamed.add_synapse(Synapse(50, 3, weight=3, delay=4, exciting=False))
+        renamed.add_synapse(Synapse(1, 9, weight=5, delay=None, exciting=True))
+        renamed.add_synapse(Synapse(9, 3, weight=7, delay=0, exciting=True))
+
+        self.assertEqual(get_fingerprint(net), get_fingerprint(renamed))
+
+    def test_exact_fingerprint(self):
+        net = create_network()
+        renamed = Network(
+            [Neuron(0, threshold=1, leak=5), Neuron(1, threshold=2)],
+            [Neuron(3, threshold=3, leak=10)],
+            [Neuron(50, threshold=4, leak=20), Neuron(7, threshold=5, leak=1)],
+        )
+        renamed.add_synapse(Synapse(0, 50, weight=1, delay=2, exciting=True))
+        renamed.add_synapse(Synapse(50, 3, weight=3, delay=4, exciting=False))
+        renamed.add_synapse(Synapse(1, 7, weight=5, delay=None, exciting=True))
+        renamed.add_synapse(Synapse(7, 3, weight=7, delay=0, exciting=True))
+        unused = net.clone()
+        unused.add_neuron(Neuron(30, threshold=1))
+
+        exact = get_fingerprint(net, exact=True)
+
+        self.assertEqual(exact, get_fingerprint(net.clone(), exact=True))
+        self.assertNotEqual(exact, get_fingerprint(renamed, exact=True))
+        self.assertNotEqual(exact, get_fingerprint(unused, exact=True))
+        self.assertEqual(get_fingerprint(net), get_fingerprint(unused))
+
+    def test_fingerprint_ignores_stripped(self):
+        net = create_network()
+        fingerprint = get_fingerprint(net)
+        net.add_neuron(Neuron(30, threshold=1, leak=1))
+        net.add_synapse(Synapse(0, 30, weight=1, delay=1, exciting=True))
+
+        self.assertEqual(fingerprint, get_fingerprint(net))
+        self.assertIsNotNone(net.find_neuron_by_uid(30))
@@ -379,3 +379,133 @@ class TestNetwork(unittest.TestCase):
         net = Network([Neuron(0)], [Neuron(1)])
         net.add_neuron(Neuron(0))
         self.assertEqual(0, len(net.hidden_neurons))
+
+    def test_find_after_remove(self):
+        net = create_simple_network()
+        net.remove_neuron_uid(5)
+
+        self.assertIsNone(net.find_neuron_by_uid(5))
+        self.assertIsNone(net.find_synapse_by_neurons_uid(0, 5))
+        self.assertIsNone(net.find_synapse_by_neurons_uid(5, 1))
+        # should be able to add a neuron with the same uid again
+        self.assertTrue(net.add_neuron(Neuron(5)))
+        self.assertTrue(net.add_synapse(Synapse(0, 5)))
+
+    def test_find_hidden_neuron(self):
+        net = create_simple_network()
+
+        self.assertEqual(5, net.find_hidden_neuron_by_uid(5).uid)
+        self.assertIsNone(net.find_hidden_neuron_by_uid(0))
+        self.assertIsNone(net.find_hidden_neuron_by_uid(123))
+
+    def test_remove_neuron_with_self_connection(self):
+        net = create_simple_network()
+        net.add_synapse(Synapse(5, 5))
+        net.remove_neuron_uid(5)
+
+        self.assertEqual(set(), net.synapses)
+
+    def test_add_synapse_after_remove(self):
+        net = create_simple_network()
+        synapse = net.find_synapse_by_neurons_uid(0, 5)
+        net.remove_synapse(synapse)
+
+        self.assertIsNone(net.find_synapse_by_neurons_uid(0, 5))
+        self.assertTrue(net.add_synapse(Synapse(0, 5)))
+
+    def test_influence(self):
+        net = create_simple_network()
+        self.assertEqual(set([0, 1, 5]), net.influence_output_neurons())
+
+        net.add_neuron(Neuron(9))
+        net.add_synapse(Synapse(1, 9))
+        self.assertEqual(set([0, 1, 5]), net.influence_output_neurons())
+
+        net.add_synapse(Synapse(9, 5))
+        self.assertEqual(set([0, 1, 5, 9]), net.influence_output_neurons())
+
+        net.remove_synapse(net.find_synapse_by_neurons_uid(5, 1))
+        self.assertEqual(set([1]), net.influence_output_neurons())
+
+    def test_reachable_after_synapse_changes(self):
+        net = create_simple_network()
+        net.add_neuron(Neuron(9))
+        net.add_neuron(Neuron(10))
+        net.add_synapse(Synapse(9, 10))
+        self.assertEqual(set([0, 1, 5]), net.reachable_neurons())
+
+        # connecting to the chain, makes the whole chain reachable
+        net.add_synapse(Synapse(5, 9))
+        self.assertEqual(set([0, 1, 5, 9, 10]), net.reachable_neurons())
+
+        net.remove_synapse(net.find_synapse_by_neurons_uid(0, 5))
+        self.assertEqual(set([0]), net.reachable_neurons())
+
+    def test_reachable_returns_copy(self):
+        net = create_simple_network()
+        reachable = net.reachable_neurons()
+        reachable.add(1234)
+
+        self.assertEqual(set([0, 1, 5]), net.reachable_neurons())
+
+    def test_clone_shared_structure(self):
+        net = create_simple_network()
+        net_clone = net.clone_shared()
+
+        net_clone.remove_neuron_uid(5)
+        net_clone.add_synapse(Synapse(0, 1))
+
+        self.assertEqual(2, len(net.synapses))
+        self.assertEqual(1, len(net.hidden_neurons))
+        self.assertIsNone(net.find_synapse_by_neurons_uid(0, 1))
+        self.assertEqual(set([0, 1, 5]), net.reachable_neurons())
+        self.assertEqual(set([0, 1]), net_clone.reachable_neurons())
+
+    def test_clone_shared_writable(self):
+        net = create_simple_network()
+        net_clone = net.clone_shared()
+
+        neuron = net_clone.get_writable_neuron(net_clone.find_neuron_by_uid(5))
+        neuron.threshold = 10
+        synapse = net_clone.get_writable_synapse(
+            net_clone.find_synapse_by_neurons_uid(0, 5)
+        )
+        synapse.weight = 10
+
+        self.assertEqual(1, net.find_neuron_by_uid(5).threshold)
+        self.assertEqual(0, net.find_synapse_by_neurons_uid(0, 5).weight)
+        self.assertIs(neuron, net_clone.find_neuron_by_uid(5))
+        self.assertIs(synapse, net_clone.find_synapse_by_neurons_uid(0, 5))
+        self.assertEqual(NeuronType.Hidden, net_clone.get_neuron_type(5))
+        # elements are only copied once
+        self.assertIs(neuron, net_clone.get_writable_neuron(neuron))
+        self.assertIs(synapse, net_clone.get_writable_synapse(synapse))
+
+    def test_clone_shared_parent_writable(self):
+        net = create_simple_network()
+        net_clone = net.clone_shared()
+
+        neuron = net.get_writable_neuron(net.input_neurons[0])
+        neuron.threshold = 10
+
+        self.assertIs(neuron, net.input_neurons[0])
+        self.assertEqual(0, net_clone.input_neurons[0].threshold)
+
+    def test_stripped(self):
+        net = create_simple_network()
+        net.add_neuron(Neuron(7))
+
+        stripped = net.stripped()
+
+        self.assertIsNone(stripped.find_hidden_neuron_by_uid(7))
+        self.assertIsNotNone(net.find_hidden_neuron_by_uid(7))
+        # the elements of the network stay writable without copies
+        neuron = net.find_neuron_by_uid(5)
+        self.assertIs(neuron, net.get_writable_neuron(neuron))
+        self.assertEqual(0, len(net._shared))
+
+    def test_writable_not_shared(self):
+        net = create_simple_network()
+        neuron = net.find_neuron_by_uid(5)
+
+        self.assertIs(neuron, net.get_writable_neuron(neuron))
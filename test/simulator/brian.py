@@ -150,3 +150,62 @@ class TestBrian(unittest.TestCase):
         self.assertTrue(
             len(spike_trains[3]) > 0, "hidden2 (like output) should spike"
         )
+
+    def test_persistent_same_as_new(self):
+        network = Network(
+            [Neuron(uid=0, threshold=127)], [Neuron(uid=1, threshold=100)]
+        )
+        network.add_synapse(
+            Synapse(
+                connect_from=0,
+                connect_to=1,
+                weight=120,
+                exciting=True,
+                delay=3,
+            )
+        )
+        encoder = FloatBrianEncoder(number_of_neurons=1, poisson=False)
+        decoder = DummyDecoder(number_of_neurons=1)
+
+        persistent = BrianSimulator(
+            networks=[network, network],
+            encoder=encoder,
+            decoder=decoder,
+            inputs=[(0.2,), (0.5,)],
+            persistent=True,
+        )
+        persistent.simulate()
+        persistent.set_inputs([(0.9,), (0.1,)])
+        persistent.simulate()
+
+        new = BrianSimulator(
+            networks=[network, network],
+            encoder=encoder,
+            decoder=decoder,
+            inputs=[(0.9,), (0.1,)],
+        )
+        new.simulate()
+
+        self.assertEqual(
+            list(new.spikes.count[:]), list(persistent.spikes.count[:])
+        )
+
+    def test_persistent_inactive(self):
+        network = Network(
+            [Neuron(uid=0, threshold=127)], [Neuron(uid=1, threshold=100)]
+        )
+        encoder = FloatBrianEncoder(number_of_neurons=1, poisson=False)
+        decoder = DummyDecoder(number_of_neurons=1)
+
+        simulator = BrianSimulator(
+            networks=[network, network],
+            encoder=encoder,
+            decoder=decoder,
+            inputs=[(1,), (1,)],
+            persistent=True,
+        )
+        simulator.set_inputs([(1,), (1,)], active=[True, False])
+        simulator.simulate()
+
+        self.assertGreater(simulator.spikes.count[0], 0)
+        self.assertEqual(0, simulator.spikes.count[2])
@@ -0,0 +1,189 @@
+import random
+import unittest
+
+import numpy as np
+
+from experiment.brian.classification import Classification
+from experiment.brian.xor import XOR
+from network.evolution.generator import Generator
+from network.evolution.reproduction.mutator import Mutator
+from network.network import Network
+from network.neuron import Neuron
+from network.synapse import Synapse
+from simulator.brian import BrianSimulator
+from simulator.numpy_simulator import NumpySimulator
+from utility.configuration import Configuration
+
+
+def get_population(experiment, size: int):
+    """
+    Generate networks with some mutations, to have hidden neurons and delays
+    :param experiment:
+    :param size:
+    :return:
+    """
+    generator = Generator.create_from_experiment(
+        experiment=experiment, configuration=Configuration()
+    )
+    mutator = Mutator()
+    population = generator.generate_networks(size)
+    for _ in range(3):
+        population = [mutator.apply_mutations(n) for n in population]
+    return population
+
+
+def get_spike_counts(simulator_class, experiment, networks, patterns):
+    simulator = simulator_class(
+        networks=[n for n in networks for _ in patterns],
+        inputs=patterns * len(networks),
+        encoder=experiment.encoder,
+        decoder=experiment.decoder,
+    )
+    outputs = simulator.simulate()
+    if isinstance(simulator, BrianSimulator):
+        return outputs, np.array(simulator.spikes.count[:])
+    return outputs, simulator.spike_counts
+
+
+class TestNumpySimulator(unittest.TestCase):
+    def assert_same_as_brian(self, experiment, networks, patterns):
+        brian_outputs, brian_counts = get_spike_counts(
+            BrianSimulator, experiment, networks, patterns
+        )
+        numpy_outputs, numpy_counts = get_spike_counts(
+            NumpySimulator, experiment, networks, patterns
+        )
+
+        np.testing.assert_array_equal(brian_counts, numpy_counts)
+        self.assertEqual(brian_outputs, numpy_outputs)
+
+    def test_xor_same_as_brian(self):
+        random.seed(1)
+        experiment = XOR()
+        networks = get_population(experiment, 20)
+
+        self.assert_same_as_brian(experiment, networks, experiment.get_data())
+
+    def test_classification_same_as_brian(self):
+        random.seed(2)
+        experiment = Classification(poisson=False)
+        networks = get_population(experiment, 10)
+
+        self.assert_same_as_brian(experiment, networks, experiment.X_train[:5])
+
+    def test_delay_same_as_brian(self):
+        network = Network(
+            [Neuron(uid=0, threshold=127), Neuron(uid=1, threshold=127)],
+            [Neuron(uid=2, threshold=100), Neuron(uid=3, threshold=20)],
+            [Neuron(uid=4, threshold=50, leak=3)],
+        )
+        network.add_synapse(
+            Synapse(
+                connect_from=0, connect_to=4, weight=60, exciting=True, delay=7
+            )
+        )
+        network.add_synapse(
+            Synapse(
+                connect_from=2,
+                connect_to=1,
+                weight=110,
+                exciting=True,
+                delay=2,
+            )
+        )
+        network.add_synapse(
+            Synapse(
+                connect_from=1,
+                connect_to=2,
+                weight=30,
+                exciting=False,
+                delay=0,
+            )
+        )
+        experiment = XOR()
+
+        self.assert_same_as_brian(experiment, [network], experiment.get_data())
+
+    def test_persistent(self):
+        random.seed(3)
+        experiment = Classification(poisson=False)
+        networks = get_population(experiment, 3)
+        first = experiment.X_train[:3]
+        second = experiment.X_train[3:6]
+
+        persistent = NumpySimulator(
+            networks=networks,
+            inputs=first,
+            encoder=experiment.encoder,
+            decoder=experiment.decoder,
+            persistent=True,
+        )
+        persistent.simulate()
+        persistent.set_inputs(second, active=[True, False, True])
+        outputs = persistent.simulate()
+
+        new = NumpySimulator(
+            networks=networks,
+            inputs=second,
+            encoder=experiment.encoder,
+            decoder=experiment.decoder,
+        )
+        expected = new.simulate()
+
+        self.assertEqual(expected[0], outputs[0])
+        self.assertEqual(expected[2], outputs[2])
+        self.assertEqual((-1, [0, 0, 0]), outputs[1])
+
+    def test_select_simulator(self):
+        experiment = XOR(simulator="numpy")
+        network = Network(
+            [Neuron(0, threshold=1), Neuron(1, threshold=1)],
+            [Neuron(2, threshold=1), Neuron(3, threshold=1)],
+        )
+        simulator = experiment._get_simulator([network], [(True, False)])
+        self.assertIsInstance(simulator, NumpySimulator)
+        self.assertRaises(RuntimeError, XOR, simulator="other")
+
+    def test_without_spike_monitor(self):
+        random.seed(3)
+        experiment = XOR()
+        networks = get_population(experiment, 10)
+        patterns = experiment.get_data()
+
+        for simulator_class in [BrianSimulator, NumpySimulator]:
+            simulators = [
+                simulator_class(
+                    networks=[n for n in networks for _ in patterns],
+                    inputs=patterns * len(networks),
+                    encoder=experiment.encoder,
+                    decoder=experiment.decoder,
+                    monitor_spikes=monitor_spikes,
+                )
+                for monitor_spikes in [True, False]
+            ]
+            outputs = [simulator.simulate() for simulator in simulators]
+
+            self.assertEqual(outputs[0], outputs[1])
+            np.testing.assert_array_equal(
+                simulators[0].get_output_counts(),
+                simulators[1].get_output_counts(),
+            )
+        self.assertRaises(
+            RuntimeError, simulators[1].get_spike_trains, np.arange(2)
+        )
+
+    def test_early_stop_same_as_brian(self):
+        random.seed(4)
+        experiment = XOR(decoder_type="binary")
+        networks = get_population(experiment, 10)
+        expected = experiment.fitness(networks)
+
+        times = []
+        for simulator in ["brian", "numpy"]:
+            experiment.set_simulator(simulator)
+            experiment.set_early_stop(50, max_rate=150)
+            self.assertEqual(expected, experiment.fitness(networks))
+            times.append(experiment.simulated_time)
+
+        self.assertEqual(times[0], times[1])
+        self.assertLess(times[0], 1000)
@@ -5,6 +5,7 @@ from utility.list_operation import (
     flat_list,
     get_depths,
     remove_multiple_indices,
+    split_list,
 )
 
 
@@ -54,3 +55,9 @@ class TestList(unittest.TestCase):
         self.assertEqual(
             {0: 3, 1: 2, 2: 4}, get_depths([[[1, 2, 3]], [[4]], []])
         )
+
+    def test_split_list(self):
+        self.assertEqual([[1, 2], [3, 4], [5]], split_list([1, 2, 3, 4, 5], 3))
+        self.assertEqual([[1], [2]], split_list([1, 2], 5))
+        self.assertEqual([], split_list([], 2))
+        self.assertEqual([[1, 2, 3]], split_list([1, 2, 3], 1))
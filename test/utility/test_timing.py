@@ -0,0 +1,82 @@
+import unittest
+from functools import partial
+from multiprocessing.pool import Pool
+from unittest import mock
+
+from utility import timing
+from utility.timing import Timings, span, with_timings
+
+
+def simulate(duration: float):
+    """
+    Pretend to simulate in a worker process
+    """
+    timing.timings.add("simulation", duration)
+    return duration * 2
+
+
+class TestTimings(unittest.TestCase):
+    @mock.patch("time.perf_counter")
+    def test_span(self, perf_counter):
+        timings = Timings()
+        perf_counter.side_effect = [0, 2, 10, 11]
+
+        with timings.span("simulation"):
+            pass
+        with timings.span("simulation"):
+            pass
+
+        self.assertEqual({"simulation": 3}, timings.get_durations())
+
+    @mock.patch("time.perf_counter")
+    def test_nested_spans(self, perf_counter):
+        timings = Timings()
+        perf_counter.side_effect = [0, 1, 3, 4]
+
+        with timings.span("evaluation"):
+            with timings.span("simulation"):
+                pass
+
+        self.assertEqual(
+            {"simulation": 2, "evaluation": 4}, timings.get_durations()
+        )
+
+    def test_span_with_exception(self):
+        timings = Timings()
+
+        with self.assertRaises(RuntimeError):
+            with timings.span("simulation"):
+                raise RuntimeError("Failed simulation")
+
+        self.assertIn("simulation", timings.get_durations())
+
+    def test_reset(self):
+        timings = Timings()
+        timings.add("simulation", 1)
+
+        durations = timings.reset()
+
+        self.assertEqual({"simulation": 1}, durations)
+        self.assertEqual({}, timings.get_durations())
+
+    def test_add_all(self):
+        timings = Timings()
+        timings.add("simulation", 1)
+
+        timings.add_all({"simulation": 2, "decoding": 1})
+
+        self.assertEqual(
+            {"simulation": 3, "decoding": 1}, timings.get_durations()
+        )
+
+    def test_with_timings_in_workers(self):
+        timing.timings.reset()
+        with span("fitness"):
+            with Pool(processes=2) as pool:
+                results = pool.map(partial(with_timings, simulate), [1, 2])
+        for _, durations in results:
+            timing.timings.add_all(durations)
+
+        self.assertEqual([2, 4], [result for result, _ in results])
+        self.assertEqual(3, timing.timings.get_durations()["simulation"])
+        self.assertIn("fitness", timing.timings.reset())
@@ -12,6 +12,27 @@ def remove_multiple_indices(l: List, indices: Set):
     return [v for i, v in enumerate(l) if i not in indices]
 
 
+def split_list(li: List, n: int) -> List[List]:
+    """
+    Split a list into n contiguous chunks of (nearly) same size
+    Returns less chunks, if the list has less than n elements
+
+    :param li:
+    :param n: amount of chunks
+    :return:
+    """
+    n = min(n, len(li))
+    size, remainder = divmod(len(li), n) if n > 0 else (0, 0)
+
+    chunks = []
+    start = 0
+    for i in range(n):
+        end = start + size + (1 if i < remainder else 0)
+        chunks.append(li[start:end])
+        start = end
+    return chunks
+
+
 def flat_list(li: List):
     """
     Make a list flat in the same order, as displayed
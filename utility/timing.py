@@ -0,0 +1,103 @@
+"""
+Provide lightweight timing spans, to see where the time of an epoch goes
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+
+class Timings:
+    """
+    Accumulate the durations of named spans
+    Spans can be nested, the duration of a span includes its inner spans
+    """
+
+    _durations: Dict[str, float]
+
+    def __init__(self):
+        self._durations = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Measure the time of the code in the context
+
+        :param name: name of the span, durations of the same name are summed
+        :return:
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, duration: float):
+        """
+        Add a duration to a span
+
+        :param name:
+        :param duration: in seconds
+        :return:
+        """
+        self._durations[name] = self._durations.get(name, 0) + duration
+
+    def add_all(self, durations: Dict[str, float]):
+        """
+        Add the durations of spans, e.g. measured in a worker process
+
+        :param durations: name -> duration in seconds
+        :return:
+        """
+        for name, duration in durations.items():
+            self.add(name, duration)
+
+    def get_durations(self) -> Dict[str, float]:
+        """
+        Durations in seconds of all spans so far
+
+        :return: name -> duration
+        """
+        return dict(self._durations)
+
+    def reset(self) -> Dict[str, float]:
+        """
+        Start again without any spans
+
+        :return: durations before the reset
+        """
+        durations = self._durations
+        self._durations = {}
+        return durations
+
+
+# spans of the current process, collected by the stats for each epoch
+timings = Timings()
+
+
+def span(name: str):
+    """
+    Measure the time of the code in the context in the process' timings
+
+    :param name:
+    :return: context manager
+    """
+    return timings.span(name)
+
+
+def with_timings(
+    function: Callable[[Any], Any], argument: Any
+) -> Tuple[Any, Dict[str, float]]:
+    """
+    Call a function and return the durations of its spans with the result,
+    e.g. in a worker process, whose timings are lost otherwise
+    The caller adds them with timings.add_all, spans of parallel workers are
+    summed up
+
+    :param function: e.g. the function mapped over a pool
+    :param argument:
+    :return: result of the function and durations of its spans
+    """
+    # a forked worker starts with the timings of its parent
+    timings.reset()
+    result = function(argument)
+    return result, timings.reset()